@@ -4,6 +4,10 @@ import fs from 'fs';
 
 const PYTHON_SERVICE_URL = process.env.PYTHON_SERVICE_URL;
 
+// Tempo máximo acompanhando um job (ms) e falhas seguidas de consulta toleradas
+const JOB_MAX_WAIT_MS = Number(process.env.PYTHON_JOB_MAX_WAIT_MS) || 30 * 60 * 1000;
+const JOB_MAX_POLL_ERRORS = Number(process.env.PYTHON_JOB_MAX_POLL_ERRORS) || 5;
+
 /**
  * Cliente para comunicação com o microserviço Python
  */
@@ -33,10 +37,22 @@ class PythonServiceClient {
 
   /**
    * Envia PDF para análise
+   * Usa a API de jobs (POST /jobs + GET /jobs/:id) para não manter a conexão
+   * HTTP aberta durante toda a análise de arquivos grandes
    * @param {string} filePath - Caminho do arquivo PDF
+   * @param {Object} [options]
+   * @param {number} [options.pollInterval=2000] - Intervalo entre consultas (ms)
+   * @param {Function} [options.onProgress] - Recebe (progresso, etapa) a cada consulta
+   * @param {number} [options.maxWait] - Tempo máximo de espera pelo job (ms)
+   * @param {number} [options.maxPollErrors] - Falhas seguidas de consulta antes de desistir
    * @returns {Promise<Object>} - Resultado da análise
    */
-  async analyzeArchive(filePath) {
+  async analyzeArchive(filePath, {
+    pollInterval = 2000,
+    onProgress,
+    maxWait = JOB_MAX_WAIT_MS,
+    maxPollErrors = JOB_MAX_POLL_ERRORS,
+  } = {}) {
     try {
       console.log(`🚀 Enviando Arquivo para análise: ${filePath}`);
 
@@ -44,20 +60,68 @@ class PythonServiceClient {
       const formData = new FormData();
       formData.append('file', fs.createReadStream(filePath));
 
-      // Envia para o serviço Python
-      const response = await this.client.post('/analyze', formData, {
+      // Cria o job no serviço Python
+      const { data: job } = await this.client.post('/jobs', formData, {
         headers: formData.getHeaders(),
       });
 
-      console.log('✅ Análise concluída pelo serviço Python');
-      return response.data;
+      console.log(`📥 Job criado: ${job.jobId}`);
+
+      // Acompanha até concluir, com prazo máximo
+      const deadline = Date.now() + maxWait;
+      let pollErrors = 0;
+
+      while (true) {
+        if (Date.now() >= deadline) {
+          throw new Error(
+            `Tempo limite de ${Math.round(maxWait / 1000)}s excedido aguardando o job ${job.jobId}`
+          );
+        }
+
+        await new Promise((resolve) => setTimeout(resolve, pollInterval));
+
+        let status;
+        try {
+          ({ data: status } = await this.client.get(`/jobs/${job.jobId}`));
+          pollErrors = 0;
+        } catch (error) {
+          if (error.response?.status === 404) {
+            throw new Error(`Job ${job.jobId} não encontrado no serviço Python (expirado ou perdido)`);
+          }
+
+          // falha de rede/5xx: tenta de novo até o limite de falhas seguidas
+          pollErrors += 1;
+          console.warn(`⚠️ Falha ao consultar job ${job.jobId} (${pollErrors}/${maxPollErrors}): ${error.message}`);
+          if (pollErrors >= maxPollErrors) {
+            throw new Error(
+              `Serviço Python não respondeu ao job ${job.jobId} após ${pollErrors} tentativas: ${error.message}`
+            );
+          }
+          continue;
+        }
+
+        if (onProgress) {
+          onProgress(status.progresso, status.etapa);
+        }
+
+        if (status.status === 'concluido') {
+          console.log('✅ Análise concluída pelo serviço Python');
+          return status.resultado;
+        }
+
+        if (status.status === 'erro') {
+          throw new Error(status.erro || 'Erro no serviço Python');
+        }
+
+        console.log(`⏳ Job ${job.jobId}: ${status.progresso.descricao}`);
+      }
 
     } catch (error) {
       console.error('❌ Erro na análise Python:', error.message);
 
       if (error.response) {
         console.error('Detalhes:', error.response.data);
-        throw new Error(error.response.data.detail || 'Erro no serviço Python');
+        throw new Error(error.response.data.detail || error.response.data.error || 'Erro no serviço Python');
       }
 
       throw error;
@@ -0,0 +1,150 @@
+#  configurações do serviço (variáveis de ambiente)
+
+import os
+import tempfile
+
+try:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+except Exception:
+    pass
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+# Workers do gunicorn (mesma variável que o gunicorn lê para o -w)
+WEB_CONCURRENCY = max(1, _env_int("WEB_CONCURRENCY", 1))
+
+# Pool de processos para extração/análise (CPU-bound)
+# Padrão: núcleos divididos entre os workers do gunicorn
+ANALYSIS_WORKERS = max(
+    1, _env_int("ANALYSIS_WORKERS", (os.cpu_count() or 1) // WEB_CONCURRENCY)
+)
+# Quantas análises podem aguardar na fila além das que estão executando
+ANALYSIS_QUEUE_SIZE = max(0, _env_int("ANALYSIS_QUEUE_SIZE", ANALYSIS_WORKERS * 2))
+# Valor (segundos) do header Retry-After quando o pool está saturado
+ANALYSIS_RETRY_AFTER = max(1, _env_int("ANALYSIS_RETRY_AFTER", 30))
+
+# Extração paralela por faixas de páginas (dentro de cada análise)
+# Desligada por padrão: cada análise já roda em um processo do pool acima, e
+# processos extras só ajudam com núcleos livres (ex: ANALYSIS_WORKERS baixo)
+PDF_PARALLEL_WORKERS = max(1, _env_int("PDF_PARALLEL_WORKERS", 1))
+# Medido com benchmarks/bench_parallel_extraction.py: com o pool aquecido o
+# paralelo compensa a partir de ~10 páginas, mas subir os processos custa ~1s
+# (uma vez por processo de análise), que só se paga perto de 300 páginas
+PDF_PARALLEL_MIN_PAGES = max(2, _env_int("PDF_PARALLEL_MIN_PAGES", 300))
+
+# Motor de agrupamento de linhas/colunas das páginas: python ou numpy (vetorizado)
+PDF_LAYOUT_ENGINE = os.getenv("PDF_LAYOUT_ENGINE", "python").strip().lower()
+# Só no motor numpy: linhas com y até essa distância (pt) viram uma só; 0 desliga
+PDF_LINE_TOLERANCE = max(0.0, _env_float("PDF_LINE_TOLERANCE", 0.0))
+
+# OCR de páginas escaneadas: tesseracts simultâneos por análise, resolução
+# da primeira tentativa e da nova tentativa quando a confiança média (0-100)
+# fica abaixo de OCR_MIN_CONFIDENCE
+OCR_WORKERS = max(1, _env_int("OCR_WORKERS", ANALYSIS_WORKERS))
+OCR_DPI = max(72, _env_int("OCR_DPI", 150))
+OCR_MAX_DPI = max(OCR_DPI, _env_int("OCR_MAX_DPI", 300))
+OCR_MIN_CONFIDENCE = max(0, min(100, _env_int("OCR_MIN_CONFIDENCE", 70)))
+OCR_LANG = os.getenv("OCR_LANG", "por")
+
+# Cache do texto do OCR pelo hash da imagem renderizada (+ idioma e DPI)
+OCR_CACHE_PATH = os.getenv(
+    "OCR_CACHE_PATH", os.path.join(tempfile.gettempdir(), "ocr-cache.sqlite3")
+)
+# Tamanho máximo (bytes) dos textos guardados; 0 desliga o cache
+OCR_CACHE_MAX_BYTES = max(0, _env_int("OCR_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Layouts de relatório aprendidos (colunas e campos por cabeçalho da tabela)
+LAYOUT_CACHE_PATH = os.getenv(
+    "LAYOUT_CACHE_PATH", os.path.join(tempfile.gettempdir(), "layout-cache.sqlite3")
+)
+# Tamanho máximo (bytes) dos layouts guardados; 0 desliga (detecta colunas sempre)
+LAYOUT_CACHE_MAX_BYTES = max(0, _env_int("LAYOUT_CACHE_MAX_BYTES", 1024 * 1024))
+
+# Planilhas (.xlsx/.xls/.csv): nomes de coluna por campo, substituindo os
+# padrões do ExcelReader, ex: "fornecedor=razao social|fornec;valor=vl liquido"
+SPREADSHEET_COLUMNS = os.getenv("SPREADSHEET_COLUMNS", "")
+# Linhas por bloco de progresso (eventos do streaming/jobs)
+SPREADSHEET_CHUNK_ROWS = max(100, _env_int("SPREADSHEET_CHUNK_ROWS", 5000))
+
+# Upload: tamanho máximo aceito e tamanho dos blocos de leitura
+MAX_UPLOAD_BYTES = _env_int("MAX_UPLOAD_BYTES", 300 * 1024 * 1024)
+UPLOAD_CHUNK_BYTES = max(64 * 1024, _env_int("UPLOAD_CHUNK_BYTES", 1024 * 1024))
+# Máximo de arquivos por requisição em /analyze/batch
+MAX_BATCH_FILES = max(1, _env_int("MAX_BATCH_FILES", 12))
+
+# Resultados guardados no servidor (?armazenar=true), lidos em páginas em /results
+RESULT_STORE_PATH = os.getenv(
+    "RESULT_STORE_PATH", os.path.join(tempfile.gettempdir(), "analysis-results.sqlite3")
+)
+RESULT_STORE_TTL_SECONDS = max(60, _env_int("RESULT_STORE_TTL_SECONDS", 6 * 3600))
+# Máximo de itens por página em GET /results/{id}/{lista}
+RESULT_PAGE_MAX = max(1, _env_int("RESULT_PAGE_MAX", 500))
+
+# Compressão gzip das respostas (JSON/NDJSON) a partir deste tamanho; 0 desliga
+GZIP_MIN_BYTES = max(0, _env_int("GZIP_MIN_BYTES", 32 * 1024))
+GZIP_LEVEL = max(1, min(9, _env_int("GZIP_LEVEL", 5)))
+
+# Jobs assíncronos (POST /jobs): estado compartilhado entre workers e tempo de vida
+JOB_STATE_DIR = os.getenv(
+    "JOB_STATE_DIR", os.path.join(tempfile.gettempdir(), "analysis-jobs")
+)
+JOB_TTL_SECONDS = max(60, _env_int("JOB_TTL_SECONDS", 3600))
+
+# Chaves de bloqueio da etapa fuzzy do analisador (valor, codigo, prefixo, token).
+# Vazio (padrão) compara cada entrada com todos os grupos, como sempre foi;
+# com chaves, pares que não as compartilham (ex.: valores diferentes) deixam
+# de ser possíveis duplicatas. Também liga a busca fuzzy no histórico.
+ANALYZER_BLOCKING_KEYS = tuple(
+    k.strip()
+    for k in os.getenv("ANALYZER_BLOCKING_KEYS", "").split(",")
+    if k.strip()
+)
+
+# Janela (± dias) da etapa de datas próximas do analisador; 0 (padrão) desliga.
+# Ligada, agrupa lançamentos que hoje saem como notas únicas ou no fuzzy:
+# muda o resultado, por isso é opcional
+ANALYZER_DATE_WINDOW_DAYS = max(0, _env_int("ANALYZER_DATE_WINDOW_DAYS", 0))
+
+# Cache LRU de nomes de fornecedor normalizados (0 desliga)
+NORMALIZER_CACHE_SIZE = max(0, _env_int("NORMALIZER_CACHE_SIZE", 65536))
+
+# Cache de resultados por conteúdo do PDF (SQLite compartilhado entre workers)
+RESULT_CACHE_PATH = os.getenv(
+    "RESULT_CACHE_PATH", os.path.join(tempfile.gettempdir(), "analysis-cache.sqlite3")
+)
+# Tamanho máximo (bytes) dos resultados guardados; 0 desliga o cache
+RESULT_CACHE_MAX_BYTES = max(0, _env_int("RESULT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Cache das entradas extraídas de cada página (PDFs reexportados com páginas iguais)
+PAGE_CACHE_PATH = os.getenv(
+    "PAGE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "page-cache.sqlite3")
+)
+# Tamanho máximo (bytes) das páginas guardadas; 0 desliga o cache
+PAGE_CACHE_MAX_BYTES = max(0, _env_int("PAGE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Índice histórico de entradas já analisadas (duplicatas entre uploads)
+# Vazio desliga; com o índice ligado o cache de resultados não é usado
+HISTORY_INDEX_PATH = os.getenv("HISTORY_INDEX_PATH", "")
+# Entradas mais antigas que isso (dias) saem do índice; 0 = nunca
+HISTORY_RETENTION_DAYS = max(0, _env_int("HISTORY_RETENTION_DAYS", 730))
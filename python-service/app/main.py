@@ -1,19 +1,62 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import tempfile
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
 import os
-from typing import Dict, Any
+import tempfile
+from typing import Dict, Any, List, Optional, Tuple
 import traceback
 
-from app.services.pdf_reader import PDFReader
-from app.services.analyzer import DuplicateAnalyzer
-from app.models import AnalysisResponse, AnalysisError
+from app import config
+from app.services import analysis_tasks
+from app.services.excel_export import XLSX_MEDIA_TYPE
+from app.services.result_store import LISTS, SORT_COLUMNS, ResultFilters
+from app.utils.normalizer import parse_date_ordinal, parse_monetary_cents
+from app.services.job_manager import Job, JobManager
+from app.utils.json_response import OrjsonResponse, dumps
+from app.services.worker_pool import (
+    AnalysisWorkerPool,
+    PoolSaturatedError,
+    PoolUnavailableError,
+)
+from app.models import (
+    AnalysisResponse,
+    AnalysisError,
+    BatchAnalysisResponse,
+    JobCreated,
+    JobStatus,
+    ResultPage,
+    StoredAnalysis,
+)
+
+worker_pool = AnalysisWorkerPool(
+    max_workers=config.ANALYSIS_WORKERS,
+    max_queue=config.ANALYSIS_QUEUE_SIZE,
+    retry_after=config.ANALYSIS_RETRY_AFTER,
+)
+
+job_manager = JobManager(config.JOB_STATE_DIR, config.JOB_TTL_SECONDS)
+
+# referências para as tarefas dos jobs não serem coletadas pelo GC
+_job_tasks = set()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    worker_pool.shutdown()
+
 
 app = FastAPI(
     title="PDF Analysis Microservice",
     description="Serviço especializado em análise de duplicatas em lançamentos de notas fiscais",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=OrjsonResponse,
 )
 
 # CORS para integração com node.js
@@ -25,8 +68,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-pdf_reader = PDFReader()
-analyzer = DuplicateAnalyzer()
+# gzip só acima de GZIP_MIN_BYTES (o .xlsx da exportação já é compactado)
+if config.GZIP_MIN_BYTES:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=config.GZIP_MIN_BYTES,
+        compresslevel=config.GZIP_LEVEL,
+        exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + (XLSX_MEDIA_TYPE,),
+    )
+
+
+def _pool_error_response(error: Exception) -> OrjsonResponse:
+    """Converte saturação/indisponibilidade do pool em 429/503 com Retry-After"""
+    status_code = 429 if isinstance(error, PoolSaturatedError) else 503
+
+    return OrjsonResponse(
+        status_code=status_code,
+        content={"success": False, "error": str(error)},
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+async def _read_upload(file: UploadFile) -> bytearray:
+    """
+    Lê o upload em blocos direto para a memória, respeitando MAX_UPLOAD_BYTES.
+    O PDF é aberto a partir desses bytes, sem arquivo temporário.
+    """
+    limit = config.MAX_UPLOAD_BYTES
+
+    if file.size is not None and file.size > limit:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Arquivo excede o limite de {limit} bytes",
+        )
+
+    content = bytearray()
+    while True:
+        chunk = await file.read(config.UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        content.extend(chunk)
+        if len(content) > limit:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Arquivo excede o limite de {limit} bytes",
+            )
+
+    return content
+
+
+async def _lookup_result_cache(
+    content: bytes, compact: bool = False
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Hash do PDF (fora do event loop) e o resultado já em cache, se houver"""
+
+    def lookup():
+        cache_key = analysis_tasks.result_cache_key(content, compact)
+        return cache_key, analysis_tasks.get_cached_result(cache_key)
+
+    return await asyncio.to_thread(lookup)
+
+
+def _history_stats() -> Dict[str, Any]:
+    history = analysis_tasks.get_history_index()
+    return history.stats() if history is not None else {"habilitado": False}
+
+
+def _ocr_cache_stats() -> Dict[str, Any]:
+    cache = analysis_tasks.get_ocr_cache()
+    stats = cache.stats()
+    stats["segundosEconomizados"] = round(cache.counter("ms_economizados") / 1000, 1)
+    return stats
 
 
 @app.get("/")
@@ -44,50 +156,96 @@ async def root():
 async def health_check():
     """Endpoint de heath check detalhado"""
 
-    return {"status": "healthy", "pdf_reader": "ready", "analyzer": "ready"}
+    return {
+        "status": "healthy",
+        "pdf_reader": "ready",
+        "analyzer": "ready",
+        "pool": worker_pool.stats(),
+        "cache": await asyncio.to_thread(analysis_tasks.get_result_cache().stats),
+        "cachePaginas": await asyncio.to_thread(analysis_tasks.get_page_cache().stats),
+        "cacheOcr": await asyncio.to_thread(_ocr_cache_stats),
+        "cacheLayouts": await asyncio.to_thread(analysis_tasks.get_layout_cache().stats),
+        "historico": await asyncio.to_thread(_history_stats),
+        "resultados": await asyncio.to_thread(analysis_tasks.get_result_store().stats),
+    }
 
 
 @app.post("/analyze", response_model=AnalysisResponse)
-async def analyze_pf(file: UploadFile = File(...)):
+async def analyze_pf(
+    file: UploadFile = File(...),
+    stream: bool = Query(False, description="Resposta NDJSON incremental"),
+    compacto: bool = Query(False, description="Entradas em tabela, grupos por índice"),
+    armazenar: bool = Query(False, description="Guarda o resultado para /results"),
+):
     """
-    Analisa PDF e retorna duplicatas encontradas
+    Analisa PDF ou planilha (.xlsx, .xls, .csv) e retorna duplicatas encontradas
 
     Args:
-      file: Arquivo PDF enviado
+      file: Arquivo enviado (o formato vem da extensão do nome)
+      stream: se True, responde em NDJSON (application/x-ndjson), uma linha por
+        evento: entradas de cada página, cada grupo de duplicatas exatas, cada
+        grupo de possíveis duplicatas e, por último, o summary
+      compacto: se True, cada entrada aparece uma vez na tabela "entradas"
+        (linhas na ordem de "colunas") e duplicatas, possiveisDuplicatas,
+        notasUnicas e historico trazem índices dessa tabela em vez dos campos
+        repetidos (ignorado com stream)
+      armazenar: se True, o resultado fica guardado no servidor e a resposta
+        traz só summary, extracao e analiseId; as listas são lidas em páginas
+        (filtradas e ordenadas) em GET /results/{analiseId}/{lista}
 
     Returns:
       AnalysisResponse com dados estruturados e duplicatas
     """
-    temp_path = None
+    _check_extension(file)
 
     try:
-        # passar tipo de arquivo que vai entrar na função
-        file_extension = os.path.splitext(str(file.filename))[1]
-
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=file_extension
-        ) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
+        content = await _read_upload(file)
 
         print(f"Processando arquivo: {file.filename}")
         print(f"Tamanho: {len(content)} bytes")
 
-        # ETAPA 1: Extração do PDF
-        structured_data = pdf_reader.extract_from_pdf(temp_path)
+        if stream:
+            channel = await asyncio.to_thread(worker_pool.create_channel)
+            try:
+                future = worker_pool.submit(
+                    analysis_tasks.run_analysis_stream, content, channel, str(file.filename)
+                )
+            except (PoolSaturatedError, PoolUnavailableError):
+                # recusado: a fila não vai ser usada
+                await asyncio.to_thread(worker_pool.close_channel, channel)
+                raise
+            return StreamingResponse(
+                _ndjson_events(str(file.filename), future, channel),
+                media_type="application/x-ndjson",
+            )
+
+        # Mesmo PDF já analisado (em qualquer worker): resposta direto do cache
+        # (guardando no servidor a análise sempre roda, gerando um novo analiseId)
+        cache_key, analysis_result = None, None
+        if not armazenar:
+            cache_key, analysis_result = await _lookup_result_cache(content, compacto)
+        cache_status = "HIT" if analysis_result is not None else "MISS"
+
+        if analysis_result is not None:
+            print(f"⚡ Resultado em cache para {file.filename}")
+        else:
+            # ETAPA 1 e 2: Extração do arquivo e análise de duplicatas (pool de processos)
+            analysis_result = await worker_pool.run(
+                analysis_tasks.run_analysis,
+                content,
+                None,
+                cache_key,
+                str(file.filename),
+                compacto,
+                armazenar,
+            )
 
-        if not structured_data:
+        if analysis_result is None:
             raise HTTPException(
                 status_code=422,
-                detail="Não foi possível extrair dados estruturados do PDF",
+                detail="Não foi possível extrair dados estruturados do arquivo",
             )
 
-        print(f"✅ Extraídos {len(structured_data)} registros")
-
-        # ETAPA 2: Análise de duplicatas
-        analysis_result = analyzer.analyze_duplicates(structured_data)
-
         print(f"🎯 Análise concluída:")
         print(
             f"   - Duplicatas exatas: {analysis_result['summary']['duplicatasExatas']}"
@@ -97,14 +255,19 @@ async def analyze_pf(file: UploadFile = File(...)):
         )
         print(f"   - Notas únicas: {analysis_result['summary']['notasUnicas']}")
 
-        return JSONResponse(
+        return OrjsonResponse(
             status_code=200,
             content={"success": True, "filename": file.filename, **analysis_result},
+            headers={"X-Cache": cache_status},
         )
 
     except HTTPException:
         raise
 
+    except (PoolSaturatedError, PoolUnavailableError) as e:
+        print(f"⏳ Pool de análise saturado: {e}")
+        return _pool_error_response(e)
+
     except Exception as e:
         print(f"❌ Erro no processamento: {str(e)}")
         print(traceback.format_exc())
@@ -118,13 +281,135 @@ async def analyze_pf(file: UploadFile = File(...)):
             },
         )
 
-    finally:
-        # Cleanup
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except Exception as e:
-                print(f"⚠️ Erro ao remover arquivo temporário: {e}")
+
+def _check_extension(file: UploadFile) -> None:
+    """415 para formatos sem leitor (PDF e planilhas: SUPPORTED_EXTENSIONS)"""
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    if extension not in analysis_tasks.SUPPORTED_EXTENSIONS:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Formato não suportado: {file.filename}",
+        )
+
+
+def _ndjson_line(payload: Dict[str, Any]) -> bytes:
+    return dumps(payload) + b"\n"
+
+
+async def _ndjson_events(filename: str, future: "asyncio.Future", channel):
+    """Repassa os eventos do worker como linhas NDJSON, conforme chegam"""
+
+    async def finish():
+        try:
+            return await worker_pool.wait(future)
+        finally:
+            # sentinela: todos os eventos do worker já estão na fila antes dele
+            await asyncio.to_thread(channel.put, None)
+
+    done = asyncio.create_task(finish())
+    yield _ndjson_line({"evento": "inicio", "filename": filename})
+
+    while True:
+        event = await asyncio.to_thread(channel.get)
+        if event is None:
+            break
+
+        kind, data = event
+        if kind == "entradas":
+            yield _ndjson_line({"evento": "entradas", **data})
+        elif kind == "duplicatas":
+            for group in data:
+                yield _ndjson_line({"evento": "duplicata", **group})
+        elif kind == "possiveisDuplicatas":
+            for group in data:
+                yield _ndjson_line({"evento": "possivelDuplicata", **group})
+        elif kind == "historico":
+            for match in data:
+                yield _ndjson_line({"evento": "historico", **match})
+        elif kind == "summary":
+            yield _ndjson_line(
+                {"evento": "summary", "success": True, "filename": filename, **data}
+            )
+
+    try:
+        summary = await done
+    except Exception as e:
+        print(f"❌ Erro no processamento (stream): {str(e)}")
+        yield _ndjson_line({"evento": "erro", "success": False, "error": str(e)})
+        return
+
+    if summary is None:
+        yield _ndjson_line(
+            {
+                "evento": "erro",
+                "success": False,
+                "error": "Não foi possível extrair dados estruturados do arquivo",
+            }
+        )
+
+
+@app.post("/analyze/export")
+async def analyze_export(file: UploadFile = File(...)):
+    """
+    Analisa o arquivo e devolve o resultado como planilha Excel (.xlsx),
+    com as abas Resumo, Duplicatas Exatas, Possíveis Duplicatas e Todas as
+    Entradas.
+
+    A planilha é gravada pelo worker em um arquivo temporário direto a partir
+    do resultado da análise (sem JSON) e enviada em blocos; o arquivo é
+    apagado ao fim da resposta.
+    """
+    _check_extension(file)
+
+    fd, path = tempfile.mkstemp(prefix="analise-", suffix=".xlsx")
+    os.close(fd)
+
+    try:
+        content = await _read_upload(file)
+
+        print(f"📗 Exportando análise de {file.filename} para Excel")
+
+        summary = await worker_pool.run(
+            analysis_tasks.run_export, content, str(file.filename), path
+        )
+        del content
+
+        if summary is None:
+            raise HTTPException(
+                status_code=422,
+                detail="Não foi possível extrair dados estruturados do arquivo",
+            )
+
+        stem = os.path.splitext(os.path.basename(str(file.filename)))[0]
+        return FileResponse(
+            path,
+            media_type=XLSX_MEDIA_TYPE,
+            filename=f"analise-duplicatas-{stem}.xlsx",
+            background=BackgroundTask(os.unlink, path),
+        )
+
+    except HTTPException:
+        os.unlink(path)
+        raise
+
+    except (PoolSaturatedError, PoolUnavailableError) as e:
+        os.unlink(path)
+        print(f"⏳ Pool de análise saturado: {e}")
+        return _pool_error_response(e)
+
+    except Exception as e:
+        os.unlink(path)
+        print(f"❌ Erro na exportação: {str(e)}")
+        print(traceback.format_exc())
+
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": str(e),
+                "type": type(e).__name__,
+                "traceback": traceback.format_exc(),
+            },
+        )
 
 
 @app.post("/analyze/debug")
@@ -133,17 +418,12 @@ async def analyze_pdf_debug(file: UploadFile = File(...)):
     Versão do debug que retorna dados brutos para diagnóstico
     """
 
-    temp_path = None
-
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
+        content = await _read_upload(file)
 
         # extrai e retorna dadso brutos
-        raw_text = pdf_reader.extract_raw_text(temp_path)
-        structured_data = pdf_reader.extract_from_pdf(temp_path)
+        debug_data = await worker_pool.run(analysis_tasks.run_debug, content)
+        raw_text = debug_data["raw_text"]
 
         return {
             "sucessess": True,
@@ -152,19 +432,325 @@ async def analyze_pdf_debug(file: UploadFile = File(...)):
                 raw_text[:1000] + "..." if len(raw_text) > 1000 else raw_text
             ),
             "raw_text_length": len(raw_text),
-            "structured_data_count": len(structured_data),
-            "structured_data_sample": structured_data[:5] if structured_data else [],
+            "structured_data_count": debug_data["structured_data_count"],
+            "structured_data_sample": debug_data["structured_data_sample"],
             "lines_detected": len(raw_text.split("\n")),
         }
 
+    except HTTPException:
+        raise
+
+    except (PoolSaturatedError, PoolUnavailableError) as e:
+        return _pool_error_response(e)
+
     except Exception as e:
         return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
+
+
+def _batch_filenames(files: List[UploadFile]) -> List[str]:
+    """Nomes usados no prefixo da posicao; repetidos ganham sufixo (2), (3)..."""
+    names: List[str] = []
+    seen: Dict[str, int] = {}
+
+    for index, file in enumerate(files, start=1):
+        name = file.filename or f"arquivo{index}"
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+
+    return names
+
+
+@app.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(
+    files: List[UploadFile] = File(...),
+    compacto: bool = Query(False, description="Entradas em tabela, grupos por índice"),
+    armazenar: bool = Query(False, description="Guarda o resultado para /results"),
+):
+    """
+    Analisa vários arquivos juntos (ex: os três meses de um trimestre).
+    Os arquivos são extraídos e analisados juntos em um processo do pool
+    (o lote conta como uma análise na admissão); uma única análise roda
+    sobre todas as entradas, encontrando também duplicatas entre arquivos. A posicao de cada entrada é prefixada com
+    o nome do arquivo ("jan.pdf: Pág 3, Linha 12").
+    """
+    if len(files) > config.MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo de {config.MAX_BATCH_FILES} arquivos por lote",
+        )
+
+    for file in files:
+        _check_extension(file)
+
+    names = _batch_filenames(files)
+
+    try:
+        contents = [await _read_upload(file) for file in files]
+        print(f"Processando lote: {', '.join(names)}")
+
+        # extração de cada arquivo + uma análise sobre a união (duplicatas
+        # entre arquivos), em uma tarefa só: o lote ocupa uma vaga do pool
+        analysis_result = await worker_pool.run(
+            analysis_tasks.run_batch_analysis, contents, names, compacto, armazenar
+        )
+        del contents
+
+        if analysis_result is None:
+            raise HTTPException(
+                status_code=422,
+                detail="Não foi possível extrair dados estruturados dos arquivos",
+            )
+
+        print(f"🎯 Lote analisado: {analysis_result['summary']}")
+
+        return OrjsonResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "filename": ", ".join(names),
+                **analysis_result,
+            },
+        )
+
+    except HTTPException:
+        raise
+
+    except (PoolSaturatedError, PoolUnavailableError) as e:
+        print(f"⏳ Pool de análise saturado: {e}")
+        return _pool_error_response(e)
+
+    except Exception as e:
+        print(f"❌ Erro no processamento do lote: {str(e)}")
+        print(traceback.format_exc())
+
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": str(e),
+                "type": type(e).__name__,
+                "traceback": traceback.format_exc(),
+            },
+        )
+
+
+@app.post("/jobs", status_code=202, response_model=JobCreated)
+async def create_job(
+    file: UploadFile = File(...),
+    compacto: bool = Query(False, description="Resultado no formato compacto"),
+    armazenar: bool = Query(False, description="Guarda o resultado para /results"),
+):
+    """
+    Inicia a análise em segundo plano e retorna o id do job imediatamente.
+    O andamento e o resultado final ficam em GET /jobs/{job_id}.
+    """
+    _check_extension(file)
+    content = await _read_upload(file)
+    cache_key, analysis_result = None, None
+    if not armazenar:
+        cache_key, analysis_result = await _lookup_result_cache(content, compacto)
+
+    if analysis_result is not None:
+        # já analisado: o job nasce concluído
+        job = await asyncio.to_thread(job_manager.create, str(file.filename))
+        job.status = Job.CONCLUIDO
+        job.etapa = "concluido"
+        job.resultado = {"success": True, "filename": job.filename, **analysis_result}
+        await asyncio.to_thread(job_manager.save, job, True)
+        print(f"⚡ Job {job.job_id} respondido do cache ({file.filename})")
+    else:
+        channel = await asyncio.to_thread(worker_pool.create_channel)
+        try:
+            future = worker_pool.submit(
+                analysis_tasks.run_analysis,
+                content,
+                channel,
+                cache_key,
+                str(file.filename),
+                compacto,
+                armazenar,
+            )
+        except (PoolSaturatedError, PoolUnavailableError) as e:
+            # recusado: a fila não vai ser usada
+            await asyncio.to_thread(worker_pool.close_channel, channel)
+            return _pool_error_response(e)
+
+        job = await asyncio.to_thread(job_manager.create, str(file.filename))
+        print(f"📥 Job {job.job_id} criado para {file.filename} ({len(content)} bytes)")
+
+        task = asyncio.create_task(_run_job(job, future, channel))
+        _job_tasks.add(task)
+        task.add_done_callback(_job_tasks.discard)
+
+    return OrjsonResponse(
+        status_code=202,
+        content={
+            "jobId": job.job_id,
+            "status": job.status,
+            "statusUrl": f"/jobs/{job.job_id}",
+        },
+    )
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Progresso (página, entradas, etapa) e, ao final, o AnalysisResponse"""
+    job = await asyncio.to_thread(job_manager.get, job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado ou expirado")
+
+    return OrjsonResponse(status_code=200, content=job)
+
+
+async def _run_job(job: Job, future: "asyncio.Future", channel) -> None:
+    events = asyncio.create_task(_consume_job_events(job, channel))
+
+    try:
+        analysis_result = await worker_pool.wait(future)
+
+        if analysis_result is None:
+            job.status = Job.ERRO
+            job.erro = "Não foi possível extrair dados estruturados do arquivo"
+        else:
+            job.status = Job.CONCLUIDO
+            job.resultado = {
+                "success": True,
+                "filename": job.filename,
+                **analysis_result,
+            }
+            print(f"🎯 Job {job.job_id} concluído")
+
+    except Exception as e:
+        print(f"❌ Erro no job {job.job_id}: {str(e)}")
+        job.status = Job.ERRO
+        job.erro = str(e)
+
     finally:
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+        # sentinela: todos os eventos do worker já estão na fila antes dele
+        await asyncio.to_thread(channel.put, None)
+        await events
+
+        job.etapa = "concluido" if job.status == Job.CONCLUIDO else job.status
+        await asyncio.to_thread(job_manager.save, job, True)
+
+
+async def _consume_job_events(job: Job, channel) -> None:
+    while True:
+        event = await asyncio.to_thread(channel.get)
+        if event is None:
+            break
+
+        kind, data = event
+        if kind == "pagina":
+            if job.status == Job.PENDENTE:
+                job.status = Job.PROCESSANDO
+                job.etapa = "extracao"
+            job.pagina = data["pagina"]
+            job.total_paginas = data["totalPaginas"]
+            job.entradas = data["entradas"]
+            await asyncio.to_thread(job_manager.save, job)
+        elif kind == "etapa":
+            # evento atrasado de um job já concluído/com erro: não volta o status
+            if job.finished:
+                continue
+            job.status = Job.PROCESSANDO
+            job.etapa = data
+            await asyncio.to_thread(job_manager.save, job, True)
+
+
+@app.get("/results/{analise_id}", response_model=StoredAnalysis)
+async def get_stored_result(analise_id: str):
+    """Summary e extração de um resultado guardado (armazenar=true)"""
+    analysis = await asyncio.to_thread(analysis_tasks.get_result_store().get, analise_id)
+
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Resultado não encontrado ou expirado")
+
+    return OrjsonResponse(status_code=200, content=analysis)
+
+
+def _parse_filter(value: Optional[str], parse, name: str) -> Optional[int]:
+    if not value:
+        return None
+    parsed = parse(value)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail=f"{name} inválido: {value}")
+    return parsed
+
+
+@app.get("/results/{analise_id}/{lista}", response_model=ResultPage)
+async def get_stored_result_page(
+    analise_id: str,
+    lista: str,
+    apos: Optional[str] = Query(None, description="Cursor \"proximo\" da página anterior"),
+    porPagina: int = Query(50, ge=1, le=config.RESULT_PAGE_MAX),
+    ordenarPor: str = Query("posicao", description=", ".join(SORT_COLUMNS)),
+    ordem: str = Query("asc", pattern="^(asc|desc)$"),
+    fornecedor: Optional[str] = Query(None, description="Início do nome do fornecedor"),
+    codigo: Optional[str] = Query(None, description="Código do fornecedor"),
+    dataInicio: Optional[str] = Query(None, description="DD/MM/YYYY"),
+    dataFim: Optional[str] = Query(None, description="DD/MM/YYYY"),
+    valorMin: Optional[str] = Query(None, description='Valor contábil, ex: "1.234,56"'),
+    valorMax: Optional[str] = Query(None, description='Valor contábil, ex: "1.234,56"'),
+):
+    """
+    Uma página de duplicatas, possiveisDuplicatas ou notasUnicas de um
+    resultado guardado, já filtrada e ordenada no servidor (fornecedor,
+    data e valor de um grupo são os da primeira entrada). A próxima página
+    é pedida com apos = "proximo" desta, mantendo ordenação e filtros
+    """
+    if lista not in LISTS:
+        raise HTTPException(
+            status_code=404, detail=f"Lista inválida: {lista} ({', '.join(LISTS)})"
+        )
+    if ordenarPor not in SORT_COLUMNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"ordenarPor inválido: {ordenarPor} ({', '.join(SORT_COLUMNS)})",
+        )
+
+    filters = ResultFilters(
+        fornecedor=fornecedor,
+        codigo=codigo,
+        data_inicio=_parse_filter(dataInicio, parse_date_ordinal, "dataInicio"),
+        data_fim=_parse_filter(dataFim, parse_date_ordinal, "dataFim"),
+        valor_min=_parse_filter(valorMin, parse_monetary_cents, "valorMin"),
+        valor_max=_parse_filter(valorMax, parse_monetary_cents, "valorMax"),
+    )
+
+    try:
+        page = await asyncio.to_thread(
+            analysis_tasks.get_result_store().page,
+            analise_id,
+            lista,
+            porPagina,
+            ordenarPor,
+            ordem == "desc",
+            filters,
+            apos,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"apos inválido: {e}")
+
+    if page is None:
+        raise HTTPException(status_code=404, detail="Resultado não encontrado ou expirado")
+
+    return OrjsonResponse(
+        status_code=200, content={"analiseId": analise_id, "lista": lista, **page}
+    )
+
+
+@app.delete("/results/{analise_id}", status_code=204)
+async def delete_stored_result(analise_id: str):
+    """Remove um resultado guardado antes de expirar"""
+    deleted = await asyncio.to_thread(
+        analysis_tasks.get_result_store().delete, analise_id
+    )
+
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Resultado não encontrado ou expirado")
+
+    return Response(status_code=204)
 
 
 if __name__ == "__main__":
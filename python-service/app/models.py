@@ -46,6 +46,29 @@ class Duplicate(BaseModel):
     detalhes: List[DuplicateDetail] = Field(default_factory=list)
 
 
+class HistoricalOccurrence(BaseModel):
+    """Ocorrência da entrada em um arquivo analisado anteriormente"""
+
+    arquivo: str = Field(..., description="Nome do arquivo anterior")
+    analisadoEm: float = Field(..., description="Quando o arquivo foi analisado")
+    posicao: str = Field(..., description="Posição no arquivo anterior")
+    codigoFornecedor: str
+    fornecedor: str
+    data: str
+    notaSerie: str
+    valorContabil: str
+    diferencaDias: int = Field(0, description="Diferença em dias da entrada atual")
+
+
+class HistoryMatch(FinancialEntry):
+    """Entrada do arquivo atual encontrada em arquivos anteriores"""
+
+    tipo: str = Field(..., description="DUPLICATA_EXATA ou POSSIVEL_DUPLICATA")
+    motivo: str = Field(..., description="Razão da duplicação")
+    ocorrenciasAnteriores: int = Field(..., description="Ocorrências anteriores")
+    anteriores: List[HistoricalOccurrence] = Field(default_factory=list)
+
+
 class AnalysisSummary(BaseModel):
     """Resumo da análise"""
 
@@ -56,6 +79,28 @@ class AnalysisSummary(BaseModel):
     notasUnicas: int = Field(..., description="Número de notas únicas")
 
 
+class ExtractionInfo(BaseModel):
+    """Contadores da extração do PDF"""
+
+    paginas: int = Field(..., description="Páginas processadas")
+    paginasEmCache: int = Field(
+        0, description="Páginas reaproveitadas do cache (conteúdo já visto)"
+    )
+    paginasComLayout: int = Field(
+        0, description="Páginas lidas com um layout de relatório já aprendido"
+    )
+    linhasDescartadas: int = Field(
+        0, description="Linhas descartadas antes do mapeamento (cabeçalho, sem data/valor)"
+    )
+    linhasPlanilha: int = Field(0, description="Linhas de dados lidas de planilhas")
+    ocrEmCache: int = Field(
+        0, description="OCRs reaproveitados do cache de OCR (mesma imagem)"
+    )
+    segundosOcrEconomizados: float = Field(
+        0.0, description="Tempo de OCR poupado pelo cache de OCR"
+    )
+
+
 class AnalysisResponse(BaseModel):
     """Resposta completa da análise"""
 
@@ -65,6 +110,61 @@ class AnalysisResponse(BaseModel):
     duplicatas: List[Duplicate] = Field(default_factory=list)
     possiveisDuplicatas: List[Duplicate] = Field(default_factory=list)
     notasUnicas: List[FinancialEntry] = Field(default_factory=list)
+    historico: Optional[List[HistoryMatch]] = Field(
+        None, description="Presente quando o índice histórico está ligado"
+    )
+    extracao: Optional[ExtractionInfo] = Field(
+        None, description="Ausente quando o resultado veio do cache de resultados"
+    )
+    analiseId: Optional[str] = Field(
+        None,
+        description="Com armazenar=true: id do resultado guardado (listas em /results)",
+    )
+    expiraEm: Optional[float] = Field(
+        None, description="Com armazenar=true: quando o resultado guardado expira"
+    )
+
+
+class BatchFileInfo(BaseModel):
+    """Arquivo de uma análise em lote"""
+
+    filename: str = Field(..., description="Nome usado no prefixo da posicao")
+    entradas: int = Field(..., description="Entradas extraídas do arquivo")
+    extracao: Optional[ExtractionInfo] = None
+
+
+class BatchAnalysisResponse(AnalysisResponse):
+    """Resposta do /analyze/batch (filename = nomes separados por vírgula)"""
+
+    arquivos: List[BatchFileInfo] = Field(default_factory=list)
+
+
+class StoredAnalysis(BaseModel):
+    """Resultado guardado no servidor (GET /results/{analise_id})"""
+
+    analiseId: str
+    filename: str
+    criadoEm: float
+    expiraEm: float
+    summary: AnalysisSummary
+    extracao: Optional[ExtractionInfo] = None
+
+
+class ResultPage(BaseModel):
+    """Página de uma lista de um resultado guardado"""
+
+    analiseId: str
+    lista: str = Field(..., description="duplicatas, possiveisDuplicatas ou notasUnicas")
+    itens: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="Duplicate (duplicatas/possiveisDuplicatas) ou FinancialEntry (notasUnicas)",
+    )
+    total: int = Field(..., description="Itens que atendem aos filtros")
+    porPagina: int
+    totalPaginas: int
+    proximo: Optional[str] = Field(
+        None, description="Cursor da próxima página (parâmetro apos); null na última"
+    )
 
 
 class AnalysisError(BaseModel):
@@ -73,3 +173,36 @@ class AnalysisError(BaseModel):
     success: bool = Field(False)
     error: str = Field(..., description="Mensagem de erro")
     detail: Optional[Dict[str, Any]] = Field(None, description="Detalhes adicionais")
+
+
+class JobCreated(BaseModel):
+    """Resposta do POST /jobs"""
+
+    jobId: str = Field(..., description="Identificador do job")
+    status: str = Field(..., description="pendente, processando, concluido ou erro")
+    statusUrl: str = Field(..., description="URL para consultar o andamento")
+
+
+class JobProgress(BaseModel):
+    """Andamento de um job"""
+
+    pagina: int = Field(0, description="Última página processada")
+    totalPaginas: int = Field(0, description="Total de páginas do PDF")
+    entradasExtraidas: int = Field(0, description="Entradas extraídas até agora")
+    descricao: str = Field("", description='Ex: "página 120/540"')
+
+
+class JobStatus(BaseModel):
+    """Estado de um job de análise"""
+
+    jobId: str
+    filename: str
+    status: str = Field(..., description="pendente, processando, concluido ou erro")
+    etapa: str = Field(..., description="fila, extracao, analise ou concluido")
+    progresso: JobProgress
+    resultado: Optional[AnalysisResponse] = Field(
+        None, description="Resultado final quando status = concluido"
+    )
+    erro: Optional[str] = None
+    criadoEm: float
+    atualizadoEm: float
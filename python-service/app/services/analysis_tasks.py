@@ -0,0 +1,466 @@
+"""
+Tarefas executadas dentro dos processos do AnalysisWorkerPool.
+Cada processo mantém suas próprias instâncias de PDFReader/DuplicateAnalyzer.
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from app import config
+from app.services.pdf_reader import ExtractionStats, PageCallback, PDFReader, PDFSource
+from app.services.xlsx_reader import ExcelReader, parse_column_aliases
+from app.services.analyzer import DuplicateAnalyzer
+from app.services.excel_export import write_analysis_workbook
+from app.services.history_index import HistoryIndex
+from app.services.ledger import AnalysisResult, LedgerEntry
+from app.services.result_store import ResultStore
+from app.utils.sqlite_cache import SQLiteCache
+
+# grupos de duplicatas por mensagem no modo streaming
+STREAM_BATCH_SIZE = 200
+
+# formatos aceitos (PDF pelo PDFReader, planilhas pelo ExcelReader)
+SUPPORTED_EXTENSIONS = (".pdf",) + ExcelReader.EXTENSIONS
+
+# Incrementar quando uma mudança na extração/análise alterar o resultado
+# de um mesmo PDF (invalida o cache de resultados)
+RESULT_CACHE_VERSION = 3
+
+_pdf_reader: Optional[PDFReader] = None
+_excel_reader: Optional[ExcelReader] = None
+_analyzer: Optional[DuplicateAnalyzer] = None
+_result_cache: Optional[SQLiteCache] = None
+_page_cache: Optional[SQLiteCache] = None
+_ocr_cache: Optional[SQLiteCache] = None
+_layout_cache: Optional[SQLiteCache] = None
+_history_index: Optional[HistoryIndex] = None
+_result_store: Optional[ResultStore] = None
+
+
+def get_pdf_reader() -> PDFReader:
+    global _pdf_reader
+    if _pdf_reader is None:
+        _pdf_reader = PDFReader(
+            parallel_workers=config.PDF_PARALLEL_WORKERS,
+            parallel_min_pages=config.PDF_PARALLEL_MIN_PAGES,
+            page_cache=get_page_cache(),
+            ocr_workers=config.OCR_WORKERS,
+            ocr_dpi=config.OCR_DPI,
+            ocr_max_dpi=config.OCR_MAX_DPI,
+            ocr_min_confidence=config.OCR_MIN_CONFIDENCE,
+            ocr_lang=config.OCR_LANG,
+            ocr_cache=get_ocr_cache(),
+            layout_cache=get_layout_cache(),
+            layout_engine=config.PDF_LAYOUT_ENGINE,
+            line_tolerance=config.PDF_LINE_TOLERANCE,
+        )
+    return _pdf_reader
+
+
+def get_excel_reader() -> ExcelReader:
+    global _excel_reader
+    if _excel_reader is None:
+        _excel_reader = ExcelReader(
+            columns=parse_column_aliases(config.SPREADSHEET_COLUMNS),
+            chunk_rows=config.SPREADSHEET_CHUNK_ROWS,
+        )
+    return _excel_reader
+
+
+def get_analyzer() -> DuplicateAnalyzer:
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = DuplicateAnalyzer(
+            blocking_keys=config.ANALYZER_BLOCKING_KEYS,
+            date_window_days=config.ANALYZER_DATE_WINDOW_DAYS,
+        )
+    return _analyzer
+
+
+def get_result_cache() -> SQLiteCache:
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = SQLiteCache(
+            config.RESULT_CACHE_PATH, config.RESULT_CACHE_MAX_BYTES
+        )
+    return _result_cache
+
+
+def get_page_cache() -> SQLiteCache:
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = SQLiteCache(config.PAGE_CACHE_PATH, config.PAGE_CACHE_MAX_BYTES)
+    return _page_cache
+
+
+def get_ocr_cache() -> SQLiteCache:
+    global _ocr_cache
+    if _ocr_cache is None:
+        _ocr_cache = SQLiteCache(config.OCR_CACHE_PATH, config.OCR_CACHE_MAX_BYTES)
+    return _ocr_cache
+
+
+def get_layout_cache() -> SQLiteCache:
+    global _layout_cache
+    if _layout_cache is None:
+        _layout_cache = SQLiteCache(
+            config.LAYOUT_CACHE_PATH, config.LAYOUT_CACHE_MAX_BYTES
+        )
+    return _layout_cache
+
+
+def get_history_index() -> Optional[HistoryIndex]:
+    """Índice histórico, ou None quando HISTORY_INDEX_PATH não está configurado"""
+    global _history_index
+    if _history_index is None and config.HISTORY_INDEX_PATH:
+        _history_index = HistoryIndex(
+            config.HISTORY_INDEX_PATH, config.HISTORY_RETENTION_DAYS
+        )
+    return _history_index
+
+
+def get_result_store() -> ResultStore:
+    global _result_store
+    if _result_store is None:
+        _result_store = ResultStore(
+            config.RESULT_STORE_PATH, config.RESULT_STORE_TTL_SECONDS
+        )
+    return _result_store
+
+
+def result_cache_enabled() -> bool:
+    # com o índice histórico o resultado depende do que já foi analisado antes
+    return get_result_cache().enabled and get_history_index() is None
+
+
+def _extract(
+    source: PDFSource,
+    filename: str,
+    on_page: Optional[PageCallback] = None,
+    stats: Optional[ExtractionStats] = None,
+) -> List[LedgerEntry]:
+    """Extrai as entradas pelo leitor do formato (extensão do nome do arquivo)"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in ExcelReader.EXTENSIONS:
+        return get_excel_reader().extract(source, extension, on_page, stats)
+    return get_pdf_reader().extract_from_pdf(source, on_page=on_page, stats=stats)
+
+
+def _source_hash(source: PDFSource) -> str:
+    digest = hashlib.sha256()
+    if isinstance(source, str):
+        with open(source, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                digest.update(chunk)
+    else:
+        digest.update(source)
+    return digest.hexdigest()
+
+
+def _analyze(
+    structured_data: List[LedgerEntry],
+    filename: str,
+    source: Optional[PDFSource] = None,
+    arquivo_hash: Optional[str] = None,
+) -> AnalysisResult:
+    """
+    DuplicateAnalyzer.analyze, com o índice histórico quando configurado
+    (arquivo_hash é calculado a partir de source se não informado)
+    """
+    history = get_history_index()
+    if history is None:
+        return get_analyzer().analyze(structured_data)
+
+    if arquivo_hash is None:
+        arquivo_hash = _source_hash(source)
+
+    return get_analyzer().analyze(structured_data, history, arquivo_hash, filename)
+
+
+def _result_dict(result: AnalysisResult, compact: bool) -> Dict[str, Any]:
+    return result.to_compact_dict() if compact else result.to_dict()
+
+
+def result_cache_key(content: bytes, compact: bool = False) -> str:
+    """
+    Chave do cache de resultados: hash do conteúdo do arquivo + configuração
+    do PDFReader/ExcelReader/DuplicateAnalyzer que influencia o resultado
+    (+ formato da resposta, completo ou compacto)
+    """
+    reader = get_pdf_reader()
+    analyzer = get_analyzer()
+    settings = json.dumps(
+        [
+            RESULT_CACHE_VERSION,
+            reader.tolerance,
+            reader.ocr_dpi,
+            reader.ocr_max_dpi,
+            reader.ocr_min_confidence,
+            reader.ocr_lang,
+            reader.layout_cache is not None and reader.layout_cache.enabled,
+            reader.layout_engine,
+            reader.line_tolerance,
+            sorted(get_excel_reader().columns.items()),
+            analyzer.similarity_threshold,
+            list(analyzer.blocking_keys),
+            analyzer.prefix_length,
+            analyzer.date_window_days,
+            compact,
+        ]
+    )
+    settings_hash = hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+
+    return f"{hashlib.sha256(content).hexdigest()}:{settings_hash}"
+
+
+def get_cached_result(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Resultado de uma análise anterior do mesmo PDF (mesma configuração)"""
+    if not result_cache_enabled():
+        return None
+
+    cached = get_result_cache().get(cache_key)
+    if cached is None:
+        return None
+
+    return orjson.loads(zlib.decompress(cached))
+
+
+def _store_result(cache_key: str, result: Dict[str, Any]) -> None:
+    if not result_cache_enabled():
+        return
+
+    payload = orjson.dumps(result)
+    get_result_cache().set(cache_key, zlib.compress(payload, 1))
+
+
+def run_analysis(
+    source: PDFSource,
+    channel: Any = None,
+    cache_key: Optional[str] = None,
+    filename: str = "",
+    compact: bool = False,
+    store: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Extração (PDF ou planilha, pela extensão de filename) + análise de duplicatas.
+    Retorna None quando nada pôde ser extraído do arquivo.
+
+    channel: fila opcional (AnalysisWorkerPool.create_channel) que recebe
+    eventos (tipo, dados) de progresso durante o processamento
+    cache_key: se informada (result_cache_key), o resultado é guardado no
+    cache de resultados
+    filename: nome do arquivo (formato) registrado no índice histórico
+    compact: resultado no formato compacto (AnalysisResult.to_compact_dict)
+    store: guarda o resultado no ResultStore e retorna só summary, extracao,
+        analiseId e expiraEm (as listas são lidas em páginas em /results)
+    O resultado inclui "extracao" (páginas processadas e vindas do cache
+    de páginas), que não é guardado no cache de resultados
+    """
+    on_page = None
+    if channel is not None:
+        extracted = 0
+
+        def on_page(page_num: int, total_pages: int, entries: List[LedgerEntry]):
+            nonlocal extracted
+            extracted += len(entries)
+            channel.put(
+                (
+                    "pagina",
+                    {
+                        "pagina": page_num,
+                        "totalPaginas": total_pages,
+                        "entradas": extracted,
+                    },
+                )
+            )
+
+    stats = ExtractionStats()
+    structured_data = _extract(source, filename, on_page, stats)
+
+    if not structured_data:
+        return None
+
+    print(f"✅ Extraídos {len(structured_data)} registros")
+
+    if channel is not None:
+        channel.put(("etapa", "analise"))
+
+    analysis_result = _analyze(structured_data, filename, source)
+    del structured_data
+
+    if store:
+        extracao = stats.to_dict()
+        stored = get_result_store().save(analysis_result, filename, extracao)
+        return {"summary": analysis_result.summary(), "extracao": extracao, **stored}
+
+    result = _result_dict(analysis_result, compact)
+
+    if cache_key is not None:
+        _store_result(cache_key, result)
+
+    result["extracao"] = stats.to_dict()
+    return result
+
+
+def run_analysis_stream(
+    source: PDFSource, channel: Any, filename: str = ""
+) -> Optional[Dict[str, Any]]:
+    """
+    Variante do run_analysis para a resposta NDJSON: em vez de devolver o
+    resultado inteiro, envia pelo channel, em ordem:
+      ("entradas", ...) por página, ("duplicatas", [grupos]),
+      ("possiveisDuplicatas", [grupos]) e ("historico", [correspondências])
+      em lotes e por fim
+      ("summary", {"summary": ..., "extracao": ...}).
+    Retorna o summary, ou None quando nada pôde ser extraído do arquivo.
+    """
+
+    def on_page(page_num: int, total_pages: int, entries: List[LedgerEntry]):
+        channel.put(
+            (
+                "entradas",
+                {
+                    "pagina": page_num,
+                    "totalPaginas": total_pages,
+                    "entradas": [entry.to_dict() for entry in entries],
+                },
+            )
+        )
+
+    stats = ExtractionStats()
+    structured_data = _extract(source, filename, on_page, stats)
+
+    if not structured_data:
+        return None
+
+    analysis_result = _analyze(structured_data, filename, source)
+    del structured_data
+
+    for kind, groups in (
+        ("duplicatas", analysis_result.duplicatas),
+        ("possiveisDuplicatas", analysis_result.possiveis_duplicatas),
+        ("historico", analysis_result.historico or []),
+    ):
+        for start in range(0, len(groups), STREAM_BATCH_SIZE):
+            batch = groups[start : start + STREAM_BATCH_SIZE]
+            channel.put((kind, [group.to_dict() for group in batch]))
+
+    summary = analysis_result.summary()
+    channel.put(("summary", {"summary": summary, "extracao": stats.to_dict()}))
+    return summary
+
+
+def run_export(
+    source: PDFSource, filename: str, path: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Extração + análise gravando o resultado direto em uma planilha .xlsx
+    (excel_export) em path, sem montar o resultado em JSON.
+    Retorna o summary, ou None quando nada pôde ser extraído do arquivo.
+    """
+    structured_data = _extract(source, filename)
+
+    if not structured_data:
+        return None
+
+    analysis_result = _analyze(structured_data, filename, source)
+    del structured_data
+
+    write_analysis_workbook(analysis_result, path, filename)
+    return analysis_result.summary()
+
+
+def _extract_batch_file(source: PDFSource, filename: str) -> Dict[str, Any]:
+    """
+    Extração de um arquivo do lote. As entradas saem marcadas com o arquivo
+    de origem (posicao = "arquivo: Pág X, Linha Y").
+
+    Returns:
+        {"entradas": [LedgerEntry], "extracao": {...}, "hash": hash do arquivo ou None}
+    """
+    stats = ExtractionStats()
+    entries = _extract(source, filename, stats=stats)
+
+    for entry in entries:
+        entry.origem = filename
+
+    print(f"✅ Extraídos {len(entries)} registros de {filename}")
+
+    return {
+        "entradas": entries,
+        "extracao": stats.to_dict(),
+        # só o índice histórico usa o hash
+        "hash": _source_hash(source) if get_history_index() is not None else None,
+    }
+
+
+def run_batch_analysis(
+    sources: List[PDFSource],
+    filenames: List[str],
+    compact: bool = False,
+    store: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Análise em lote em uma única tarefa do pool: extrai os arquivos um a um
+    e roda uma análise só sobre a união das entradas, encontrando duplicatas
+    entre arquivos. Uma tarefa por lote: o lote é admitido inteiro no pool
+    (qualquer tamanho até MAX_BATCH_FILES) e as entradas não voltam ao
+    processo do servidor entre a extração e a análise.
+    No índice histórico o lote é registrado como um arquivo só.
+    store: como no run_analysis (resultado no ResultStore)
+
+    Returns:
+        {"arquivos": [...], **resultado}, ou None se nenhum arquivo tem entradas
+    """
+    structured_data: List[LedgerEntry] = []
+    arquivos: List[Dict[str, Any]] = []
+    hashes: List[str] = []
+
+    for source, filename in zip(sources, filenames):
+        item = _extract_batch_file(source, filename)
+        structured_data.extend(item["entradas"])
+        arquivos.append(
+            {
+                "filename": filename,
+                "entradas": len(item["entradas"]),
+                "extracao": item["extracao"],
+            }
+        )
+        if item["hash"]:
+            hashes.append(item["hash"])
+
+    if not structured_data:
+        return None
+
+    batch_hash = None
+    if hashes:
+        batch_hash = hashlib.sha256("|".join(sorted(hashes)).encode("utf-8")).hexdigest()
+
+    filename = ", ".join(filenames)
+    analysis_result = _analyze(structured_data, filename, arquivo_hash=batch_hash)
+    del structured_data
+
+    if store:
+        stored = get_result_store().save(analysis_result, filename)
+        return {"arquivos": arquivos, "summary": analysis_result.summary(), **stored}
+
+    return {"arquivos": arquivos, **_result_dict(analysis_result, compact)}
+
+
+def run_debug(source: PDFSource) -> Dict[str, Any]:
+    """Extração com dados brutos para diagnóstico"""
+    reader = get_pdf_reader()
+
+    raw_text = reader.extract_raw_text(source)
+    structured_data = reader.extract_from_pdf(source)
+
+    return {
+        "raw_text": raw_text,
+        "structured_data_count": len(structured_data),
+        "structured_data_sample": [entry.to_dict() for entry in structured_data[:5]],
+    }
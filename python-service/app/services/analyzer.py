@@ -1,8 +1,27 @@
-from typing import List, Dict, Any, Set
-from datetime import datetime
-from rapidfuzz import fuzz
-from app.utils.normalizer import normalize_text
-from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Set, Sequence, Tuple, Union
+import json
+import numpy as np
+from rapidfuzz import fuzz, process
+from app.services.history_index import HistoryIndex
+from app.services.ledger import AnalysisResult, DuplicateGroup, HistoryMatch, LedgerEntry
+from app.utils.normalizer import normalize_supplier
+
+# codigo_fornecedor, data (ordinal), nota, valor (centavos)
+ExactKey = Tuple[str, Optional[int], str, int]
+
+
+class PreparedEntry:
+    """
+    Entrada com as chaves usadas pela análise calculadas uma única vez
+    (em vez de recalculadas em cada etapa/comparação)
+    """
+
+    __slots__ = ("entry", "exact_key", "fornecedor_norm")
+
+    def __init__(self, entry: LedgerEntry, exact_key: ExactKey, fornecedor_norm: str):
+        self.entry = entry
+        self.exact_key = exact_key
+        self.fornecedor_norm = fornecedor_norm
 
 
 class DuplicateAnalyzer:
@@ -10,15 +29,51 @@ class DuplicateAnalyzer:
     Analisador de duplicatas com comparação fuzzy e múltiplos critérios
     """
 
-    def __init__(self, similarity_threshold: float = 85.0, max_workers: int = 4):
+    # Chaves de bloqueio disponíveis para a etapa fuzzy
+    #   valor:   valorContabil idêntico
+    #   codigo:  codigoFornecedor idêntico
+    #   prefixo: primeiros prefix_length caracteres do fornecedor normalizado
+    #   token:   primeira palavra do fornecedor normalizado
+    BLOCKING_KEYS = ("valor", "codigo", "prefixo", "token")
+
+    # Máximo de células por matriz do cdist (blocos maiores são processados em faixas)
+    CDIST_MAX_CELLS = 4_000_000
+    # Linhas por faixa (limita a matriz das linhas da faixa entre si)
+    CDIST_CHUNK_ROWS = 1024
+    # Abaixo disso o cdist roda em uma thread só (criar threads custa mais)
+    CDIST_PARALLEL_MIN_CELLS = 250_000
+
+    def __init__(
+        self,
+        similarity_threshold: float = 85.0,
+        max_workers: int = 4,
+        blocking_keys: Sequence[str] = (),
+        prefix_length: int = 3,
+        date_window_days: int = 0,
+    ):
         """
         Args:
             similarity_threshold: Threshold para similaridade (0-100)
+            max_workers: threads do rapidfuzz no cálculo das matrizes de similaridade
+            blocking_keys: só são comparados pares que compartilham todas estas
+                chaves (ver BLOCKING_KEYS); vazio = compara com todos os grupos
+            prefix_length: tamanho do prefixo usado pela chave "prefixo"
+            date_window_days: mesmo fornecedor e valor com datas até esta
+                distância (dias) são possíveis duplicatas; 0 desliga a etapa
         """
+        invalid = [k for k in blocking_keys if k not in self.BLOCKING_KEYS]
+        if invalid:
+            raise ValueError(f"Chaves de bloqueio inválidas: {invalid}")
+
         self.similarity_threshold = similarity_threshold
         self.max_workers = max_workers
+        self.blocking_keys = tuple(blocking_keys)
+        self.prefix_length = prefix_length
+        self.date_window_days = date_window_days
 
-    def analyze_duplicates(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_duplicates(
+        self, data: List[Union[LedgerEntry, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
         """
         Analisa dados e identifica duplicatas
 
@@ -28,6 +83,23 @@ class DuplicateAnalyzer:
         Returns:
             Dicionário com duplicatas, possíveis duplicatas e resumo
         """
+        return self.analyze(data).to_dict()
+
+    def analyze(
+        self,
+        data: List[Union[LedgerEntry, Dict[str, Any]]],
+        history: Optional[HistoryIndex] = None,
+        arquivo_hash: str = "",
+        arquivo: str = "",
+    ) -> AnalysisResult:
+        """
+        Mesma análise do analyze_duplicates, mas devolve o resultado na forma
+        compacta (AnalysisResult), sem converter para dicts
+
+        Com history, as entradas também são procuradas em arquivos analisados
+        anteriormente (AnalysisResult.historico) e depois gravadas no índice
+        em nome de arquivo_hash/arquivo
+        """
         print(f"🔍 Iniciando análise de {len(data)} registros...")
 
         # Validação
@@ -35,7 +107,10 @@ class DuplicateAnalyzer:
         print(f"✅ {len(valid_entries)} registros válidos")
 
         if not valid_entries:
-            return self._empty_result(len(data))
+            return AnalysisResult(len(data))
+
+        # Chaves calculadas uma vez por entrada
+        prepared = self._prepare_entries(valid_entries)
 
         # Análise
         duplicatas_exatas = []
@@ -43,13 +118,13 @@ class DuplicateAnalyzer:
         processados = set()
 
         # ETAPA 1: Duplicatas Exatas
-        exact_groups = self._group_by_exact_match(valid_entries)
+        exact_groups = self._group_by_exact_match(prepared)
 
         for key, entries in exact_groups.items():
             if len(entries) > 1:
                 # Marca como processados
                 for entry in entries:
-                    processados.add(self._create_unique_key(entry))
+                    processados.add(entry.exact_key)
 
                 duplicatas_exatas.append(
                     self._format_duplicate_group(
@@ -59,14 +134,30 @@ class DuplicateAnalyzer:
                     )
                 )
 
-        # ETAPA 2: Possíveis Duplicatas (com fuzzy matching)
-        possible_groups = self._group_by_similar_match(valid_entries, processados)
+        # ETAPA 2: Mesmo fornecedor e valor com datas próximas
+        if self.date_window_days > 0:
+            for entries in self._group_by_date_window(prepared, processados):
+                # Marca como processados
+                for entry in entries:
+                    processados.add(entry.exact_key)
+
+                possiveis_duplicatas.append(
+                    self._format_duplicate_group(
+                        entries,
+                        "POSSIVEL_DUPLICATA",
+                        "Mesmo fornecedor e valor com datas até "
+                        f"{self.date_window_days} dias de diferença",
+                    )
+                )
+
+        # ETAPA 3: Possíveis Duplicatas (com fuzzy matching)
+        possible_groups = self._group_by_similar_match(prepared, processados)
 
         for key, entries in possible_groups.items():
             if len(entries) > 1:
                 # Marca como processados
                 for entry in entries:
-                    processados.add(self._create_unique_key(entry))
+                    processados.add(entry.exact_key)
 
                 possiveis_duplicatas.append(
                     self._format_duplicate_group(
@@ -76,32 +167,45 @@ class DuplicateAnalyzer:
                     )
                 )
 
-        # ETAPA 3: Notas únicas
+        # ETAPA 4: Notas únicas
         notas_unicas = [
-            entry
-            for entry in valid_entries
-            if self._create_unique_key(entry) not in processados
+            prepared_entry.entry
+            for prepared_entry in prepared
+            if prepared_entry.exact_key not in processados
         ]
 
+        # ETAPA 5: Arquivos analisados anteriormente
+        historico = None
+        if history is not None:
+            historico = self._match_history(prepared, history, arquivo_hash)
+            history.record(
+                arquivo_hash,
+                arquivo,
+                (
+                    (p.entry, p.fornecedor_norm, self._history_block(p))
+                    for p in prepared
+                ),
+            )
+
         print(f"📊 Análise concluída:")
         print(f"   - Duplicatas exatas: {len(duplicatas_exatas)}")
         print(f"   - Possíveis duplicatas: {len(possiveis_duplicatas)}")
         print(f"   - Notas únicas: {len(notas_unicas)}")
-
-        return {
-            "summary": {
-                "totalItensProcessados": len(data),
-                "itensValidos": len(valid_entries),
-                "duplicatasExatas": len(duplicatas_exatas),
-                "possiveisDuplicatas": len(possiveis_duplicatas),
-                "notasUnicas": len(notas_unicas),
-            },
-            "duplicatas": duplicatas_exatas,
-            "possiveisDuplicatas": possiveis_duplicatas,
-            "notasUnicas": notas_unicas,
-        }
-
-    def _filter_valid_entries(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if historico is not None:
+            print(f"   - Já vistas em outros arquivos: {len(historico)}")
+
+        return AnalysisResult(
+            total=len(data),
+            validos=len(valid_entries),
+            duplicatas=duplicatas_exatas,
+            possiveis_duplicatas=possiveis_duplicatas,
+            notas_unicas=notas_unicas,
+            historico=historico,
+        )
+
+    def _filter_valid_entries(
+        self, data: List[Union[LedgerEntry, Dict[str, Any]]]
+    ) -> List[LedgerEntry]:
         """Filtra apenas entradas válidas"""
         valid = []
 
@@ -109,24 +213,34 @@ class DuplicateAnalyzer:
             if not entry:
                 continue
 
-            # Validações
-            valor = entry.get("valorContabil", "0,00")
-            fornecedor = entry.get("fornecedor", "")
-            data_entry = entry.get("data", "")
+            if isinstance(entry, dict):
+                entry = LedgerEntry.from_dict(entry)
 
+            # Validações
             if (
-                valor != "0,00"
-                and fornecedor
-                and fornecedor != "Desconhecido"
-                and data_entry
+                entry.valor_contabil_centavos != 0
+                and entry.fornecedor
+                and entry.fornecedor != "Desconhecido"
+                and entry.data_ordinal is not None
             ):
                 valid.append(entry)
 
         return valid
 
+    def _prepare_entries(self, entries: List[LedgerEntry]) -> List[PreparedEntry]:
+        """Calcula chave exata e fornecedor normalizado de cada entrada"""
+        return [
+            PreparedEntry(
+                entry,
+                self._create_exact_key(entry),
+                normalize_supplier(entry.fornecedor),
+            )
+            for entry in entries
+        ]
+
     def _group_by_exact_match(
-        self, entries: List[Dict[str, Any]]
-    ) -> Dict[str, List[Dict[str, Any]]]:
+        self, entries: List[PreparedEntry]
+    ) -> Dict[ExactKey, List[PreparedEntry]]:
         """
         Agrupa por correspondência exata
         Chave: codigo_fornecedor|data|nota|valor
@@ -134,7 +248,7 @@ class DuplicateAnalyzer:
         groups = {}
 
         for entry in entries:
-            key = self._create_exact_key(entry)
+            key = entry.exact_key
 
             if key not in groups:
                 groups[key] = []
@@ -142,142 +256,296 @@ class DuplicateAnalyzer:
 
         return groups
 
+    def _group_by_date_window(
+        self, entries: List[PreparedEntry], processados: Set[ExactKey]
+    ) -> List[List[PreparedEntry]]:
+        """
+        Agrupa entradas do mesmo fornecedor (normalizado) e valor cujas
+        datas ficam a até date_window_days da primeira do grupo
+        Ignora registros já processados
+
+        Cada fornecedor/valor é ordenado por data e percorrido uma vez
+        (O(n log n)), sem comparar todos os pares de datas
+        """
+        # (fornecedor, valor) -> [(posição original, entrada)]
+        index: Dict[Tuple[str, int], List[Tuple[int, PreparedEntry]]] = {}
+
+        for position, entry in enumerate(entries):
+            if entry.exact_key in processados:
+                continue
+
+            key = (entry.fornecedor_norm, entry.entry.valor_contabil_centavos)
+            index.setdefault(key, []).append((position, entry))
+
+        # (posição da primeira entrada, grupo) para manter a ordem original
+        found: List[Tuple[int, List[PreparedEntry]]] = []
+
+        for members in index.values():
+            if len(members) < 2:
+                continue
+
+            members.sort(key=lambda item: (item[1].entry.data_ordinal, item[0]))
+
+            start = 0
+            for i in range(1, len(members) + 1):
+                if i < len(members):
+                    first_date = members[start][1].entry.data_ordinal
+                    if members[i][1].entry.data_ordinal - first_date <= self.date_window_days:
+                        continue
+
+                if i - start > 1:
+                    window = members[start:i]
+                    found.append(
+                        (min(position for position, _ in window), [e for _, e in window])
+                    )
+                start = i
+
+        found.sort(key=lambda item: item[0])
+        return [group for _, group in found]
+
     def _group_by_similar_match(
-        self, entries: List[Dict[str, Any]], processados: Set[str]
-    ) -> Dict[str, List[Dict[str, Any]]]:
+        self, entries: List[PreparedEntry], processados: Set[ExactKey]
+    ) -> Dict[Tuple[str, int], List[PreparedEntry]]:
         """
         Agrupa por correspondência similar (fuzzy)
         Ignora registros já processados
+
+        Cada entrada só é comparada com os grupos do mesmo bloco
+        (ver blocking_keys). As similaridades de cada bloco são calculadas
+        em lote com rapidfuzz.process.cdist; o agrupamento segue a ordem
+        original: cada entrada entra no primeiro grupo cuja referência
+        (primeira entrada) atinge o threshold
         """
-        groups = {}
+        # bloco -> [(posição original, entrada)]
+        blocks: Dict[Tuple[Any, ...], List[Tuple[int, PreparedEntry]]] = {}
 
-        for entry in entries:
+        for position, entry in enumerate(entries):
             # Pula se já foi processado
-            if self._create_unique_key(entry) in processados:
+            if entry.exact_key in processados:
                 continue
 
-            # Normaliza fornecedor e valor
-            fornecedor_norm = normalize_text(entry.get("fornecedor", ""))
-            valor = entry.get("valorContabil", "0,00")
-
-            # Procura grupo similar existente
-            found_group = False
-
-            for existing_key, existing_entries in groups.items():
-                # Compara com primeiro elemento do grupo
-                ref_entry = existing_entries[0]
-                ref_fornecedor_norm = normalize_text(ref_entry.get("fornecedor", ""))
-                ref_valor = ref_entry.get("valorContabil", "0,00")
-
-                # Verifica similaridade
-                if self._is_similar(
-                    fornecedor_norm, ref_fornecedor_norm, valor, ref_valor
-                ):
-                    existing_entries.append(entry)
-                    found_group = True
-                    break
-
-            # Se não encontrou grupo similar, cria novo
-            if not found_group:
-                key = f"{fornecedor_norm}|{valor}"
-                if key not in groups:
-                    groups[key] = []
-                groups[key].append(entry)
+            blocks.setdefault(self._blocking_key(entry), []).append((position, entry))
+
+        # (posição da referência, chave, [(posição, entrada)]) para manter a ordem original
+        created: List[Tuple[int, Tuple[str, int], List[Tuple[int, PreparedEntry]]]] = []
+
+        for members in blocks.values():
+            names = [entry.fornecedor_norm for _, entry in members]
+            leaders = self._assign_leaders(names)
+
+            block_groups: Dict[int, List[Tuple[int, PreparedEntry]]] = {}
+            for idx, leader in enumerate(leaders):
+                position, entry = members[idx]
+                if leader == idx:
+                    key = (entry.fornecedor_norm, entry.entry.valor_contabil_centavos)
+                    block_groups[idx] = []
+                    created.append((position, key, block_groups[idx]))
+                block_groups[leader].append((position, entry))
+
+        merged: Dict[Tuple[str, int], List[Tuple[int, PreparedEntry]]] = {}
+        for _, key, members_group in sorted(created, key=lambda item: item[0]):
+            if key in merged:
+                # mesma chave em blocos diferentes: une mantendo a ordem original
+                merged[key] = sorted(
+                    merged[key] + members_group, key=lambda item: item[0]
+                )
+            else:
+                merged[key] = members_group
 
-        return groups
+        return {
+            key: [entry for _, entry in members_group]
+            for key, members_group in merged.items()
+        }
 
-    def _is_similar(
-        self, fornecedor1: str, fornecedor2: str, valor1: str, valor2: str
-    ) -> bool:
+    def _assign_leaders(self, names: List[str]) -> List[int]:
         """
-        Verifica se dois registros são similares
+        Para cada nome, o índice da referência do grupo em que ele entra
+        (o próprio índice quando abre um grupo novo).
 
-        Critérios:
-        - Fornecedor com similaridade >= threshold
-        - Valor exatamente igual
+        Em faixas de linhas: cada faixa é comparada só com as referências já
+        conhecidas (O(n·grupos), não O(n²)); as linhas sem correspondência
+        são comparadas entre si para achar as referências novas da própria
+        faixa, na ordem original.
         """
-        # Valor deve ser exatamente igual
-        similarity = fuzz.ratio(fornecedor1, fornecedor2)
-
-        # print(valor1, valor2)
+        n = len(names)
+        leaders = list(range(n))
+        if n < 2:
+            return leaders
+
+        leader_idx = [0]
+        leader_names = [names[0]]
+        start = 1
+
+        while start < n:
+            rows = max(
+                1,
+                min(self.CDIST_CHUNK_ROWS, self.CDIST_MAX_CELLS // len(leader_idx)),
+            )
+            stop = min(n, start + rows)
+            chunk = names[start:stop]
+
+            scores = self._cdist(chunk, leader_names)
+            unmatched: List[int] = []
+            for row in range(len(chunk)):
+                # referências em ordem de índice: a primeira é a mais antiga
+                hits = np.flatnonzero(scores[row] >= self.similarity_threshold)
+                if hits.size:
+                    leaders[start + row] = leader_idx[int(hits[0])]
+                else:
+                    unmatched.append(row)
+
+            if unmatched:
+                # linhas sem referência anterior à faixa: uma abre grupo e as
+                # seguintes podem entrar nele (ordem sequencial dentro da faixa)
+                pending = [chunk[row] for row in unmatched]
+                within = self._cdist(pending, pending)
+                is_new = np.zeros(len(unmatched), dtype=bool)
+                for k, row in enumerate(unmatched):
+                    candidates = np.flatnonzero(
+                        is_new[:k] & (within[k, :k] >= self.similarity_threshold)
+                    )
+                    if candidates.size:
+                        leaders[start + row] = start + unmatched[int(candidates[0])]
+                    else:
+                        is_new[k] = True
+                        leader_idx.append(start + row)
+                        leader_names.append(chunk[row])
+
+            start = stop
+
+        return leaders
+
+    def _cdist(self, queries: List[str], choices: List[str]) -> "np.ndarray":
+        """Matriz de similaridade (fuzz.ratio), com threads só em matrizes grandes"""
+        cells = len(queries) * len(choices)
+        return process.cdist(
+            queries,
+            choices,
+            scorer=fuzz.ratio,
+            score_cutoff=self.similarity_threshold,
+            dtype=np.float32,
+            workers=self.max_workers if cells >= self.CDIST_PARALLEL_MIN_CELLS else 1,
+        )
+
+    def _blocking_key(self, entry: PreparedEntry) -> Tuple[Any, ...]:
+        """Chave barata que candidatos a duplicata precisam compartilhar"""
+        parts = []
+
+        for name in self.blocking_keys:
+            if name == "valor":
+                parts.append(entry.entry.valor_contabil_centavos)
+            elif name == "codigo":
+                parts.append(entry.entry.codigo_fornecedor.strip())
+            elif name == "prefixo":
+                parts.append(entry.fornecedor_norm[: self.prefix_length])
+            elif name == "token":
+                parts.append(entry.fornecedor_norm.split(" ", 1)[0])
+
+        return tuple(parts)
+
+    def _history_block(self, entry: PreparedEntry) -> str:
+        """Chave de bloqueio serializada para o índice histórico"""
+        return json.dumps(self._blocking_key(entry), ensure_ascii=False)
+
+    def _match_history(
+        self, entries: List[PreparedEntry], history: HistoryIndex, arquivo_hash: str
+    ) -> List[HistoryMatch]:
+        """
+        Procura as entradas do arquivo atual no índice histórico:
+        - mesma chave exata -> DUPLICATA_EXATA
+        - mesmo bloco e fornecedor similar (threshold) -> POSSIVEL_DUPLICATA
+        Só as chaves deste arquivo são consultadas (buscas indexadas).
+        Sem chaves de bloqueio, apenas a busca exata é feita.
+        """
+        matches: List[HistoryMatch] = []
 
-        # if similarity > 85.0:
-        #     if valor1 != valor2:
-        #         return False
+        exact_found = history.find_exact(
+            list({entry.exact_key for entry in entries}), arquivo_hash
+        )
+        reported: Set[ExactKey] = set()
 
-        #     print(similarity)
+        for entry in entries:
+            previous = exact_found.get(entry.exact_key)
+            if previous and entry.exact_key not in reported:
+                reported.add(entry.exact_key)
+                matches.append(
+                    HistoryMatch(
+                        entry.entry,
+                        "DUPLICATA_EXATA",
+                        "Mesmo fornecedor, data, nota e valor em arquivo anterior",
+                        previous,
+                    )
+                )
 
-        return similarity >= self.similarity_threshold
+        if not self.blocking_keys:
+            return matches
 
-        # Fornecedor com fuzzy matching
+        # bloco -> entradas ainda sem correspondência (uma por chave exata)
+        pending: Dict[str, List[PreparedEntry]] = {}
+        for entry in entries:
+            if entry.exact_key in reported:
+                continue
+            reported.add(entry.exact_key)
+            pending.setdefault(self._history_block(entry), []).append(entry)
 
-    def _create_exact_key(self, entry: Dict[str, Any]) -> str:
-        """Cria chave para duplicata exata"""
-        codigo = str(entry.get("codigoFornecedor", "N/A")).strip()
-        data = entry.get("data", "")
-        nota = str(entry.get("notaSerie", "N/A")).strip()
-        valor = entry.get("valorContabil", "0,00")
+        candidates = history.find_blocks(list(pending), arquivo_hash)
 
-        return f"{codigo}|{data}|{nota}|{valor}"
+        for bloco, members in pending.items():
+            previous = candidates.get(bloco)
+            if not previous:
+                continue
 
-    def _create_unique_key(self, entry: Dict[str, Any]) -> str:
-        """Cria chave única para rastreamento"""
-        return self._create_exact_key(entry)
+            scores = process.cdist(
+                [entry.fornecedor_norm for entry in members],
+                [item.fornecedor_norm for item in previous],
+                scorer=fuzz.ratio,
+                score_cutoff=self.similarity_threshold,
+                dtype=np.float32,
+            )
+            for row, entry in enumerate(members):
+                similar = np.flatnonzero(scores[row] >= self.similarity_threshold)
+                if similar.size:
+                    matches.append(
+                        HistoryMatch(
+                            entry.entry,
+                            "POSSIVEL_DUPLICATA",
+                            "Mesmo fornecedor e valor com pequenas variações em arquivo anterior",
+                            [previous[int(i)] for i in similar],
+                        )
+                    )
 
-    def _format_duplicate_group(
-        self, entries: List[Dict[str, Any]], tipo: str, motivo: str
-    ) -> Dict[str, Any]:
-        """Formata grupo de duplicatas"""
-        first = entries[0]
+        return matches
 
-        return {
-            "codigoFornecedor": first.get("codigoFornecedor", "N/A"),
-            "fornecedor": first.get("fornecedor", ""),
-            "data": first.get("data", ""),
-            "notaSerie": first.get("notaSerie", "N/A"),
-            "valorContabil": first.get("valorContabil", "0,00"),
-            "valor": first.get("valor", "0,00"),
-            "tipo": tipo,
-            "motivo": motivo,
-            "ocorrencias": len(entries),
-            "chaveDuplicata": self._create_exact_key(first),
-            "detalhes": [
-                {
-                    "posicao": entry.get("posicao", "N/A"),
-                    "codigoFornecedor": entry.get("codigoFornecedor", "N/A"),
-                    "fornecedor": entry.get("fornecedor", ""),
-                    "data": entry.get("data", ""),
-                    "notaSerie": entry.get("notaSerie", "N/A"),
-                    "valorContabil": entry.get("valorContabil", "0,00"),
-                    "diferencaDias": self._calc_date_diff(
-                        first.get("data"), first.get("data")
-                    ),
-                }
-                for entry in entries
-            ],
-        }
+    def _create_exact_key(self, entry: LedgerEntry) -> ExactKey:
+        """Cria chave para duplicata exata"""
+        return (
+            entry.codigo_fornecedor.strip(),
+            entry.data_ordinal,
+            entry.nota_serie.strip(),
+            entry.valor_contabil_centavos,
+        )
 
-    def _calc_date_diff(self, date1: str, date2: str) -> int:
-        """Calcula diferença em dias entre duas datas"""
+    def _format_exact_key(self, entry: LedgerEntry) -> str:
+        """Chave exata no formato texto da resposta (chaveDuplicata)"""
+        codigo = entry.codigo_fornecedor.strip()
+        nota = entry.nota_serie.strip()
 
-        try:
-            d1 = datetime.strptime(date1, "%d/%m/%Y")
-            d2 = datetime.strptime(date2, "%d/%m/%Y")
-            return abs((d2 - d1).days)
-        except:
-            return 0
+        return f"{codigo}|{entry.data}|{nota}|{entry.valor_contabil}"
 
-    def _empty_result(self, total: int) -> Dict[str, Any]:
-        """Retorna resultado vazio"""
-        return {
-            "summary": {
-                "totalItensProcessados": total,
-                "itensValidos": 0,
-                "duplicatasExatas": 0,
-                "possiveisDuplicatas": 0,
-                "notasUnicas": 0,
-            },
-            "duplicatas": [],
-            "possiveisDuplicatas": [],
-            "notasUnicas": [],
-        }
+    def _format_duplicate_group(
+        self, prepared: List[PreparedEntry], tipo: str, motivo: str
+    ) -> DuplicateGroup:
+        """Monta o grupo de duplicatas (convertido para JSON só na resposta)"""
+        first_date = prepared[0].entry.data_ordinal
+
+        return DuplicateGroup(
+            [p.entry for p in prepared],
+            tipo,
+            motivo,
+            self._format_exact_key(prepared[0].entry),
+            [self._calc_date_diff(first_date, p.entry.data_ordinal) for p in prepared],
+        )
+
+    def _calc_date_diff(self, ordinal1: int, ordinal2: int) -> int:
+        """Calcula diferença em dias entre duas datas (ordinais)"""
+        return abs(ordinal2 - ordinal1)
@@ -0,0 +1,173 @@
+"""
+Exportação do resultado da análise para Excel (.xlsx) direto do
+AnalysisResult, sem passar por JSON.
+
+O xlsxwriter roda em modo constant_memory: cada linha é gravada no
+arquivo assim que a próxima começa, então a memória não cresce com o
+número de entradas. Por isso as abas são escritas uma de cada vez, linha
+a linha, na ordem em que aparecem no arquivo.
+
+Abas e colunas iguais às da exportação do backend Node (exportExcelService).
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, Iterable, List, Optional
+
+from app.services.ledger import AnalysisResult, DuplicateGroup, LedgerEntry
+
+logger = logging.getLogger("excel_export")
+logger.setLevel(logging.INFO)
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+ENTRY_COLUMNS = [
+    "Código Fornecedor",
+    "Fornecedor",
+    "Data",
+    "Número da Nota",
+    "Valor Contábil",
+    "Valor",
+]
+
+STATUS_DUPLICATA = "Duplicata exata"
+STATUS_POSSIVEL = "Possível duplicata"
+STATUS_NORMAL = "Normal"
+
+
+def write_analysis_workbook(
+    result: AnalysisResult,
+    path: str,
+    filename: str,
+    analisado_em: Optional[datetime] = None,
+) -> int:
+    """
+    Grava o resultado em path (.xlsx) com as abas:
+    - Resumo: uma linha com os totais
+    - Duplicatas Exatas / Possíveis Duplicatas: um grupo por linha (só se houver)
+    - Todas as Entradas: cada entrada válida, com o status (grupo a que pertence)
+    Valores saem como números e datas como datas do Excel.
+
+    Returns:
+        número de linhas de dados gravadas
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    try:
+        writer = _SheetWriter(workbook)
+
+        writer.sheet(
+            "Resumo",
+            [
+                "Arquivo Processado",
+                "Data da Análise",
+                "Total de Itens Processados",
+                "Itens Válidos",
+                "Duplicatas Exatas Encontradas",
+                "Possíveis Duplicatas",
+            ],
+            [
+                [
+                    filename,
+                    analisado_em or datetime.now(),
+                    result.total,
+                    result.validos,
+                    len(result.duplicatas),
+                    len(result.possiveis_duplicatas),
+                ]
+            ],
+        )
+
+        if result.duplicatas:
+            writer.sheet(
+                "Duplicatas Exatas",
+                ENTRY_COLUMNS + ["Ocorrências", "Chave de Duplicata"],
+                _group_rows(result.duplicatas),
+            )
+
+        if result.possiveis_duplicatas:
+            writer.sheet(
+                "Possíveis Duplicatas",
+                ENTRY_COLUMNS + ["Ocorrências", "Chave Similar"],
+                _group_rows(result.possiveis_duplicatas),
+            )
+
+        writer.sheet(
+            "Todas as Entradas",
+            ENTRY_COLUMNS + ["Posição", "Status"],
+            _all_entry_rows(result),
+        )
+    finally:
+        workbook.close()
+
+    logger.info(f"📗 Exportadas {writer.rows} linhas para Excel ({filename})")
+    return writer.rows
+
+
+def _entry_cells(entry: LedgerEntry) -> List[Any]:
+    return [
+        entry.codigo_fornecedor,
+        entry.fornecedor,
+        date.fromordinal(entry.data_ordinal) if entry.data_ordinal else None,
+        entry.nota_serie,
+        entry.valor_contabil_centavos / 100,
+        entry.valor_centavos / 100,
+    ]
+
+
+def _group_rows(groups: List[DuplicateGroup]) -> Iterable[List[Any]]:
+    for group in groups:
+        yield _entry_cells(group.entries[0]) + [len(group.entries), group.chave]
+
+
+def _all_entry_rows(result: AnalysisResult) -> Iterable[List[Any]]:
+    for status, groups in (
+        (STATUS_DUPLICATA, result.duplicatas),
+        (STATUS_POSSIVEL, result.possiveis_duplicatas),
+    ):
+        for group in groups:
+            for entry in group.entries:
+                yield _entry_cells(entry) + [entry.posicao, status]
+
+    for entry in result.notas_unicas:
+        yield _entry_cells(entry) + [entry.posicao, STATUS_NORMAL]
+
+
+class _SheetWriter:
+    """Escreve abas inteiras (cabeçalho + linhas) com os formatos de célula"""
+
+    def __init__(self, workbook: Any):
+        self.workbook = workbook
+        self.header = workbook.add_format({"bold": True})
+        self.date = workbook.add_format({"num_format": "dd/mm/yyyy"})
+        self.datetime = workbook.add_format({"num_format": "dd/mm/yyyy hh:mm:ss"})
+        self.money = workbook.add_format({"num_format": "#,##0.00"})
+        self.rows = 0
+
+    def sheet(self, name: str, columns: List[str], rows: Iterable[List[Any]]) -> None:
+        worksheet = self.workbook.add_worksheet(name)
+        # largura definida antes das linhas (no constant_memory não dá para voltar)
+        worksheet.set_column(0, len(columns) - 1, 16)
+        worksheet.write_row(0, 0, columns, self.header)
+        worksheet.freeze_panes(1, 0)
+
+        row_idx = 0
+        for row_idx, row in enumerate(rows, start=1):
+            for col_idx, value in enumerate(row):
+                if value is None:
+                    continue
+                if isinstance(value, datetime):
+                    worksheet.write_datetime(row_idx, col_idx, value, self.datetime)
+                elif isinstance(value, date):
+                    worksheet.write_datetime(row_idx, col_idx, value, self.date)
+                elif isinstance(value, float):
+                    worksheet.write_number(row_idx, col_idx, value, self.money)
+                elif isinstance(value, int):
+                    worksheet.write_number(row_idx, col_idx, value)
+                else:
+                    worksheet.write_string(row_idx, col_idx, value)
+
+        if row_idx:
+            worksheet.autofilter(0, 0, row_idx, len(columns) - 1)
+        self.rows += row_idx
@@ -0,0 +1,235 @@
+"""
+Índice persistente (SQLite) das entradas de arquivos já analisados, para
+encontrar duplicatas entre uploads diferentes (ex: a mesma nota no
+ledger deste mês e no do mês anterior).
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.services.ledger import HistoricalEntry, LedgerEntry
+
+logger = logging.getLogger("history_index")
+logger.setLevel(logging.INFO)
+
+# codigo_fornecedor, data (ordinal), nota, valor (centavos)
+ExactKey = Tuple[str, Optional[int], str, int]
+
+# colunas lidas por _historical, na ordem
+_SELECT_COLUMNS = ", ".join(
+    f"e.{column}"
+    for column in (
+        "codigo",
+        "fornecedor",
+        "fornecedor_norm",
+        "data_ordinal",
+        "nota",
+        "valor_contabil",
+        "valor",
+        "posicao",
+        "arquivo",
+        "analisado_em",
+    )
+)
+
+
+class HistoryIndex:
+    """
+    - Uma linha por entrada válida de cada arquivo analisado
+    - Busca exata pela chave do analisador (codigo, data, nota, valor) e
+      busca de candidatos fuzzy pelo bloco (chaves de bloqueio do analisador),
+      ambas indexadas
+    - Reanalisar o mesmo arquivo (mesmo hash) substitui as linhas dele e
+      nunca gera correspondência com ele mesmo
+    """
+
+    def __init__(self, path: str, retention_days: int = 730, timeout: float = 10.0):
+        """
+        Args:
+            path: arquivo do banco (criado se não existir)
+            retention_days: linhas mais antigas que isso são removidas; 0 = nunca
+            timeout: espera (segundos) por um lock de outro processo
+        """
+        self.path = path
+        self.retention_days = retention_days
+        self.timeout = timeout
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " id INTEGER PRIMARY KEY, arquivo_hash TEXT NOT NULL,"
+                " codigo TEXT NOT NULL, fornecedor TEXT NOT NULL,"
+                " fornecedor_norm TEXT NOT NULL, data_ordinal INTEGER NOT NULL,"
+                " nota TEXT NOT NULL, valor_contabil INTEGER NOT NULL,"
+                " valor INTEGER NOT NULL, bloco TEXT NOT NULL, posicao TEXT NOT NULL,"
+                " arquivo TEXT NOT NULL, analisado_em REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_exact"
+                " ON entries (valor_contabil, data_ordinal, codigo, nota)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_bloco ON entries (bloco)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_arquivo ON entries (arquivo_hash)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_analisado ON entries (analisado_em)"
+            )
+            self._ready = True
+
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def find_exact(
+        self, keys: Sequence[ExactKey], arquivo_hash: str
+    ) -> Dict[ExactKey, List[HistoricalEntry]]:
+        """Entradas de outros arquivos com a mesma chave exata"""
+        if not keys:
+            return {}
+
+        found: Dict[ExactKey, List[HistoricalEntry]] = {}
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "CREATE TEMP TABLE lookup_exact"
+                " (codigo TEXT, data_ordinal INTEGER, nota TEXT, valor_contabil INTEGER)"
+            )
+            conn.executemany("INSERT INTO lookup_exact VALUES (?, ?, ?, ?)", keys)
+
+            rows = conn.execute(
+                "SELECT l.codigo, l.data_ordinal, l.nota, l.valor_contabil,"
+                f" {_SELECT_COLUMNS}"
+                " FROM lookup_exact l JOIN entries e"
+                " ON e.valor_contabil = l.valor_contabil"
+                " AND e.data_ordinal = l.data_ordinal"
+                " AND e.codigo = l.codigo AND e.nota = l.nota"
+                " WHERE e.arquivo_hash != ?"
+                " ORDER BY e.analisado_em, e.id",
+                (arquivo_hash,),
+            )
+            for row in rows:
+                found.setdefault(tuple(row[:4]), []).append(self._historical(row[4:]))
+
+        return found
+
+    def find_blocks(
+        self, blocos: Sequence[str], arquivo_hash: str
+    ) -> Dict[str, List[HistoricalEntry]]:
+        """Entradas de outros arquivos em cada bloco (candidatas à comparação fuzzy)"""
+        if not blocos:
+            return {}
+
+        found: Dict[str, List[HistoricalEntry]] = {}
+        with closing(self._connect()) as conn:
+            conn.execute("CREATE TEMP TABLE lookup_bloco (bloco TEXT)")
+            conn.executemany(
+                "INSERT INTO lookup_bloco VALUES (?)", ((bloco,) for bloco in blocos)
+            )
+
+            rows = conn.execute(
+                f"SELECT l.bloco, {_SELECT_COLUMNS}"
+                " FROM lookup_bloco l JOIN entries e ON e.bloco = l.bloco"
+                " WHERE e.arquivo_hash != ?"
+                " ORDER BY e.analisado_em, e.id",
+                (arquivo_hash,),
+            )
+            for row in rows:
+                found.setdefault(row[0], []).append(self._historical(row[1:]))
+
+        return found
+
+    def record(
+        self,
+        arquivo_hash: str,
+        arquivo: str,
+        rows: Iterable[Tuple[LedgerEntry, str, str]],
+    ) -> int:
+        """
+        Grava as entradas de um arquivo, substituindo uma análise anterior
+        do mesmo arquivo
+
+        Args:
+            arquivo_hash: hash do conteúdo do arquivo
+            arquivo: nome exibido nas correspondências
+            rows: (entrada, fornecedor normalizado, bloco)
+        """
+        now = time.time()
+        values = [
+            (
+                arquivo_hash,
+                entry.codigo_fornecedor.strip(),
+                entry.fornecedor,
+                fornecedor_norm,
+                entry.data_ordinal,
+                entry.nota_serie.strip(),
+                entry.valor_contabil_centavos,
+                entry.valor_centavos,
+                bloco,
+                entry.posicao,
+                arquivo,
+                now,
+            )
+            for entry, fornecedor_norm, bloco in rows
+        ]
+
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM entries WHERE arquivo_hash = ?", (arquivo_hash,))
+                conn.executemany(
+                    "INSERT INTO entries (arquivo_hash, codigo, fornecedor,"
+                    " fornecedor_norm, data_ordinal, nota, valor_contabil, valor,"
+                    " bloco, posicao, arquivo, analisado_em)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    values,
+                )
+                if self.retention_days > 0:
+                    limit = now - self.retention_days * 86400
+                    removed = conn.execute(
+                        "DELETE FROM entries WHERE analisado_em < ?", (limit,)
+                    ).rowcount
+                    if removed:
+                        logger.info(f"🧹 {removed} entradas antigas removidas do histórico")
+
+        return len(values)
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"habilitado": True, "entradas": 0, "arquivos": 0}
+        try:
+            with closing(self._connect()) as conn:
+                stats["entradas"], stats["arquivos"] = conn.execute(
+                    "SELECT COUNT(*), COUNT(DISTINCT arquivo_hash) FROM entries"
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Histórico {self.path} indisponível: {e}")
+        return stats
+
+    def _historical(self, row: Sequence[Any]) -> HistoricalEntry:
+        (
+            codigo,
+            fornecedor,
+            fornecedor_norm,
+            data_ordinal,
+            nota,
+            valor_contabil,
+            valor,
+            posicao,
+            arquivo,
+            analisado_em,
+        ) = row
+        entry = LedgerEntry(codigo, fornecedor, data_ordinal, nota, valor_contabil, valor)
+        entry.posicao_texto = posicao
+        return HistoricalEntry(entry, fornecedor_norm, arquivo, analisado_em)
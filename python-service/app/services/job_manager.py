@@ -0,0 +1,179 @@
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import orjson
+
+logger = logging.getLogger("job_manager")
+logger.setLevel(logging.INFO)
+
+
+class Job:
+    """Estado de uma análise assíncrona"""
+
+    PENDENTE = "pendente"
+    PROCESSANDO = "processando"
+    CONCLUIDO = "concluido"
+    ERRO = "erro"
+
+    def __init__(self, job_id: str, filename: str):
+        now = time.time()
+        self.job_id = job_id
+        self.filename = filename
+        self.status = self.PENDENTE
+        self.etapa = "fila"
+        self.pagina = 0
+        self.total_paginas = 0
+        self.entradas = 0
+        self.resultado: Optional[Dict[str, Any]] = None
+        # resultado já gravado no arquivo próprio (é gravado uma vez só)
+        self.resultado_gravado = False
+        self.erro: Optional[str] = None
+        self.criado_em = now
+        self.atualizado_em = now
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.CONCLUIDO, self.ERRO)
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.total_paginas:
+            descricao = f"página {self.pagina}/{self.total_paginas}"
+        else:
+            descricao = self.etapa
+
+        return {
+            "jobId": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "etapa": self.etapa,
+            "progresso": {
+                "pagina": self.pagina,
+                "totalPaginas": self.total_paginas,
+                "entradasExtraidas": self.entradas,
+                "descricao": descricao,
+            },
+            "resultado": self.resultado,
+            "erro": self.erro,
+            "criadoEm": self.criado_em,
+            "atualizadoEm": self.atualizado_em,
+        }
+
+
+class JobManager:
+    """
+    Registro das análises assíncronas.
+    - A execução acontece no processo que recebeu o POST /jobs
+    - O estado é gravado em disco (um JSON por job) para que qualquer worker
+      do gunicorn consiga responder GET /jobs/{id}
+    - O resultado fica em um arquivo separado, gravado uma vez ao concluir:
+      as consultas de progresso só leem o estado (pequeno)
+    - Leitura e gravação são bloqueantes: chamar fora do event loop
+      (asyncio.to_thread)
+    - Jobs são removidos ttl_seconds após a última atualização
+    """
+
+    def __init__(self, state_dir: str, ttl_seconds: int, min_save_interval: float = 0.5):
+        """
+        Args:
+            state_dir: diretório compartilhado entre os workers
+            ttl_seconds: tempo de vida de um job após a última atualização
+            min_save_interval: intervalo mínimo entre gravações de progresso
+        """
+        self.state_dir = state_dir
+        self.ttl_seconds = ttl_seconds
+        self.min_save_interval = min_save_interval
+        self._last_saved: Dict[str, float] = {}
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.state_dir, f"{job_id}.json")
+
+    def _result_path(self, job_id: str) -> str:
+        return os.path.join(self.state_dir, f"{job_id}.resultado.json")
+
+    def _write(self, path: str, content: Dict[str, Any]) -> None:
+        # grava em um temporário e troca: quem lê nunca vê um arquivo pela metade
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(orjson.dumps(content))
+        os.replace(tmp_path, path)
+
+    def create(self, filename: str) -> Job:
+        self.purge_expired()
+        job = Job(uuid.uuid4().hex, filename)
+        self.save(job, force=True)
+        return job
+
+    def save(self, job: Job, force: bool = False) -> None:
+        """Grava o estado (atomicamente); progresso é limitado por min_save_interval"""
+        now = time.time()
+        job.atualizado_em = now
+
+        if not force and not job.finished:
+            if now - self._last_saved.get(job.job_id, 0.0) < self.min_save_interval:
+                return
+
+        if job.resultado is not None and not job.resultado_gravado:
+            # antes do estado: quem vê "concluido" já encontra o resultado
+            self._write(self._result_path(job.job_id), job.resultado)
+            job.resultado_gravado = True
+
+        state = job.to_dict()
+        state["resultado"] = None
+        self._write(self._path(job.job_id), state)
+
+        if job.finished:
+            self._last_saved.pop(job.job_id, None)
+        else:
+            self._last_saved[job.job_id] = now
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        # ids são hex gerados aqui; qualquer outra coisa não é um job
+        if not job_id.isalnum():
+            return None
+
+        path = self._path(job_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                self._remove(path)
+                self._remove(self._result_path(job_id))
+                return None
+            with open(path, "rb") as fh:
+                state = orjson.loads(fh.read())
+            if state["status"] == Job.CONCLUIDO:
+                with open(self._result_path(job_id), "rb") as fh:
+                    state["resultado"] = orjson.loads(fh.read())
+            return state
+        except (OSError, ValueError):
+            return None
+
+    def purge_expired(self) -> int:
+        removed = 0
+        limit = time.time() - self.ttl_seconds
+
+        try:
+            names = os.listdir(self.state_dir)
+        except OSError:
+            return 0
+
+        for name in names:
+            path = os.path.join(self.state_dir, name)
+            try:
+                if os.path.getmtime(path) < limit:
+                    self._remove(path)
+                    removed += 1
+            except OSError:
+                continue
+
+        if removed:
+            logger.info(f"🧹 {removed} jobs expirados removidos")
+        return removed
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
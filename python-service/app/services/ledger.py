@@ -0,0 +1,395 @@
+"""
+Representação interna e compacta das entradas e do resultado da análise.
+Só é convertida para o formato JSON (FinancialEntry / Duplicate) na saída,
+via to_dict() (ou to_compact_dict(), com cada entrada uma única vez).
+"""
+
+import sys
+from typing import Any, Dict, List, Optional
+
+from app.utils.normalizer import (
+    format_cents,
+    format_date_ordinal,
+    parse_date_ordinal,
+    parse_monetary_cents,
+)
+
+
+# colunas de cada linha da tabela "entradas" do formato compacto
+COMPACT_COLUMNS = [
+    "codigoFornecedor",
+    "fornecedor",
+    "data",
+    "notaSerie",
+    "valorContabil",
+    "valor",
+    "posicao",
+]
+
+
+def _intern(value: Any) -> str:
+    # fornecedores, códigos e datas se repetem muito: uma cópia de cada texto
+    return sys.intern(str(value)) if value is not None else ""
+
+
+class LedgerEntry:
+    """
+    Lançamento extraído (equivalente compacto do FinancialEntry)
+    Valores em centavos e datas como ordinal do dia (date.toordinal);
+    os textos "1.234,56" / "DD/MM/YYYY" só são gerados no to_dict()
+    """
+
+    __slots__ = (
+        "codigo_fornecedor",
+        "fornecedor",
+        "data_ordinal",
+        "nota_serie",
+        "valor_contabil_centavos",
+        "valor_centavos",
+        "pagina",
+        "linha",
+        "posicao_texto",
+        "origem",
+    )
+
+    def __init__(
+        self,
+        codigo_fornecedor: str,
+        fornecedor: str,
+        data_ordinal: Optional[int],
+        nota_serie: str,
+        valor_contabil_centavos: int,
+        valor_centavos: Optional[int] = None,
+        pagina: int = 0,
+        linha: int = 0,
+    ):
+        self.codigo_fornecedor = _intern(codigo_fornecedor)
+        self.fornecedor = _intern(fornecedor)
+        self.data_ordinal = data_ordinal
+        self.nota_serie = nota_serie
+        self.valor_contabil_centavos = valor_contabil_centavos
+        self.valor_centavos = (
+            valor_contabil_centavos if valor_centavos is None else valor_centavos
+        )
+        self.pagina = pagina
+        self.linha = linha
+        # posição já formatada (entradas recebidas como dict)
+        self.posicao_texto: Optional[str] = None
+        # arquivo de origem (análise de vários arquivos juntos)
+        self.origem: Optional[str] = None
+
+    @property
+    def data(self) -> str:
+        return format_date_ordinal(self.data_ordinal)
+
+    @property
+    def valor_contabil(self) -> str:
+        return format_cents(self.valor_contabil_centavos)
+
+    @property
+    def valor(self) -> str:
+        return format_cents(self.valor_centavos)
+
+    @property
+    def posicao(self) -> str:
+        if self.posicao_texto is not None:
+            posicao = self.posicao_texto
+        elif not self.pagina:
+            # linha de planilha (sem página)
+            posicao = f"Linha {self.linha}"
+        else:
+            posicao = f"Pág {self.pagina}, Linha {self.linha}"
+
+        if self.origem:
+            return f"{self.origem}: {posicao}"
+        return posicao
+
+    @classmethod
+    def from_dict(cls, entry: Dict[str, Any]) -> "LedgerEntry":
+        """Aceita entradas no formato JSON (ex: vindas de clientes antigos)"""
+        valor_contabil = parse_monetary_cents(entry.get("valorContabil", "0,00"))
+        valor = entry.get("valor")
+
+        ledger_entry = cls(
+            entry.get("codigoFornecedor", "N/A"),
+            entry.get("fornecedor", ""),
+            parse_date_ordinal(entry.get("data", "")),
+            str(entry.get("notaSerie", "N/A")),
+            valor_contabil,
+            parse_monetary_cents(valor) if valor is not None else None,
+        )
+        ledger_entry.posicao_texto = entry.get("posicao", "N/A")
+        return ledger_entry
+
+    def to_row(self) -> List[Any]:
+        """Forma compacta (JSON) usada pelos caches; a página não é incluída"""
+        return [
+            self.codigo_fornecedor,
+            self.fornecedor,
+            self.data_ordinal,
+            self.nota_serie,
+            self.valor_contabil_centavos,
+            self.valor_centavos,
+            self.linha,
+        ]
+
+    @classmethod
+    def from_row(cls, row: List[Any], pagina: int) -> "LedgerEntry":
+        """Inverso do to_row, com a página onde a entrada foi encontrada"""
+        codigo, fornecedor, data_ordinal, nota, valor_contabil, valor, linha = row
+        return cls(
+            codigo, fornecedor, data_ordinal, nota, valor_contabil, valor, pagina, linha
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "codigoFornecedor": self.codigo_fornecedor,
+            "fornecedor": self.fornecedor,
+            "data": self.data,
+            "notaSerie": self.nota_serie,
+            "valorContabil": self.valor_contabil,
+            "valor": self.valor,
+            "posicao": self.posicao,
+        }
+
+    def to_compact_row(self) -> List[Any]:
+        """Linha da tabela de entradas do formato compacto (COMPACT_COLUMNS)"""
+        valor_contabil = format_cents(self.valor_contabil_centavos)
+        return [
+            self.codigo_fornecedor,
+            self.fornecedor,
+            format_date_ordinal(self.data_ordinal),
+            self.nota_serie,
+            valor_contabil,
+            # quase sempre igual ao valor contábil: formata uma vez só
+            valor_contabil
+            if self.valor_centavos == self.valor_contabil_centavos
+            else format_cents(self.valor_centavos),
+            self.posicao,
+        ]
+
+    def __repr__(self) -> str:
+        return f"LedgerEntry({self.to_dict()!r})"
+
+
+class DuplicateGroup:
+    """Grupo de duplicatas (equivalente compacto do Duplicate)"""
+
+    __slots__ = ("entries", "tipo", "motivo", "chave", "diferencas_dias")
+
+    def __init__(
+        self,
+        entries: List[LedgerEntry],
+        tipo: str,
+        motivo: str,
+        chave: str,
+        diferencas_dias: Optional[List[int]] = None,
+    ):
+        self.entries = entries
+        self.tipo = tipo
+        self.motivo = motivo
+        self.chave = chave
+        self.diferencas_dias = diferencas_dias or [0] * len(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        first = self.entries[0]
+
+        return {
+            "codigoFornecedor": first.codigo_fornecedor,
+            "fornecedor": first.fornecedor,
+            "data": first.data,
+            "notaSerie": first.nota_serie,
+            "valorContabil": first.valor_contabil,
+            "valor": first.valor,
+            "tipo": self.tipo,
+            "motivo": self.motivo,
+            "ocorrencias": len(self.entries),
+            "chaveDuplicata": self.chave,
+            "detalhes": [
+                {
+                    "posicao": entry.posicao,
+                    "codigoFornecedor": entry.codigo_fornecedor,
+                    "fornecedor": entry.fornecedor,
+                    "data": entry.data,
+                    "notaSerie": entry.nota_serie,
+                    "valorContabil": entry.valor_contabil,
+                    "diferencaDias": dias,
+                }
+                for entry, dias in zip(self.entries, self.diferencas_dias)
+            ],
+        }
+
+
+class HistoricalEntry:
+    """Entrada de um arquivo analisado anteriormente (índice histórico)"""
+
+    __slots__ = ("entry", "fornecedor_norm", "arquivo", "analisado_em")
+
+    def __init__(
+        self, entry: LedgerEntry, fornecedor_norm: str, arquivo: str, analisado_em: float
+    ):
+        self.entry = entry
+        self.fornecedor_norm = fornecedor_norm
+        self.arquivo = arquivo
+        self.analisado_em = analisado_em
+
+
+class HistoryMatch:
+    """Entrada do arquivo atual que já apareceu em arquivos anteriores"""
+
+    __slots__ = ("entry", "tipo", "motivo", "anteriores")
+
+    def __init__(
+        self,
+        entry: LedgerEntry,
+        tipo: str,
+        motivo: str,
+        anteriores: List[HistoricalEntry],
+    ):
+        self.entry = entry
+        self.tipo = tipo
+        self.motivo = motivo
+        self.anteriores = anteriores
+
+    def to_dict(self) -> Dict[str, Any]:
+        data_ordinal = self.entry.data_ordinal
+
+        return {
+            **self.entry.to_dict(),
+            "tipo": self.tipo,
+            "motivo": self.motivo,
+            "ocorrenciasAnteriores": len(self.anteriores),
+            "anteriores": [
+                {
+                    "arquivo": previous.arquivo,
+                    "analisadoEm": previous.analisado_em,
+                    "posicao": previous.entry.posicao,
+                    "codigoFornecedor": previous.entry.codigo_fornecedor,
+                    "fornecedor": previous.entry.fornecedor,
+                    "data": previous.entry.data,
+                    "notaSerie": previous.entry.nota_serie,
+                    "valorContabil": previous.entry.valor_contabil,
+                    "diferencaDias": abs(previous.entry.data_ordinal - data_ordinal),
+                }
+                for previous in self.anteriores
+            ],
+        }
+
+
+class AnalysisResult:
+    """Resultado do DuplicateAnalyzer antes da conversão para JSON"""
+
+    __slots__ = (
+        "total",
+        "validos",
+        "duplicatas",
+        "possiveis_duplicatas",
+        "notas_unicas",
+        "historico",
+    )
+
+    def __init__(
+        self,
+        total: int,
+        validos: int = 0,
+        duplicatas: Optional[List[DuplicateGroup]] = None,
+        possiveis_duplicatas: Optional[List[DuplicateGroup]] = None,
+        notas_unicas: Optional[List[LedgerEntry]] = None,
+        historico: Optional[List[HistoryMatch]] = None,
+    ):
+        self.total = total
+        self.validos = validos
+        self.duplicatas = duplicatas or []
+        self.possiveis_duplicatas = possiveis_duplicatas or []
+        self.notas_unicas = notas_unicas or []
+        # None = índice histórico não consultado
+        self.historico = historico
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "totalItensProcessados": self.total,
+            "itensValidos": self.validos,
+            "duplicatasExatas": len(self.duplicatas),
+            "possiveisDuplicatas": len(self.possiveis_duplicatas),
+            "notasUnicas": len(self.notas_unicas),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "summary": self.summary(),
+            "duplicatas": [group.to_dict() for group in self.duplicatas],
+            "possiveisDuplicatas": [
+                group.to_dict() for group in self.possiveis_duplicatas
+            ],
+            "notasUnicas": [entry.to_dict() for entry in self.notas_unicas],
+        }
+        if self.historico is not None:
+            result["historico"] = [match.to_dict() for match in self.historico]
+        return result
+
+    def to_compact_dict(self) -> Dict[str, Any]:
+        """
+        Formato compacto: cada entrada aparece uma única vez na tabela
+        "entradas" (linhas na ordem de "colunas") e grupos, notas únicas e
+        histórico se referem a ela pelo índice, em vez de repetir os campos
+        no cabeçalho do grupo e em cada item de "detalhes".
+        """
+        rows: List[List[Any]] = []
+        index: Dict[int, int] = {}
+
+        def ref(entry: LedgerEntry) -> int:
+            idx = index.get(id(entry))
+            if idx is None:
+                idx = index[id(entry)] = len(rows)
+                rows.append(entry.to_compact_row())
+            return idx
+
+        def group(group: DuplicateGroup) -> Dict[str, Any]:
+            return {
+                "tipo": group.tipo,
+                "motivo": group.motivo,
+                "ocorrencias": len(group.entries),
+                "chaveDuplicata": group.chave,
+                "entradas": [ref(entry) for entry in group.entries],
+                "diferencasDias": group.diferencas_dias,
+            }
+
+        duplicatas = [group(g) for g in self.duplicatas]
+        possiveis = [group(g) for g in self.possiveis_duplicatas]
+        notas_unicas = [ref(entry) for entry in self.notas_unicas]
+
+        historico = None
+        if self.historico is not None:
+            historico = [
+                {
+                    "entrada": ref(match.entry),
+                    "tipo": match.tipo,
+                    "motivo": match.motivo,
+                    "ocorrenciasAnteriores": len(match.anteriores),
+                    "anteriores": [
+                        {
+                            "entrada": ref(previous.entry),
+                            "arquivo": previous.arquivo,
+                            "analisadoEm": previous.analisado_em,
+                            "diferencaDias": abs(
+                                previous.entry.data_ordinal - match.entry.data_ordinal
+                            ),
+                        }
+                        for previous in match.anteriores
+                    ],
+                }
+                for match in self.historico
+            ]
+
+        result = {
+            "summary": self.summary(),
+            "formato": "compacto",
+            "colunas": COMPACT_COLUMNS,
+            "entradas": rows,
+            "duplicatas": duplicatas,
+            "possiveisDuplicatas": possiveis,
+            "notasUnicas": notas_unicas,
+        }
+        if historico is not None:
+            result["historico"] = historico
+        return result
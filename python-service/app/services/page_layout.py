@@ -0,0 +1,141 @@
+"""
+Motor de layout vetorizado (NumPy) do PDFReader: agrupa as palavras da
+página em linhas, detecta colunas e distribui as palavras entre elas com
+operações sobre arrays, em vez de dicts e min(...) palavra a palavra.
+
+Gera as mesmas linhas e os mesmos cols_text ({col_idx: texto}) que
+PDFReader._group_words_by_line/_detect_columns/_split_columns, então as
+heurísticas de mapeamento seguem iguais.
+"""
+
+import math
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+class NumpyPageLayout:
+    """
+    Palavras de uma página (page.get_text("words")) em arrays:
+    - Linhas: y0 arredondado a 0,1 (como no motor padrão) e, com
+      line_tolerance > 0, linhas consecutivas separadas por até essa
+      distância são unidas (varredura em y)
+    - Colunas: posições x únicas separadas por gaps > tolerance
+    - Atribuição: searchsorted contra os pontos médios entre colunas e,
+      entre a coluna achada e as vizinhas, a de menor abs(x - coluna)
+      (empate fica com a da esquerda, como no min(...) original)
+    """
+
+    __slots__ = ("x", "texts", "line_starts", "lines")
+
+    def __init__(self, words: List[Any], line_tolerance: float = 0.0):
+        texts: List[str] = []
+        x = y = np.zeros(0)
+        if words:
+            columns = list(zip(*words))
+            texts = [str(t).strip() if t is not None else "" for t in columns[4]]
+            x = np.asarray(columns[0], dtype=np.float64)
+            y = _round_tenth(np.asarray(columns[1], dtype=np.float64))
+            if not all(texts):
+                keep = np.asarray([bool(t) for t in texts])
+                texts = [t for t in texts if t]
+                x, y = x[keep], y[keep]
+
+        # ordem estável por linha e, dentro dela, por x (igual aos sorted do motor padrão)
+        line_keys = np.unique(y)
+        if line_tolerance > 0 and len(line_keys) > 1:
+            # varredura: nova linha quando o salto em y passa da tolerância
+            breaks = np.concatenate(([0], np.diff(line_keys) > line_tolerance))
+            line_of_key = np.cumsum(breaks)
+        else:
+            line_of_key = np.arange(len(line_keys))
+        line_ids = line_of_key[np.searchsorted(line_keys, y)]
+
+        order = np.lexsort((x, line_ids))
+        self.x = x[order]
+        self.texts = [texts[i] for i in order.tolist()]
+
+        sorted_lines = line_ids[order]
+        if len(sorted_lines):
+            self.line_starts = np.flatnonzero(
+                np.concatenate(([True], sorted_lines[1:] != sorted_lines[:-1]))
+            )
+        else:
+            self.line_starts = np.zeros(0, dtype=np.intp)
+
+        bounds = np.append(self.line_starts, len(self.texts)).tolist()
+        xs_sorted = self.x.tolist()
+        self.lines: List[List[Tuple[float, str]]] = [
+            list(zip(xs_sorted[a:b], self.texts[a:b]))
+            for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+
+    def detect_columns(self, tolerance: float) -> List[float]:
+        """Centros das colunas (média das posições x únicas de cada grupo)"""
+        positions = np.unique(self.x)
+        if not len(positions):
+            return []
+        splits = np.flatnonzero(np.diff(positions) > tolerance) + 1
+        # sum/len como no motor padrão (c.mean() soma em pares e difere no último dígito)
+        return [
+            sum(cluster) / len(cluster)
+            for cluster in (c.tolist() for c in np.split(positions, splits))
+        ]
+
+    def split_columns(
+        self,
+        columns: List[float],
+        x_min: float = -math.inf,
+        x_max: float = math.inf,
+    ) -> List[Dict[int, str]]:
+        """
+        cols_text de cada linha, com todas as colunas (vazias = ""); só as
+        palavras com x_min < x <= x_max entram (faixa da tabela)
+        """
+        n_columns = len(columns)
+        n_lines = len(self.lines)
+        if not n_columns:
+            return [{} for _ in range(n_lines)]
+
+        centers = np.asarray(columns, dtype=np.float64)
+        midpoints = (centers[1:] + centers[:-1]) / 2
+        col = np.searchsorted(midpoints, self.x, side="left")
+        # perto do ponto médio o arredondamento de (a + b) / 2 pode divergir do
+        # abs(x - coluna) do motor padrão: decide entre as vizinhas pela distância
+        # (argmin fica com o primeiro empate = coluna da esquerda)
+        candidates = np.clip(col + np.array([[-1], [0], [1]]), 0, n_columns - 1)
+        nearest = np.abs(self.x - centers[candidates]).argmin(axis=0)
+        col = candidates[nearest, np.arange(len(col))]
+        line_sizes = np.diff(np.append(self.line_starts, len(self.x)))
+        line = np.repeat(np.arange(n_lines), line_sizes)
+
+        keep = (self.x > x_min) & (self.x <= x_max)
+        # (linha, coluna) mantendo a ordem por x dentro de cada par
+        order = np.flatnonzero(keep)
+        order = order[np.lexsort((order, col[order], line[order]))]
+
+        result = [dict.fromkeys(range(n_columns), "") for _ in range(n_lines)]
+        if not len(order):
+            return result
+
+        key = line[order] * n_columns + col[order]
+        starts = np.flatnonzero(np.concatenate(([True], key[1:] != key[:-1])))
+        ends = np.append(starts[1:], len(order)).tolist()
+        texts = [self.texts[i] for i in order.tolist()]
+        for start, end, k in zip(starts.tolist(), ends, key[starts].tolist()):
+            line_idx, col_idx = divmod(k, n_columns)
+            result[line_idx][col_idx] = " ".join(texts[start:end]).strip()
+        return result
+
+
+def _round_tenth(values: "np.ndarray") -> "np.ndarray":
+    """
+    round(v, 1) elemento a elemento, igual ao round do Python: o np.round
+    pode divergir nos empates (x,x5), que são refeitos com round
+    """
+    rounded = np.round(values, 1)
+    scaled = values * 10
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ties.tolist():
+        rounded[i] = round(float(values[i]), 1)
+    return rounded
@@ -1,11 +1,21 @@
+import hashlib
+import json
 import logging
+import math
+import multiprocessing
+import os
 import re
-from typing import List, Dict, Any, Tuple, Optional
+import tempfile
+import time
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from typing import Deque, List, Dict, Any, Tuple, Optional, Union, Callable
 import pymupdf as fitz
 
 # Fallback OCR imports (usados somente se precisar)
 try:
-    from pdf2image import convert_from_path
     import pytesseract
     from PIL import Image
 
@@ -13,11 +23,184 @@ try:
 except Exception:
     OCR_AVAILABLE = False
 
-from app.utils.normalizer import clean_date, clean_monetary_value, clean_supplier_name
+from app.services.ledger import LedgerEntry
+from app.services.page_layout import NumpyPageLayout
+from app.utils.normalizer import (
+    clean_supplier_name,
+    parse_date_ordinal,
+    parse_monetary_cents,
+)
+from app.utils.sqlite_cache import SQLiteCache
 
 logger = logging.getLogger("pdf_reader")
 logger.setLevel(logging.INFO)
 
+# Caminho do arquivo ou conteúdo do PDF em memória (upload)
+PDFSource = Union[str, bytes, bytearray, memoryview]
+
+# on_page(paginas_concluidas, total_paginas, entradas_novas)
+PageCallback = Callable[[int, int, List[LedgerEntry]], None]
+
+
+def open_pdf(source: PDFSource) -> "fitz.Document":
+    """Abre o PDF a partir de um caminho ou direto da memória, sem arquivo temporário"""
+    if isinstance(source, str):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def describe_source(source: PDFSource) -> str:
+    if isinstance(source, str):
+        return source
+    return f"<memória: {len(source)} bytes>"
+
+
+class ExtractionStats:
+    """
+    Contadores de uma extração (páginas processadas e vindas do cache, OCRs
+    reaproveitados do cache de OCR e o tempo de tesseract que eles pouparam)
+    """
+
+    __slots__ = (
+        "paginas",
+        "paginas_cache",
+        "paginas_layout",
+        "linhas_descartadas",
+        "linhas_planilha",
+        "ocr_cache",
+        "segundos_ocr_economizados",
+    )
+
+    def __init__(
+        self,
+        paginas: int = 0,
+        paginas_cache: int = 0,
+        paginas_layout: int = 0,
+        linhas_descartadas: int = 0,
+        linhas_planilha: int = 0,
+        ocr_cache: int = 0,
+        segundos_ocr_economizados: float = 0.0,
+    ):
+        self.paginas = paginas
+        self.paginas_cache = paginas_cache
+        # páginas lidas com um layout já aprendido (sem detectar colunas)
+        self.paginas_layout = paginas_layout
+        # linhas descartadas pela pré-classificação (sem data ou sem valor)
+        self.linhas_descartadas = linhas_descartadas
+        # linhas de dados lidas de planilhas (ExcelReader)
+        self.linhas_planilha = linhas_planilha
+        self.ocr_cache = ocr_cache
+        self.segundos_ocr_economizados = segundos_ocr_economizados
+
+    def add(self, other: "ExtractionStats") -> None:
+        self.paginas += other.paginas
+        self.paginas_cache += other.paginas_cache
+        self.paginas_layout += other.paginas_layout
+        self.linhas_descartadas += other.linhas_descartadas
+        self.linhas_planilha += other.linhas_planilha
+        self.ocr_cache += other.ocr_cache
+        self.segundos_ocr_economizados += other.segundos_ocr_economizados
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "paginas": self.paginas,
+            "paginasEmCache": self.paginas_cache,
+            "paginasComLayout": self.paginas_layout,
+            "linhasDescartadas": self.linhas_descartadas,
+            "linhasPlanilha": self.linhas_planilha,
+            "ocrEmCache": self.ocr_cache,
+            "segundosOcrEconomizados": round(self.segundos_ocr_economizados, 2),
+        }
+
+
+class _PendingOCR:
+    """Página enviada ao OCR, resolvida (na ordem das páginas) por _finish_ocr"""
+
+    __slots__ = (
+        "page_num",
+        "future",
+        "dpi",
+        "cache_key",
+        "previous",
+        "ocr_key",
+        "ocr_saved",
+    )
+
+    def __init__(
+        self,
+        page_num: int,
+        future: "Future[Tuple[str, float, float]]",
+        dpi: int,
+        ocr_key: Optional[str] = None,
+        ocr_saved: Optional[float] = None,
+    ):
+        self.page_num = page_num
+        # (texto, confiança, segundos de tesseract)
+        self.future = future
+        self.dpi = dpi
+        self.cache_key: Optional[str] = None
+        # chave no cache de OCR (hash da imagem renderizada)
+        self.ocr_key = ocr_key
+        # segundos poupados quando o resultado veio do cache de OCR
+        self.ocr_saved = ocr_saved
+        # (texto, confiança) de uma tentativa anterior com DPI menor
+        self.previous: Optional[Tuple[str, float]] = None
+
+
+PageResult = Union[List[LedgerEntry], _PendingOCR]
+
+# campo -> índice da coluna de onde ele sai (None = campo vazio)
+ColumnFields = Dict[str, Optional[int]]
+
+
+class LayoutTemplate:
+    """
+    Geometria de um formato de relatório, aprendida na primeira página em
+    que o cabeçalho da tabela aparece: centros das colunas, a coluna de cada
+    campo e a faixa horizontal (x) da tabela que contém esses campos
+    """
+
+    __slots__ = ("colunas", "campos", "x_min", "x_max")
+
+    def __init__(
+        self, colunas: List[float], campos: ColumnFields, x_min: float, x_max: float
+    ):
+        self.colunas = colunas
+        self.campos = campos
+        self.x_min = x_min
+        self.x_max = x_max
+
+    @classmethod
+    def learn(cls, colunas: List[float], campos: ColumnFields) -> "LayoutTemplate":
+        """
+        A faixa vai até a metade do caminho para as colunas vizinhas das
+        colunas usadas: palavras fora dela cairiam em colunas ignoradas
+        """
+        used = sorted(col for col in campos.values() if col is not None)
+        first, last = used[0], used[-1]
+        x_min = (colunas[first - 1] + colunas[first]) / 2 if first > 0 else -math.inf
+        x_max = (
+            (colunas[last] + colunas[last + 1]) / 2
+            if last + 1 < len(colunas)
+            else math.inf
+        )
+        return cls(colunas, campos, x_min, x_max)
+
+    def to_json(self) -> bytes:
+        return json.dumps(
+            {
+                "colunas": self.colunas,
+                "campos": self.campos,
+                "faixa": [self.x_min, self.x_max],
+            }
+        ).encode("utf-8")
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> "LayoutTemplate":
+        data = json.loads(raw)
+        x_min, x_max = data["faixa"]
+        return cls(data["colunas"], data["campos"], x_min, x_max)
+
 
 class PDFReader:
     """
@@ -26,8 +209,8 @@ class PDFReader:
     - Detecta colunas por cluster em X
     - Heurísticas para mapear colunas a campos (codigo, data, nota, fornecedor, valor)
     - Fallbacks: texto simples e OCR (opcional)
-    Saída: lista de dicts com chaves:
-      codigoFornecedor, fornecedor, data, notaSerie, valorContabil, valor, posicao
+    Saída: lista de LedgerEntry (to_dict() gera as chaves
+      codigoFornecedor, fornecedor, data, notaSerie, valorContabil, valor, posicao)
     """
 
     DATE_REGEX = re.compile(r"\b\d{1,2}/\d{1,2}/\d{2,4}\b")
@@ -36,67 +219,604 @@ class PDFReader:
     # CF examples: long numeric sequences between 5 and 20 digits - heuristic for nota
     # Adjust thresholds as needed for seus PDFs
 
-    def __init__(self, tolerance: int = 35):
+    # Pré-classificação: toda entrada precisa de uma data e de um valor
+    # monetário (ver _build_entry_from_mapped/_is_header_line), e os dois
+    # estão sempre dentro do texto da linha. Sem eles a linha é descartada
+    # antes do mapeamento de colunas, numa só busca.
+    DATA_LINE_REGEX = re.compile(
+        rf"(?=.*?{DATE_REGEX.pattern})(?=.*?(?:{MONETARY_REGEX.pattern}))", re.DOTALL
+    )
+
+    # Palavras típicas de cabeçalho (_is_header_line), numa alternância
+    HEADER_KEYWORDS = (
+        "documento",
+        "doc",
+        "fornecedor",
+        "descrição",
+        "descricao",
+        "valor",
+        "contábil",
+        "contabil",
+        "nota",
+        "serie",
+        "série",
+        "código",
+        "codigo",
+        "data",
+        "entrada",
+        "cfop",
+        "controle",
+        "loja",
+        "cnpj",
+    )
+    HEADER_KEYWORDS_REGEX = re.compile("|".join(map(re.escape, HEADER_KEYWORDS)))
+
+    # Incrementar quando uma mudança na extração alterar as entradas de uma
+    # mesma página (invalida o cache de páginas)
+    PAGE_CACHE_VERSION = 3
+    # Incrementar quando _ocr_image mudar o texto devolvido para uma mesma
+    # imagem (invalida o cache de OCR)
+    OCR_CACHE_VERSION = 1
+    # Incrementar quando mudar o aprendizado de layouts (invalida o cache de layouts)
+    LAYOUT_CACHE_VERSION = 1
+
+    # palavras do cabeçalho da tabela que identificam o layout do relatório
+    LAYOUT_HEADER_WORDS = frozenset(
+        (
+            "codigo",
+            "código",
+            "data",
+            "nota",
+            "serie",
+            "série",
+            "documento",
+            "fornecedor",
+            "descricao",
+            "descrição",
+            "valor",
+            "contabil",
+            "contábil",
+            "cfop",
+        )
+    )
+    # o cabeçalho é procurado só nas primeiras linhas da página
+    LAYOUT_HEADER_MAX_LINES = 15
+    # linhas válidas (todas com as mesmas colunas) para aprender um layout
+    LAYOUT_MIN_ENTRIES = 3
+
+    # python: dicts por linha e coluna mais próxima palavra a palavra;
+    # numpy: NumpyPageLayout (mesmo resultado, vetorizado por página)
+    LAYOUT_ENGINES = ("python", "numpy")
+
+    def __init__(
+        self,
+        tolerance: int = 35,
+        parallel_workers: int = 1,
+        parallel_min_pages: int = 300,
+        page_cache: Optional[SQLiteCache] = None,
+        ocr_workers: int = 1,
+        ocr_dpi: int = 150,
+        ocr_max_dpi: int = 300,
+        ocr_min_confidence: float = 70.0,
+        ocr_lang: str = "por",
+        ocr_cache: Optional[SQLiteCache] = None,
+        layout_cache: Optional[SQLiteCache] = None,
+        layout_engine: str = "python",
+        line_tolerance: float = 0.0,
+    ):
         """
         tolerance: pixel tolerance para agrupar x's em uma mesma coluna
+        parallel_workers: processos para extração paralela por faixas de páginas (1 = desligado)
+        parallel_min_pages: a partir de quantas páginas o modo paralelo é usado automaticamente
+        page_cache: cache das entradas de cada página, pela impressão digital
+            do conteúdo (páginas iguais de outro PDF não são reprocessadas)
+        ocr_workers: páginas escaneadas processadas pelo tesseract ao mesmo tempo
+        ocr_dpi: resolução da primeira tentativa de OCR
+        ocr_max_dpi: resolução da nova tentativa quando a confiança é baixa
+        ocr_min_confidence: confiança média (0-100) abaixo da qual a página
+            é renderizada de novo com ocr_max_dpi
+        ocr_lang: idioma(s) do tesseract
+        ocr_cache: cache do texto do OCR pelo hash da imagem renderizada
+            (+ idioma e DPI); vale mesmo quando o cache de páginas não acerta
+            (outro PDF com a mesma digitalização, mudança na extração)
+        layout_cache: layouts aprendidos, pelo cabeçalho da tabela (texto +
+            posição x); páginas com um layout conhecido não detectam colunas
+            nem decidem os campos linha a linha
+        layout_engine: agrupamento de linhas e colunas (ver LAYOUT_ENGINES)
+        line_tolerance: só no motor numpy; linhas com y até essa distância
+            viram uma só (0 = mesmo y arredondado, como no motor python)
         """
+        if layout_engine not in self.LAYOUT_ENGINES:
+            raise ValueError(f"Motor de layout inválido: {layout_engine}")
+
         self.tolerance = tolerance
+        self.parallel_workers = max(1, parallel_workers)
+        self.parallel_min_pages = parallel_min_pages
+        self.page_cache = page_cache
+        self.ocr_workers = max(1, ocr_workers)
+        self.ocr_dpi = ocr_dpi
+        self.ocr_max_dpi = max(ocr_dpi, ocr_max_dpi)
+        self.ocr_min_confidence = ocr_min_confidence
+        self.ocr_lang = ocr_lang
+        self.ocr_cache = ocr_cache
+        self.layout_cache = layout_cache
+        self.layout_engine = layout_engine
+        self.line_tolerance = line_tolerance
+        self._layouts: Dict[str, LayoutTemplate] = {}
+        self._ocr_executor: Optional[ThreadPoolExecutor] = None
+        # processos da extração paralela: criados na primeira vez e reaproveitados
+        self._parallel_executor: Optional[ProcessPoolExecutor] = None
 
     # -------------------------
     # Interface principal
     # -------------------------
-    def extract_from_pdf(self, pdf_path: str) -> List[Dict[str, Any]]:
-        logger.info(f"🔍 Iniciando extração com PyMuPDF: {pdf_path}")
-        doc = fitz.open(pdf_path)
-        all_entries: List[Dict[str, Any]] = []
+    def extract_from_pdf(
+        self,
+        source: PDFSource,
+        parallel: Optional[bool] = None,
+        on_page: Optional[PageCallback] = None,
+        stats: Optional[ExtractionStats] = None,
+    ) -> List[LedgerEntry]:
+        """
+        source: caminho do PDF ou bytes/memoryview com o conteúdo
+        parallel: None = automático (parallel_workers > 1 e páginas >= parallel_min_pages)
+        on_page: chamado, em ordem, a cada página (ou faixa, no modo paralelo) concluída
+        stats: se informado, recebe a contagem de páginas (e de acertos do cache)
+        """
+        if stats is None:
+            stats = ExtractionStats()
+
+        logger.info(f"🔍 Iniciando extração com PyMuPDF: {describe_source(source)}")
+        doc = open_pdf(source)
+        total_pages = len(doc)
+
+        if parallel is None:
+            parallel = (
+                self.parallel_workers > 1 and total_pages >= self.parallel_min_pages
+            )
 
-        for page_num, page in enumerate(doc, start=1):
-            logger.info(f"📄 Processando página {page_num}/{len(doc)}")
+        if parallel and total_pages > 1:
+            doc.close()
+            all_entries = self._extract_parallel(source, total_pages, on_page, stats)
+        else:
             try:
-                words = page.get_text(
-                    "words"
-                )  # normalmente [x0,y0,x1,y1,text,block,line,wordno]
-            except Exception as e:
-                logger.exception(
-                    "Falha ao obter words da página, tentando fallback textual"
+                all_entries = self._extract_page_range(
+                    doc, 1, total_pages, on_page, stats
                 )
-                text = page.get_text()
-                all_entries.extend(self._extract_from_plain_text(text, page_num))
-                continue
+            finally:
+                doc.close()
 
-            # se words vazio -> tentar fallback texto e OCR
-            if not words:
-                text = page.get_text().strip()
-                if text:
-                    all_entries.extend(self._extract_from_plain_text(text, page_num))
-                else:
-                    # tenta OCR, se disponível
-                    if OCR_AVAILABLE:
-                        logger.info(
-                            "Nenhum texto extraído — tentando OCR (pdf2image + pytesseract)"
-                        )
-                        ocr_text = self._ocr_pdf_page(pdf_path, page_num)
-                        all_entries.extend(
-                            self._extract_from_plain_text(ocr_text, page_num)
-                        )
-                    else:
-                        logger.warning("Nenhum texto e OCR não disponível.")
-                continue
+        if stats.paginas_cache:
+            logger.info(
+                f"♻️ {stats.paginas_cache}/{stats.paginas} páginas reaproveitadas do cache"
+            )
+        logger.info(f"🎯 Extração finalizada. Total registros: {len(all_entries)}")
+        return all_entries
+
+    def extract_raw_text(self, source: PDFSource) -> str:
+        """Texto bruto de todas as páginas (diagnóstico)"""
+        doc = open_pdf(source)
+        try:
+            return "\n".join(page.get_text() for page in doc)
+        finally:
+            doc.close()
+
+    def _extract_parallel(
+        self,
+        source: PDFSource,
+        total_pages: int,
+        on_page: Optional[PageCallback] = None,
+        stats: Optional[ExtractionStats] = None,
+    ) -> List[LedgerEntry]:
+        """
+        Divide as páginas em faixas e processa cada faixa em um processo,
+        que abre o documento por conta própria. Os resultados são unidos na
+        ordem das faixas, então a ordem (e a posicao) é a mesma do modo sequencial.
+        PDFs em memória são gravados uma vez em um arquivo temporário: cada
+        faixa recebe só o caminho, e não uma cópia do upload inteiro.
+        """
+        if not isinstance(source, str):
+            fd, path = tempfile.mkstemp(prefix="extracao-", suffix=".pdf")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(source)
+                return self._extract_parallel(path, total_pages, on_page, stats)
+            finally:
+                os.unlink(path)
+
+        workers = min(self.parallel_workers, total_pages)
+        # mais faixas que processos para equilibrar páginas densas/vazias
+        shard_size = max(1, -(-total_pages // (workers * 4)))
+        shards = [
+            (start, min(start + shard_size - 1, total_pages))
+            for start in range(1, total_pages + 1, shard_size)
+        ]
+        logger.info(
+            f"⚡ Extração paralela: {total_pages} páginas em {len(shards)} faixas, {workers} processos"
+        )
+
+        all_entries: List[LedgerEntry] = []
+        results = self._get_parallel_executor().map(
+            _extract_shard,
+            repeat(source),
+            repeat(self._shard_settings()),
+            [first for first, _ in shards],
+            [last for _, last in shards],
+        )
+        for (_, last_page), (entries, shard_stats) in zip(shards, results):
+            all_entries.extend(entries)
+            if stats is not None:
+                stats.add(shard_stats)
+            if on_page:
+                on_page(last_page, total_pages, entries)
+
+        return all_entries
 
-            # Agrupar mantendo coordenadas
+    def _get_parallel_executor(self) -> ProcessPoolExecutor:
+        # subir processos spawn custa ~1s: um pool só, vivo enquanto o PDFReader existir
+        if self._parallel_executor is None:
+            self._parallel_executor = ProcessPoolExecutor(
+                max_workers=self.parallel_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._parallel_executor
+
+    def _shard_settings(self) -> Dict[str, Any]:
+        """Parâmetros do PDFReader criado em cada processo da extração paralela"""
+        return {
+            "tolerance": self.tolerance,
+            "page_cache": self.page_cache,
+            # as faixas já rodam em paralelo: divide as threads de OCR entre elas
+            "ocr_workers": max(1, self.ocr_workers // self.parallel_workers),
+            "ocr_dpi": self.ocr_dpi,
+            "ocr_max_dpi": self.ocr_max_dpi,
+            "ocr_min_confidence": self.ocr_min_confidence,
+            "ocr_lang": self.ocr_lang,
+            "ocr_cache": self.ocr_cache,
+            "layout_cache": self.layout_cache,
+            "layout_engine": self.layout_engine,
+            "line_tolerance": self.line_tolerance,
+        }
+
+    def close(self) -> None:
+        """Encerra as threads do OCR e os processos da extração paralela (se foram criados)"""
+        if self._ocr_executor is not None:
+            self._ocr_executor.shutdown(wait=False, cancel_futures=True)
+            self._ocr_executor = None
+        if self._parallel_executor is not None:
+            self._parallel_executor.shutdown(wait=False, cancel_futures=True)
+            self._parallel_executor = None
+
+    def _extract_page_range(
+        self,
+        doc: "fitz.Document",
+        first_page: int,
+        last_page: int,
+        on_page: Optional[PageCallback] = None,
+        stats: Optional[ExtractionStats] = None,
+    ) -> List[LedgerEntry]:
+        """
+        Extrai as páginas first_page..last_page (1-indexed, inclusivo).
+        Páginas escaneadas vão para o OCR em segundo plano enquanto as
+        próximas são lidas; entradas e on_page continuam na ordem das páginas.
+        """
+        all_entries: List[LedgerEntry] = []
+        total_pages = len(doc)
+        pending: Deque[Tuple[int, PageResult]] = deque()
+
+        for page_num in range(first_page, last_page + 1):
+            logger.info(f"📄 Processando página {page_num}/{total_pages}")
+            page = doc[page_num - 1]
+            pending.append((page_num, self._extract_page(page, page_num, stats)))
+            self._flush_pages(doc, pending, all_entries, on_page, stats, wait=False)
+
+        self._flush_pages(doc, pending, all_entries, on_page, stats, wait=True)
+        return all_entries
+
+    def _flush_pages(
+        self,
+        doc: "fitz.Document",
+        pending: Deque[Tuple[int, PageResult]],
+        all_entries: List[LedgerEntry],
+        on_page: Optional[PageCallback],
+        stats: Optional[ExtractionStats],
+        wait: bool,
+    ) -> None:
+        """Entrega as páginas prontas do início da fila (wait: aguarda o OCR)"""
+        total_pages = len(doc)
+
+        while pending:
+            page_num, result = pending[0]
+
+            if isinstance(result, _PendingOCR):
+                if not wait and not result.future.done():
+                    return
+                result = self._finish_ocr(doc, result, stats)
+                if isinstance(result, _PendingOCR):
+                    # nova tentativa com DPI maior
+                    pending[0] = (page_num, result)
+                    continue
+
+            pending.popleft()
+            all_entries.extend(result)
+            if on_page:
+                on_page(page_num, total_pages, result)
+
+    def _extract_page(
+        self,
+        page: "fitz.Page",
+        page_num: int,
+        stats: Optional[ExtractionStats] = None,
+    ) -> PageResult:
+        if stats is not None:
+            stats.paginas += 1
+
+        try:
+            words = page.get_text(
+                "words"
+            )  # normalmente [x0,y0,x1,y1,text,block,line,wordno]
+        except Exception as e:
+            logger.exception(
+                "Falha ao obter words da página, tentando fallback textual"
+            )
+            text = page.get_text()
+            return self._extract_from_plain_text(text, page_num)
+
+        if self.page_cache is None or not self.page_cache.enabled:
+            return self._extract_page_words(page, page_num, words, stats)
+
+        # entradas dependem só do conteúdo da página: reaproveita se já vista
+        cache_key = self._page_fingerprint(page, words)
+        cached = self.page_cache.get(cache_key)
+        if cached is not None:
+            if stats is not None:
+                stats.paginas_cache += 1
+            return [LedgerEntry.from_row(row, page_num) for row in json.loads(cached)]
+
+        entries = self._extract_page_words(page, page_num, words, stats)
+        if isinstance(entries, _PendingOCR):
+            # guardado quando o OCR terminar (_finish_ocr)
+            entries.cache_key = cache_key
+        else:
+            self._cache_page(cache_key, entries)
+        return entries
+
+    def _cache_page(self, cache_key: str, entries: List[LedgerEntry]) -> None:
+        self.page_cache.set(
+            cache_key,
+            json.dumps(
+                [entry.to_row() for entry in entries], ensure_ascii=False
+            ).encode("utf-8"),
+        )
+
+    def _page_fingerprint(self, page: "fitz.Page", words: List[Any]) -> str:
+        """
+        Impressão digital do que a extração lê da página: as palavras com
+        coordenadas (camada de texto) ou, sem elas, o texto simples ou as
+        imagens que iriam para o OCR
+        """
+        digest = hashlib.sha256()
+        digest.update(
+            f"{self.PAGE_CACHE_VERSION}|{self.tolerance}|{self._layouts_enabled}|"
+            f"{self.layout_engine}|{self.line_tolerance}|".encode("utf-8")
+        )
+
+        if words:
+            # a extração só usa x0, y0 e o texto de cada palavra
+            digest.update(b"words|")
+            digest.update(array("d", [v for w in words for v in w[:2]]).tobytes())
+            digest.update("\x1f".join(str(w[4]) for w in words).encode("utf-8"))
+            return digest.hexdigest()
+
+        text = page.get_text().strip()
+        if text:
+            digest.update(b"text|")
+            digest.update(text.encode("utf-8"))
+            return digest.hexdigest()
+
+        digest.update(
+            f"ocr|{self.ocr_dpi}|{self.ocr_max_dpi}|{self.ocr_min_confidence}|"
+            f"{self.ocr_lang}|{tuple(page.rect)}|{page.rotation}|".encode("utf-8")
+        )
+        for image in page.get_images(full=True):
+            digest.update(page.parent.xref_stream_raw(image[0]) or b"")
+        return digest.hexdigest()
+
+    def _extract_page_words(
+        self,
+        page: "fitz.Page",
+        page_num: int,
+        words: List[Any],
+        stats: Optional[ExtractionStats] = None,
+    ) -> PageResult:
+        # se words vazio -> tentar fallback texto e OCR
+        if not words:
+            text = page.get_text().strip()
+            if text:
+                return self._extract_from_plain_text(text, page_num)
+            # tenta OCR, se disponível
+            if OCR_AVAILABLE:
+                logger.info(
+                    "Nenhum texto extraído — tentando OCR (PyMuPDF + pytesseract)"
+                )
+                return self._submit_ocr(page, page_num, self.ocr_dpi)
+            logger.warning("Nenhum texto e OCR não disponível.")
+            return []
+
+        # Agrupar mantendo coordenadas
+        page_layout = None
+        if self.layout_engine == "numpy":
+            page_layout = NumpyPageLayout(words, self.line_tolerance)
+            grouped_lines = page_layout.lines
+        else:
             grouped_lines = self._group_words_by_line(words)
-            if not grouped_lines:
-                logger.debug("Nenhuma linha agrupada; pulando página")
-                continue
+        if not grouped_lines:
+            logger.debug("Nenhuma linha agrupada; pulando página")
+            return []
 
-            # detectar colunas
+        header_row = self._find_header_row(grouped_lines)
+        signature = self._layout_signature(grouped_lines, header_row)
+        if signature is not None:
+            layout = self._get_layout(signature)
+            if layout is not None:
+                if stats is not None:
+                    stats.paginas_layout += 1
+                return self._extract_entries_with_layout(
+                    grouped_lines, layout, page_num, page_layout, header_row, stats
+                )
+
+        # detectar colunas
+        cols_by_line = None
+        if page_layout is not None:
+            columns = page_layout.detect_columns(self.tolerance)
+            cols_by_line = page_layout.split_columns(columns)
+        else:
             columns = self._detect_columns(grouped_lines)
-            # extrair registros
-            entries = self._extract_entries(grouped_lines, columns, page_num)
-            all_entries.extend(entries)
+        # extrair registros
+        if signature is None:
+            return self._extract_entries(
+                grouped_lines,
+                columns,
+                page_num,
+                cols_by_line=cols_by_line,
+                header_row=header_row,
+                stats=stats,
+            )
 
-        logger.info(f"🎯 Extração finalizada. Total registros: {len(all_entries)}")
-        return all_entries
+        resolved: List[ColumnFields] = []
+        entries = self._extract_entries(
+            grouped_lines, columns, page_num, resolved, cols_by_line, header_row, stats
+        )
+        self._learn_layout(signature, columns, resolved)
+        return entries
+
+    # -------------------------
+    # Layouts conhecidos (cache de layouts)
+    # -------------------------
+    @property
+    def _layouts_enabled(self) -> bool:
+        return self.layout_cache is not None and self.layout_cache.enabled
+
+    def _find_header_row(self, lines: List[List[Tuple[float, str]]]) -> Optional[int]:
+        """Índice da linha de cabeçalho da tabela (3+ palavras de cabeçalho), se houver"""
+        for idx, line in enumerate(lines[: self.LAYOUT_HEADER_MAX_LINES]):
+            hits = sum(1 for _, text in line if text.lower() in self.LAYOUT_HEADER_WORDS)
+            if hits >= 3:
+                return idx
+        return None
+
+    def _layout_signature(
+        self, lines: List[List[Tuple[float, str]]], header_row: Optional[int]
+    ) -> Optional[str]:
+        """Hash da linha de cabeçalho da tabela (textos + posições x), se houver"""
+        if not self._layouts_enabled or header_row is None:
+            return None
+
+        digest = hashlib.sha256(
+            f"{self.LAYOUT_CACHE_VERSION}|{self.tolerance}|".encode("utf-8")
+        )
+        digest.update(
+            "\x1f".join(f"{text}@{round(x)}" for x, text in lines[header_row]).encode(
+                "utf-8"
+            )
+        )
+        return digest.hexdigest()
+
+    def _skip_line(
+        self,
+        line: List[Tuple[float, str]],
+        idx: int,
+        header_row: Optional[int],
+        stats: Optional[ExtractionStats],
+    ) -> bool:
+        """
+        Pré-classificação: True para linhas que não podem virar entrada (o
+        cabeçalho da página ou sem data/valor), sem passar pelo mapeamento
+        """
+        if idx != header_row and self.DATA_LINE_REGEX.match(
+            " ".join(text for _, text in line)
+        ):
+            return False
+        if stats is not None:
+            stats.linhas_descartadas += 1
+        return True
+
+    def _get_layout(self, signature: str) -> Optional[LayoutTemplate]:
+        layout = self._layouts.get(signature)
+        if layout is None:
+            cached = self.layout_cache.get(signature)
+            if cached is not None:
+                layout = self._layouts[signature] = LayoutTemplate.from_json(cached)
+        return layout
+
+    def _learn_layout(
+        self, signature: str, columns: List[float], resolved: List[ColumnFields]
+    ) -> None:
+        """
+        Guarda o layout quando todas as linhas válidas da página tiraram
+        cada campo da mesma coluna (formato de relatório estável)
+        """
+        if len(resolved) < self.LAYOUT_MIN_ENTRIES:
+            return
+        campos = resolved[0]
+        if any(r != campos for r in resolved[1:]):
+            logger.debug("Colunas variam entre as linhas; layout não aprendido")
+            return
+
+        layout = LayoutTemplate.learn(columns, campos)
+        self._layouts[signature] = layout
+        self.layout_cache.set(signature, layout.to_json())
+        logger.info(f"📐 Layout aprendido: {len(columns)} colunas, campos {campos}")
+
+    def _extract_entries_with_layout(
+        self,
+        lines: List[List[Tuple[float, str]]],
+        layout: LayoutTemplate,
+        page_num: int,
+        page_layout: Optional[NumpyPageLayout] = None,
+        header_row: Optional[int] = None,
+        stats: Optional[ExtractionStats] = None,
+    ) -> List[LedgerEntry]:
+        """
+        Mapeia cada linha direto pelas colunas do layout, só com as palavras
+        da faixa da tabela. Linhas que não formam uma entrada assim (cabeçalho,
+        totais, linha fora do padrão) passam pela heurística completa.
+        """
+        entries = []
+        columns = layout.colunas
+        table_cols = full_cols = None
+        if page_layout is not None:
+            table_cols = page_layout.split_columns(columns, layout.x_min, layout.x_max)
+
+        for idx, line in enumerate(lines):
+            if self._skip_line(line, idx, header_row, stats):
+                continue
+            try:
+                if table_cols is not None:
+                    cols_text = table_cols[idx]
+                else:
+                    cols_text = self._split_columns(
+                        [(x, t) for x, t in line if layout.x_min < x <= layout.x_max],
+                        columns,
+                    )
+                mapped = self._apply_columns(cols_text, layout.campos)
+                entry = self._build_entry_from_mapped(mapped, page_num, idx)
+                if entry is None:
+                    if page_layout is not None:
+                        if full_cols is None:
+                            full_cols = page_layout.split_columns(columns)
+                        cols_text = full_cols[idx]
+                    else:
+                        cols_text = self._split_columns(line, columns)
+                    mapped = self._map_columns_heuristic(cols_text)
+                    entry = self._build_entry_from_mapped(mapped, page_num, idx)
+                if entry:
+                    entries.append(entry)
+            except Exception as e:
+                logger.exception(f"Erro processando linha {idx}: {e}")
+                continue
+
+        return entries
 
     # -------------------------
     # Agrupamento por linha
@@ -173,26 +893,37 @@ class PDFReader:
     # Extrair por linha usando colunas
     # -------------------------
     def _extract_entries(
-        self, lines: List[List[Tuple[float, str]]], columns: List[float], page_num: int
-    ) -> List[Dict[str, Any]]:
+        self,
+        lines: List[List[Tuple[float, str]]],
+        columns: List[float],
+        page_num: int,
+        resolved: Optional[List[ColumnFields]] = None,
+        cols_by_line: Optional[List[Dict[int, str]]] = None,
+        header_row: Optional[int] = None,
+        stats: Optional[ExtractionStats] = None,
+    ) -> List[LedgerEntry]:
+        """
+        resolved: se informado, recebe a coluna de cada campo de cada linha
+        que virou entrada (para aprender o layout)
+        cols_by_line: cols_text de cada linha já calculado (motor numpy)
+        header_row: linha de cabeçalho da página (_find_header_row)
+        """
         entries = []
         has_columns = bool(columns)
 
         for idx, line in enumerate(lines):
+            if self._skip_line(line, idx, header_row, stats):
+                continue
             try:
+                fields = None
                 if has_columns:
-                    # construir col_data: index -> list[str]
-                    col_data = {i: [] for i in range(len(columns))}
-                    for x, text in line:
-                        # escolhe coluna mais próxima
-                        col_idx = min(
-                            range(len(columns)), key=lambda i: abs(x - columns[i])
-                        )
-                        col_data[col_idx].append(text)
-                    # transformar em strings
-                    cols_text = {i: " ".join(col_data[i]).strip() for i in col_data}
+                    if cols_by_line is not None:
+                        cols_text = cols_by_line[idx]
+                    else:
+                        cols_text = self._split_columns(line, columns)
                     # mapear colunas para campos via heurística
-                    mapped = self._map_columns_heuristic(cols_text)
+                    fields = self._resolve_columns(cols_text)
+                    mapped = self._apply_columns(cols_text, fields)
                 else:
                     # sem colunas detectadas: heurística simples por posição
                     texts = [t for _, t in line]
@@ -202,12 +933,27 @@ class PDFReader:
                 entry = self._build_entry_from_mapped(mapped, page_num, idx)
                 if entry:
                     entries.append(entry)
+                    if resolved is not None and fields is not None:
+                        resolved.append(fields)
             except Exception as e:
                 logger.exception(f"Erro processando linha {idx}: {e}")
                 continue
 
         return entries
 
+    def _split_columns(
+        self, line: List[Tuple[float, str]], columns: List[float]
+    ) -> Dict[int, str]:
+        """Texto de cada coluna (cada palavra vai para a coluna mais próxima)"""
+        # construir col_data: index -> list[str]
+        col_data = {i: [] for i in range(len(columns))}
+        for x, text in line:
+            # escolhe coluna mais próxima
+            col_idx = min(range(len(columns)), key=lambda i: abs(x - columns[i]))
+            col_data[col_idx].append(text)
+        # transformar em strings
+        return {i: " ".join(col_data[i]).strip() for i in col_data}
+
     # -------------------------
     # Heurísticas de mapeamento
     # -------------------------
@@ -215,6 +961,36 @@ class PDFReader:
         """
         Recebe cols_text: {col_idx: texto}
         Retorna dicionário mapeado: codigo, data, nota, fornecedor, valor
+        """
+        return self._apply_columns(cols_text, self._resolve_columns(cols_text))
+
+    def _apply_columns(
+        self, cols_text: Dict[int, str], fields: ColumnFields
+    ) -> Dict[str, str]:
+        """Monta o dicionário mapeado a partir da coluna escolhida para cada campo"""
+        mapped = {"codigo": "", "data": "", "nota": "", "fornecedor": "", "valor": ""}
+
+        for field, col in fields.items():
+            if col is None:
+                continue
+            text = cols_text.get(col, "")
+            if field == "nota":
+                text = self._note_candidate(text) or ""
+            mapped[field] = text.strip()
+
+        return mapped
+
+    def _note_candidate(self, s: str) -> Optional[str]:
+        m = self.NOTE_LIKE_REGEX.search(s)
+        if m:
+            # return first non-empty capture
+            g = next((grp for grp in m.groups() if grp), None)
+            return g or m.group(0)
+        return None
+
+    def _resolve_columns(self, cols_text: Dict[int, str]) -> ColumnFields:
+        """
+        Escolhe a coluna de cada campo (codigo, data, nota, fornecedor, valor)
         Heurística:
          - coluna com maior ocorrência de datas -> data
          - coluna com maior ocorrência de valores (padrão monetário) -> valor
@@ -222,75 +998,45 @@ class PDFReader:
          - coluna à esquerda com dígitos curtos -> codigo
          - nota: sequência numérica longa ou token 'NF' em qualquer coluna
         """
-        mapped = {"codigo": "", "data": "", "nota": "", "fornecedor": "", "valor": ""}
+        fields: ColumnFields = dict.fromkeys(
+            ("codigo", "data", "nota", "fornecedor", "valor")
+        )
 
         if not cols_text:
-            return mapped
-
-        # detect helpers
-        def has_date(s: str) -> bool:
-            return bool(self.DATE_REGEX.search(s))
-
-        def has_money(s: str) -> bool:
-            return bool(self.MONETARY_REGEX.search(s))
-
-        def candidate_note(s: str) -> Optional[str]:
-            m = self.NOTE_LIKE_REGEX.search(s)
-            if m:
-                # return first non-empty capture
-                g = next((grp for grp in m.groups() if grp), None)
-                return g or m.group(0)
-            return None
+            return fields
 
         # compute metrics per column
         metrics = {}
         for k, v in cols_text.items():
             metrics[k] = {
-                "text": v,
                 "len": len(v),
                 "digits": sum(c.isdigit() for c in v),
                 "letters": sum(c.isalpha() for c in v),
-                "has_date": has_date(v),
-                "has_money": has_money(v),
-                "note_candidate": candidate_note(v),
+                "has_date": bool(self.DATE_REGEX.search(v)),
+                "has_money": bool(self.MONETARY_REGEX.search(v)),
+                "note_candidate": self._note_candidate(v),
             }
 
-        # data column: prefer column with has_date True
-        date_cols = [k for k in metrics if metrics[k]["has_date"]]
-        if date_cols:
-            # pick the one with most dates/len
-            mapped["data"] = next(metrics[k]["text"] for k in date_cols)
-        else:
-            # try to find date-like token inside any column text (DD/MM/YYYY)
-            for k in metrics:
-                m = self.DATE_REGEX.search(metrics[k]["text"])
-                if m:
-                    mapped["data"] = m.group(0)
-                    break
+        # data column: first column with has_date True
+        fields["data"] = next((k for k in metrics if metrics[k]["has_date"]), None)
 
         # value column: prefer has_money True, else rightmost non-empty with digits
         value_cols = [k for k in metrics if metrics[k]["has_money"]]
         if value_cols:
             # choose the rightmost money column (higher k usually rightmost)
-            chosen = sorted(value_cols)[-1]
-            mapped["valor"] = metrics[chosen]["text"]
+            fields["valor"] = sorted(value_cols)[-1]
         else:
             # rightmost col with digits
             for k in sorted(metrics.keys(), reverse=True):
                 if metrics[k]["digits"] > 0:
-                    mapped["valor"] = metrics[k]["text"]
+                    fields["valor"] = k
                     break
 
         # note detection: prefer note_candidate
-        for k in metrics:
-            if metrics[k]["note_candidate"]:
-                mapped["nota"] = metrics[k]["note_candidate"]
-                break
+        fields["nota"] = next((k for k in metrics if metrics[k]["note_candidate"]), None)
 
         # fornecedor: choose column with many letters and longest len (exclude value column)
-        candidate_cols = [
-            k for k in metrics if k != (max(metrics.keys()) if metrics else None)
-        ]
+        candidate_cols = [k for k in metrics if k != max(metrics.keys())]
         if candidate_cols:
             # score by letters and length
             scored = sorted(
@@ -298,21 +1044,15 @@ class PDFReader:
                 key=lambda k: (metrics[k]["letters"], metrics[k]["len"]),
                 reverse=True,
             )
-            mapped["fornecedor"] = metrics[scored[0]]["text"]
+            fields["fornecedor"] = scored[0]
 
         # codigo: leftmost column with digits and short length
         for k in sorted(metrics.keys()):
-            text = metrics[k]["text"]
             if metrics[k]["digits"] > 0 and metrics[k]["len"] <= 8:
-                mapped["codigo"] = text
+                fields["codigo"] = k
                 break
 
-        # final cleanup: strip
-        for k in mapped:
-            if isinstance(mapped[k], str):
-                mapped[k] = mapped[k].strip()
-
-        return mapped
+        return fields
 
     def _map_by_sequence(self, texts: List[str]) -> Dict[str, str]:
         """
@@ -379,7 +1119,7 @@ class PDFReader:
     # -------------------------
     def _build_entry_from_mapped(
         self, mapped: Dict[str, str], page_num: int, line_index: int
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[LedgerEntry]:
 
         if self._is_header_line(mapped):
             return None
@@ -390,21 +1130,21 @@ class PDFReader:
         valor = mapped.get("valor") or ""
         data = mapped.get("data") or ""
 
-        # Normalizar
+        # Normalizar (centavos e ordinal do dia; texto só na resposta)
         fornecedor_norm = clean_supplier_name(fornecedor) if fornecedor else ""
-        data_norm = clean_date(data) if data else ""
-        valor_norm = clean_monetary_value(valor) if valor else "0,00"
+        data_ordinal = parse_date_ordinal(data) if data else None
+        valor_centavos = parse_monetary_cents(valor) if valor else 0
 
         # Validações: manter as mesmas do analyzer
         if not fornecedor_norm or fornecedor_norm == "Desconhecido":
             return None
-        if not data_norm:
+        if data_ordinal is None:
             # tentar buscar data dentro do fornecedor/note/other (segunda chance)
             any_text = " ".join([fornecedor, nota, valor])
             m = self.DATE_REGEX.search(any_text)
             if m:
-                data_norm = clean_date(m.group(0))
-        if valor_norm == "0,00":
+                data_ordinal = parse_date_ordinal(m.group(0))
+        if valor_centavos == 0:
             # tentar buscar valor em outros campos
             for fld in (
                 mapped.get("fornecedor", ""),
@@ -413,29 +1153,29 @@ class PDFReader:
             ):
                 mm = self.MONETARY_REGEX.search(fld)
                 if mm:
-                    valor_norm = clean_monetary_value(mm.group(0))
+                    valor_centavos = parse_monetary_cents(mm.group(0))
                     break
 
-        if not fornecedor_norm or valor_norm == "0,00" or not data_norm:
+        if not fornecedor_norm or valor_centavos == 0 or data_ordinal is None:
             # não temos info mínima para ser considerada válida
             return None
 
-        return {
-            "codigoFornecedor": str(codigo).strip() if codigo else "N/A",
-            "fornecedor": fornecedor_norm,
-            "data": data_norm,
-            "notaSerie": str(nota).strip() if nota else "N/A",
-            "valorContabil": valor_norm,
-            "valor": valor_norm,
-            "posicao": f"Pág {page_num}, Linha {line_index}",
-        }
+        return LedgerEntry(
+            codigo_fornecedor=str(codigo).strip() if codigo else "N/A",
+            fornecedor=fornecedor_norm,
+            data_ordinal=data_ordinal,
+            nota_serie=str(nota).strip() if nota else "N/A",
+            valor_contabil_centavos=valor_centavos,
+            pagina=page_num,
+            linha=line_index,
+        )
 
     # -------------------------
     # Texto puro fallback (regex)
     # -------------------------
     def _extract_from_plain_text(
         self, text: str, page_num: int
-    ) -> List[Dict[str, Any]]:
+    ) -> List[LedgerEntry]:
         entries = []
         if not text:
             return entries
@@ -490,26 +1230,112 @@ class PDFReader:
     # -------------------------
     # OCR de página (opcional)
     # -------------------------
-    def _ocr_pdf_page(self, pdf_path: str, page_number: int) -> str:
+    def _submit_ocr(self, page: "fitz.Page", page_num: int, dpi: int) -> _PendingOCR:
         """
-        Converte página específica para imagem e roda pytesseract.
-        page_number: 1-indexed
+        Renderiza a página direto do documento aberto (sem poppler nem
+        arquivo temporário) e envia a imagem ao tesseract em segundo plano.
+        A renderização fica nesta thread: o PyMuPDF não é thread-safe.
+        Imagem já vista (mesmos pixels, idioma e DPI) vem do cache de OCR.
         """
-        if not OCR_AVAILABLE:
-            return ""
+        pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
 
-        try:
-            images = convert_from_path(
-                pdf_path, first_page=page_number, last_page=page_number, dpi=300
+        ocr_key = None
+        if self.ocr_cache is not None and self.ocr_cache.enabled:
+            digest = hashlib.sha256(
+                f"{self.OCR_CACHE_VERSION}|{self.ocr_lang}|{dpi}|"
+                f"{pix.width}x{pix.height}|".encode("utf-8")
+            )
+            digest.update(pix.samples_mv)
+            ocr_key = digest.hexdigest()
+
+            cached = self.ocr_cache.get(ocr_key)
+            if cached is not None:
+                ocr = json.loads(cached)
+                future: "Future[Tuple[str, float, float]]" = Future()
+                future.set_result((ocr["texto"], ocr["confianca"], 0.0))
+                return _PendingOCR(page_num, future, dpi, ocr_key, ocr["segundos"])
+
+        image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+        del pix
+
+        if self._ocr_executor is None:
+            if self.ocr_workers > 1:
+                # o paralelismo vem das várias páginas; cada tesseract usa 1 thread
+                os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+            self._ocr_executor = ThreadPoolExecutor(
+                max_workers=self.ocr_workers, thread_name_prefix="ocr"
             )
-            if not images:
-                return ""
-            img = images[0]
-            text = pytesseract.image_to_string(img, lang="por")
-            return text
+
+        future = self._ocr_executor.submit(_timed_ocr, image, self.ocr_lang)
+        return _PendingOCR(page_num, future, dpi, ocr_key)
+
+    def _finish_ocr(
+        self,
+        doc: "fitz.Document",
+        pending: _PendingOCR,
+        stats: Optional[ExtractionStats] = None,
+    ) -> PageResult:
+        """
+        Converte o resultado do OCR em entradas. Com confiança abaixo de
+        ocr_min_confidence a página é enviada de novo com ocr_max_dpi
+        (fica o texto da tentativa com maior confiança).
+        """
+        try:
+            text, confidence, seconds = pending.future.result()
         except Exception as e:
-            logger.exception(f"OCR falhou para {pdf_path} page {page_number}: {e}")
-            return ""
+            logger.exception(f"OCR falhou na página {pending.page_num}: {e}")
+            if pending.previous is None:
+                # falha (ex: tesseract ausente) não vai para o cache de páginas
+                return []
+            text, confidence = pending.previous
+        else:
+            self._record_ocr(pending, text, confidence, seconds, stats)
+
+        if pending.previous is not None and pending.previous[1] > confidence:
+            text, confidence = pending.previous
+
+        if confidence < self.ocr_min_confidence and pending.dpi < self.ocr_max_dpi:
+            logger.info(
+                f"🔎 OCR da página {pending.page_num} com confiança {confidence:.0f} "
+                f"a {pending.dpi} dpi; repetindo a {self.ocr_max_dpi} dpi"
+            )
+            retry = self._submit_ocr(
+                doc[pending.page_num - 1], pending.page_num, self.ocr_max_dpi
+            )
+            retry.cache_key = pending.cache_key
+            retry.previous = (text, confidence)
+            return retry
+
+        entries = self._extract_from_plain_text(text, pending.page_num)
+        if pending.cache_key is not None:
+            self._cache_page(pending.cache_key, entries)
+        return entries
+
+    def _record_ocr(
+        self,
+        pending: _PendingOCR,
+        text: str,
+        confidence: float,
+        seconds: float,
+        stats: Optional[ExtractionStats],
+    ) -> None:
+        """Guarda um OCR novo no cache de OCR ou contabiliza o tempo poupado"""
+        if pending.ocr_saved is not None:
+            if stats is not None:
+                stats.ocr_cache += 1
+                stats.segundos_ocr_economizados += pending.ocr_saved
+            # total de todos os processos, exibido no /health
+            self.ocr_cache.increment("ms_economizados", round(pending.ocr_saved * 1000))
+            return
+
+        if pending.ocr_key is not None:
+            self.ocr_cache.set(
+                pending.ocr_key,
+                json.dumps(
+                    {"texto": text, "confianca": confidence, "segundos": seconds},
+                    ensure_ascii=False,
+                ).encode("utf-8"),
+            )
 
         # ---------------------------------------------------------
 
@@ -522,31 +1348,8 @@ class PDFReader:
 
         text_joined = " ".join(mapped.values()).lower()
 
-        # Palavras típicas de cabeçalho
-        header_keywords = [
-            "documento",
-            "doc",
-            "fornecedor",
-            "descrição",
-            "descricao",
-            "valor",
-            "contábil",
-            "contabil",
-            "nota",
-            "serie",
-            "série",
-            "código",
-            "codigo",
-            "data",
-            "entrada",
-            "cfop",
-            "controle",
-            "loja",
-            "cnpj",
-        ]
-
-        # Regra 1 — contém palavras de cabeçalho
-        if any(k in text_joined for k in header_keywords):
+        # Regra 1 — contém palavras de cabeçalho (HEADER_KEYWORDS)
+        if self.HEADER_KEYWORDS_REGEX.search(text_joined):
             return True
 
         # Regra 2 — não tem números relevantes
@@ -566,3 +1369,54 @@ class PDFReader:
 
         # Se passou em tudo → não é cabeçalho
         return False
+
+
+def _extract_shard(
+    source: PDFSource,
+    settings: Dict[str, Any],
+    first_page: int,
+    last_page: int,
+) -> Tuple[List[LedgerEntry], ExtractionStats]:
+    """Executado em processo separado: abre o PDF e extrai uma faixa de páginas"""
+    reader = PDFReader(**settings)
+    stats = ExtractionStats()
+    doc = open_pdf(source)
+    try:
+        entries = reader._extract_page_range(doc, first_page, last_page, stats=stats)
+        return entries, stats
+    finally:
+        doc.close()
+        reader.close()
+
+
+def _timed_ocr(image: "Image.Image", lang: str) -> Tuple[str, float, float]:
+    """_ocr_image + segundos gastos (guardados no cache de OCR)"""
+    start = time.perf_counter()
+    text, confidence = _ocr_image(image, lang)
+    return text, confidence, time.perf_counter() - start
+
+
+def _ocr_image(image: "Image.Image", lang: str) -> Tuple[str, float]:
+    """
+    Roda o tesseract (um subprocesso por chamada, por isso threads bastam
+    para paralelizar) e devolve o texto, linha a linha, e a confiança média
+    das palavras (0-100)
+    """
+    data = pytesseract.image_to_data(
+        image, lang=lang, output_type=pytesseract.Output.DICT
+    )
+
+    lines: Dict[Tuple[int, int, int], List[str]] = {}
+    confidences: List[float] = []
+    for text, conf, block, par, line in zip(
+        data["text"], data["conf"], data["block_num"], data["par_num"], data["line_num"]
+    ):
+        conf = float(conf)
+        if conf < 0 or not text.strip():
+            continue
+        confidences.append(conf)
+        lines.setdefault((block, par, line), []).append(text)
+
+    text = "\n".join(" ".join(words) for words in lines.values())
+    confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return text, confidence
@@ -0,0 +1,384 @@
+"""
+Resultados de análises guardados no servidor (SQLite), para a interface
+buscar duplicatas, possíveis duplicatas e notas únicas em páginas
+(filtradas e ordenadas) em vez de receber o resultado inteiro de uma vez.
+"""
+
+import base64
+import binascii
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from app.services.ledger import AnalysisResult, DuplicateGroup, LedgerEntry
+from app.utils.normalizer import normalize_text
+
+logger = logging.getLogger("result_store")
+logger.setLevel(logging.INFO)
+
+# listas do resultado guardadas, na ordem do AnalysisResult.to_dict
+LISTS = ("duplicatas", "possiveisDuplicatas", "notasUnicas")
+
+# campo de ordenação -> coluna (todas indexadas junto com analise/lista)
+SORT_COLUMNS = {
+    "posicao": "ordem",
+    "fornecedor": "fornecedor_norm",
+    "data": "data_ordinal",
+    "valor": "valor",
+}
+
+# contagem de cada lista no summary (total sem filtros sem COUNT)
+_SUMMARY_COUNTS = {
+    "duplicatas": "duplicatasExatas",
+    "possiveisDuplicatas": "possiveisDuplicatas",
+    "notasUnicas": "notasUnicas",
+}
+
+
+class ResultFilters:
+    """Filtros de uma página de resultados (None = sem filtro)"""
+
+    __slots__ = ("fornecedor", "codigo", "data_inicio", "data_fim", "valor_min", "valor_max")
+
+    def __init__(
+        self,
+        fornecedor: Optional[str] = None,
+        codigo: Optional[str] = None,
+        data_inicio: Optional[int] = None,
+        data_fim: Optional[int] = None,
+        valor_min: Optional[int] = None,
+        valor_max: Optional[int] = None,
+    ):
+        """
+        fornecedor: início do nome (sem acentos/maiúsculas)
+        codigo: código do fornecedor (exato)
+        data_inicio/data_fim: ordinais do dia, inclusive
+        valor_min/valor_max: valor contábil em centavos, inclusive
+        """
+        self.fornecedor = normalize_text(fornecedor) if fornecedor else None
+        self.codigo = codigo.strip() if codigo else None
+        self.data_inicio = data_inicio
+        self.data_fim = data_fim
+        self.valor_min = valor_min
+        self.valor_max = valor_max
+
+    def where(self) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if self.fornecedor:
+            # prefixo como faixa: usa o índice de fornecedor
+            clauses.append("fornecedor_norm >= ? AND fornecedor_norm < ?")
+            params += [self.fornecedor, self.fornecedor + "\U0010ffff"]
+        for clause, value in (
+            ("codigo = ?", self.codigo),
+            ("data_ordinal >= ?", self.data_inicio),
+            # 0 = entrada sem data (fica fora de qualquer faixa de datas)
+            ("data_ordinal BETWEEN 1 AND ?", self.data_fim),
+            ("valor >= ?", self.valor_min),
+            ("valor <= ?", self.valor_max),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, name) is not None for name in self.__slots__)
+
+
+class ResultStore:
+    """
+    - Uma linha por grupo/nota de cada lista do resultado, com o JSON do
+      item (mesmo formato do to_dict) e as colunas de filtro/ordenação
+      (fornecedor, data e valor do grupo = os da primeira entrada)
+    - Índices (analise, lista, coluna): a página é lida direto do índice,
+      sem carregar a análise inteira
+    - Análises expiram após ttl_seconds; as vencidas são apagadas ao gravar
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 6 * 3600, timeout: float = 10.0):
+        """
+        Args:
+            path: arquivo do banco (criado se não existir)
+            ttl_seconds: tempo de vida de cada análise guardada
+            timeout: espera (segundos) por um lock de outro processo
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+        if not self._ready:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analises ("
+                " id TEXT PRIMARY KEY, filename TEXT NOT NULL,"
+                " criado_em REAL NOT NULL, expira_em REAL NOT NULL,"
+                " resumo TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS analises_expira ON analises (expira_em)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS itens ("
+                " analise_id TEXT NOT NULL, lista INTEGER NOT NULL,"
+                " ordem INTEGER NOT NULL, codigo TEXT NOT NULL,"
+                " fornecedor_norm TEXT NOT NULL, data_ordinal INTEGER NOT NULL,"
+                " valor INTEGER NOT NULL, dados TEXT NOT NULL,"
+                " PRIMARY KEY (analise_id, lista, ordem)) WITHOUT ROWID"
+            )
+            for column in ("fornecedor_norm", "data_ordinal", "valor"):
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS itens_{column}"
+                    f" ON itens (analise_id, lista, {column})"
+                )
+            self._ready = True
+
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def save(
+        self,
+        result: AnalysisResult,
+        filename: str,
+        extracao: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Grava o resultado e apaga as análises vencidas
+
+        Returns:
+            {"analiseId", "expiraEm"}
+        """
+        analise_id = uuid.uuid4().hex
+        now = time.time()
+        expira_em = now + self.ttl_seconds
+        resumo = {"summary": result.summary(), "extracao": extracao}
+
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._purge(conn, now)
+                conn.execute(
+                    "INSERT INTO analises (id, filename, criado_em, expira_em, resumo)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (analise_id, filename, now, expira_em, orjson.dumps(resumo).decode()),
+                )
+                conn.executemany(
+                    "INSERT INTO itens (analise_id, lista, ordem, codigo,"
+                    " fornecedor_norm, data_ordinal, valor, dados)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._rows(analise_id, result),
+                )
+
+        logger.info(f"💾 Análise {analise_id} guardada ({filename})")
+        return {"analiseId": analise_id, "expiraEm": expira_em}
+
+    def _rows(self, analise_id: str, result: AnalysisResult) -> Iterable[Tuple[Any, ...]]:
+        groups: List[List[DuplicateGroup]] = [result.duplicatas, result.possiveis_duplicatas]
+        for lista, items in enumerate(groups):
+            for ordem, group in enumerate(items):
+                yield self._row(analise_id, lista, ordem, group.entries[0], group.to_dict())
+
+        lista = LISTS.index("notasUnicas")
+        for ordem, entry in enumerate(result.notas_unicas):
+            yield self._row(analise_id, lista, ordem, entry, entry.to_dict())
+
+    @staticmethod
+    def _row(
+        analise_id: str, lista: int, ordem: int, entry: LedgerEntry, dados: Dict[str, Any]
+    ) -> Tuple[Any, ...]:
+        return (
+            analise_id,
+            lista,
+            ordem,
+            entry.codigo_fornecedor.strip(),
+            normalize_text(entry.fornecedor),
+            # sem data = 0 (ordinais começam em 1): nenhuma coluna de ordenação
+            # tem NULL, então o cursor é sempre uma faixa simples do índice
+            entry.data_ordinal or 0,
+            entry.valor_contabil_centavos,
+            orjson.dumps(dados).decode(),
+        )
+
+    def _purge(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = [
+            row[0]
+            for row in conn.execute("SELECT id FROM analises WHERE expira_em < ?", (now,))
+        ]
+        for analise_id in expired:
+            self._delete(conn, analise_id)
+        if expired:
+            logger.info(f"🧹 {len(expired)} análises vencidas removidas")
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, analise_id: str) -> bool:
+        conn.execute("DELETE FROM itens WHERE analise_id = ?", (analise_id,))
+        return conn.execute("DELETE FROM analises WHERE id = ?", (analise_id,)).rowcount > 0
+
+    def get(self, analise_id: str) -> Optional[Dict[str, Any]]:
+        """Dados da análise (summary, extracao, validade) ou None se não existe/venceu"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT filename, criado_em, expira_em, resumo FROM analises"
+                " WHERE id = ? AND expira_em >= ?",
+                (analise_id, time.time()),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        filename, criado_em, expira_em, resumo = row
+        return {
+            "analiseId": analise_id,
+            "filename": filename,
+            "criadoEm": criado_em,
+            "expiraEm": expira_em,
+            **orjson.loads(resumo),
+        }
+
+    def page(
+        self,
+        analise_id: str,
+        lista: str,
+        por_pagina: int = 50,
+        ordenar_por: str = "posicao",
+        decrescente: bool = False,
+        filters: Optional[ResultFilters] = None,
+        apos: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Uma página de uma lista do resultado (itens no formato do to_dict),
+        a partir do cursor apos (o "proximo" da página anterior; None = início)
+
+        A página continua do último item da anterior pelo índice (analise,
+        lista, coluna, ordem): o custo não cresce com a profundidade, como
+        aconteceria com OFFSET
+
+        Returns:
+            {"itens", "total", "porPagina", "totalPaginas", "proximo"}, ou None
+            se a análise não existe/venceu
+
+        Raises:
+            ValueError: lista, ordenação ou cursor inválidos
+        """
+        if lista not in LISTS:
+            raise ValueError(f"Lista inválida: {lista}")
+        if ordenar_por not in SORT_COLUMNS:
+            raise ValueError(f"Ordenação inválida: {ordenar_por}")
+
+        column = SORT_COLUMNS[ordenar_por]
+        after, after_params = "", []
+        if apos:
+            value, ordem = self._decode_cursor(apos, ordenar_por, decrescente)
+            after, after_params = self._after(column, value, ordem, decrescente)
+
+        analysis = self.get(analise_id)
+        if analysis is None:
+            return None
+
+        filters = filters or ResultFilters()
+        where, params = filters.where()
+        params = [analise_id, LISTS.index(lista)] + params
+        direction = "DESC" if decrescente else "ASC"
+        order_by = f"ordem {direction}"
+        if column != "ordem":
+            # ordem desempata (mantém a ordem original entre iguais, como no índice)
+            order_by = f"{column} {direction}, {order_by}"
+
+        with closing(self._connect()) as conn:
+            if filters:
+                total = conn.execute(
+                    f"SELECT COUNT(*) FROM itens WHERE analise_id = ? AND lista = ?{where}",
+                    params,
+                ).fetchone()[0]
+            else:
+                total = analysis["summary"][_SUMMARY_COUNTS[lista]]
+
+            # só as chaves da página (+1 para saber se há próxima); depois o
+            # JSON só desses itens
+            keys = conn.execute(
+                f"SELECT ordem, {column} FROM itens WHERE analise_id = ? AND lista = ?"
+                f"{where}{after} ORDER BY {order_by} LIMIT ?",
+                params + after_params + [por_pagina + 1],
+            ).fetchall()
+            more, keys = len(keys) > por_pagina, keys[:por_pagina]
+            dados = dict(
+                conn.execute(
+                    "SELECT ordem, dados FROM itens WHERE analise_id = ? AND lista = ?"
+                    f" AND ordem IN ({', '.join('?' * len(keys))})",
+                    params[:2] + [ordem for ordem, _ in keys],
+                )
+            )
+
+        proximo = None
+        if more:
+            ordem, value = keys[-1]
+            proximo = self._encode_cursor(ordenar_por, decrescente, value, ordem)
+
+        return {
+            "itens": [orjson.loads(dados[ordem]) for ordem, _ in keys],
+            "total": total,
+            "porPagina": por_pagina,
+            "totalPaginas": -(-total // por_pagina),
+            "proximo": proximo,
+        }
+
+    @staticmethod
+    def _after(
+        column: str, value: Any, ordem: int, decrescente: bool
+    ) -> Tuple[str, List[Any]]:
+        """Condição dos itens depois de (value, ordem) na ordenação da página"""
+        op = "<" if decrescente else ">"
+        if column == "ordem":
+            return f" AND ordem {op} ?", [ordem]
+        # comparação de tupla: o SQLite usa como faixa do índice (coluna, ordem)
+        return f" AND ({column}, ordem) {op} (?, ?)", [value, ordem]
+
+    @staticmethod
+    def _encode_cursor(ordenar_por: str, decrescente: bool, value: Any, ordem: int) -> str:
+        token = orjson.dumps([ordenar_por, decrescente, value, ordem])
+        return base64.urlsafe_b64encode(token).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(apos: str, ordenar_por: str, decrescente: bool) -> Tuple[Any, int]:
+        """(valor da coluna, ordem) do cursor; precisa ser da mesma ordenação"""
+        try:
+            token = base64.urlsafe_b64decode(apos + "=" * (-len(apos) % 4))
+            cursor_sort, cursor_desc, value, ordem = orjson.loads(token)
+        except (binascii.Error, ValueError, TypeError):
+            raise ValueError("Cursor inválido")
+        if (cursor_sort, cursor_desc) != (ordenar_por, decrescente):
+            raise ValueError("Cursor de outra ordenação")
+        if not isinstance(ordem, int) or not isinstance(value, (int, str)):
+            raise ValueError("Cursor inválido")
+        return value, ordem
+
+    def delete(self, analise_id: str) -> bool:
+        with closing(self._connect()) as conn:
+            with conn:
+                # itens e análise somem juntos
+                conn.execute("BEGIN IMMEDIATE")
+                return self._delete(conn, analise_id)
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"analises": 0, "ttlSegundos": self.ttl_seconds}
+        try:
+            with closing(self._connect()) as conn:
+                stats["analises"] = conn.execute(
+                    "SELECT COUNT(*) FROM analises WHERE expira_em >= ?", (time.time(),)
+                ).fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Resultados {self.path} indisponível: {e}")
+        return stats
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger("worker_pool")
+logger.setLevel(logging.INFO)
+
+
+class PoolSaturatedError(Exception):
+    """Fila de admissão cheia — cliente deve tentar novamente (HTTP 429)"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Fila de análise cheia, tente novamente mais tarde")
+        self.retry_after = retry_after
+
+
+class PoolUnavailableError(Exception):
+    """Pool encerrado ou quebrado — serviço indisponível (HTTP 503)"""
+
+    def __init__(self, retry_after: int, message: str = "Pool de análise indisponível"):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AnalysisWorkerPool:
+    """
+    Pool de processos para o trabalho CPU-bound (extração do PDF e análise).
+    - O event loop só aguarda o resultado; /health continua respondendo
+    - Admissão limitada: max_workers executando + max_queue aguardando
+    - Acima disso a submissão é recusada com PoolSaturatedError
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, retry_after: int = 30):
+        """
+        Args:
+            max_workers: processos do pool
+            max_queue: tarefas que podem aguardar além das em execução
+            retry_after: segundos sugeridos ao cliente quando saturado
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager: Optional[Any] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._closed = False
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: não herda threads/estado do event loop do processo pai
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"⚙️ Pool de análise iniciado com {self.max_workers} processos")
+        return self._executor
+
+    def _release(self, _future: Any = None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        """
+        Admite fn(*args) no pool imediatamente (sem await) e devolve um
+        future do asyncio. A recusa acontece aqui, antes de qualquer trabalho.
+
+        Raises:
+            PoolSaturatedError: fila de admissão cheia
+            PoolUnavailableError: pool encerrado ou quebrado
+        """
+        with self._lock:
+            if self._closed:
+                raise PoolUnavailableError(self.retry_after)
+            if self._in_flight >= self.capacity:
+                raise PoolSaturatedError(self.retry_after)
+            self._in_flight += 1
+
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BrokenProcessPool:
+                self._in_flight -= 1
+                self._executor = None
+                raise PoolUnavailableError(self.retry_after)
+            except RuntimeError:
+                # executor já finalizado (shutdown em andamento)
+                self._in_flight -= 1
+                raise PoolUnavailableError(self.retry_after)
+
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Executa fn(*args) em um processo do pool e aguarda o resultado
+        sem bloquear o event loop.
+
+        Raises:
+            PoolSaturatedError: fila de admissão cheia
+            PoolUnavailableError: pool encerrado ou quebrado
+        """
+        return await self.wait(self.submit(fn, *args))
+
+    async def wait(self, future: "asyncio.Future[Any]") -> Any:
+        """Aguarda um future de submit(), tratando a quebra do pool"""
+        try:
+            return await future
+        except BrokenProcessPool:
+            # um processo morreu (OOM, segfault) — recria o pool na próxima
+            logger.error("❌ Pool de análise quebrado, será recriado")
+            with self._lock:
+                self._executor = None
+            raise PoolUnavailableError(
+                self.retry_after, "Processo de análise finalizado inesperadamente"
+            )
+
+    def create_channel(self) -> Any:
+        """
+        Fila compartilhada (via Manager) para os processos do pool enviarem
+        eventos de progresso/dados parciais ao processo do servidor.
+        """
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context("spawn").Manager()
+            return self._manager.Queue()
+
+    def close_channel(self, channel: Any) -> None:
+        """
+        Libera no Manager a fila de create_channel sem esperar o proxy ser
+        coletado (ex.: a tarefa que usaria a fila foi recusada no submit)
+        """
+        try:
+            channel._close()
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao liberar canal de eventos: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "emExecucaoOuFila": self._in_flight,
+            "capacidade": self.capacity,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if manager is not None:
+            manager.shutdown()
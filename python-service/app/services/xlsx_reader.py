@@ -0,0 +1,374 @@
+"""
+Leitura de planilhas exportadas pelo ERP (.xlsx, .xls, .csv) direto para
+LedgerEntry, sem passar pela análise de layout do PDFReader.
+
+As linhas são lidas em fluxo (openpyxl read-only, csv linha a linha) e só
+as entradas ficam em memória, então planilhas de centenas de milhares de
+linhas não são carregadas inteiras (nem em um DataFrame).
+"""
+
+import csv
+import io
+import logging
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.services.ledger import LedgerEntry
+from app.services.pdf_reader import ExtractionStats, PageCallback, PDFSource
+from app.utils.normalizer import (
+    clean_supplier_name,
+    normalize_text,
+    parse_date_ordinal,
+    parse_monetary_cents,
+)
+
+logger = logging.getLogger("xlsx_reader")
+logger.setLevel(logging.INFO)
+
+_PUNCTUATION_RE = re.compile(r"[^\w]+")
+
+# Nomes de coluna aceitos para cada campo (comparados sem acentos,
+# maiúsculas e pontuação). Sobrescritos por campo via SPREADSHEET_COLUMNS.
+DEFAULT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "codigo": (
+        "codigo",
+        "cod",
+        "codigo fornecedor",
+        "cod fornecedor",
+        "cod forn",
+    ),
+    "fornecedor": (
+        "fornecedor",
+        "nome fornecedor",
+        "razao social",
+        "nome",
+    ),
+    "data": (
+        "data",
+        "data entrada",
+        "dt entrada",
+        "data emissao",
+        "dt emissao",
+        "emissao",
+    ),
+    "nota": (
+        "nota",
+        "nf",
+        "nota fiscal",
+        "nota serie",
+        "numero nota",
+        "n nota",
+        "documento",
+    ),
+    "valor_contabil": (
+        "valor contabil",
+        "vl contabil",
+        "contabil",
+    ),
+    "valor": (
+        "valor",
+        "valor total",
+        "vl total",
+        "total",
+    ),
+}
+
+
+def parse_column_aliases(spec: str) -> Dict[str, Tuple[str, ...]]:
+    """
+    "fornecedor=razao social|fornec;valor=vl liquido" -> {campo: (nomes...)}
+    (formato da variável SPREADSHEET_COLUMNS)
+    """
+    columns: Dict[str, Tuple[str, ...]] = {}
+    for item in spec.split(";"):
+        field, _, names = item.partition("=")
+        field = field.strip()
+        if field and names.strip():
+            columns[field] = tuple(n.strip() for n in names.split("|") if n.strip())
+    return columns
+
+
+def _header_key(value: Any) -> str:
+    if value is None:
+        return ""
+    return normalize_text(_PUNCTUATION_RE.sub(" ", str(value)))
+
+
+class ExcelReader:
+    """
+    - Cabeçalho: primeira linha (entre as HEADER_SCAN_ROWS iniciais) em que
+      ao menos HEADER_MIN_FIELDS colunas batem com os nomes configurados
+    - Células numéricas e de data são convertidas direto (sem passar por
+      texto); textos usam os mesmos parsers do PDFReader
+    - Linhas sem fornecedor, data ou valor são descartadas (como no PDF)
+    Saída: lista de LedgerEntry com posicao "Linha N" (linha da planilha)
+    """
+
+    EXTENSIONS = (".xlsx", ".xls", ".csv")
+    FIELDS = tuple(DEFAULT_COLUMNS)
+
+    HEADER_SCAN_ROWS = 20
+    HEADER_MIN_FIELDS = 3
+
+    def __init__(
+        self,
+        columns: Optional[Dict[str, Sequence[str]]] = None,
+        chunk_rows: int = 5000,
+    ):
+        """
+        columns: nomes de coluna por campo (codigo, fornecedor, data, nota,
+            valor_contabil, valor); substituem os padrões só dos campos informados
+        chunk_rows: linhas por bloco entregue ao on_page (progresso)
+        """
+        invalid = [field for field in (columns or {}) if field not in self.FIELDS]
+        if invalid:
+            raise ValueError(f"Campos de planilha inválidos: {invalid}")
+
+        merged = dict(DEFAULT_COLUMNS)
+        merged.update({field: tuple(names) for field, names in (columns or {}).items()})
+        self.columns = merged
+        self.chunk_rows = max(1, chunk_rows)
+        self._aliases = {
+            _header_key(name): field
+            for field, names in self.columns.items()
+            for name in names
+        }
+
+    def extract(
+        self,
+        source: PDFSource,
+        extension: str,
+        on_page: Optional[PageCallback] = None,
+        stats: Optional[ExtractionStats] = None,
+    ) -> List[LedgerEntry]:
+        """
+        source: caminho ou conteúdo da planilha
+        extension: .xlsx, .xls ou .csv (formato do conteúdo)
+        on_page: chamado a cada chunk_rows linhas, com (bloco, total de
+            blocos ou 0 se desconhecido, entradas novas)
+        """
+        if stats is None:
+            stats = ExtractionStats()
+
+        readers = {
+            ".xlsx": self._xlsx_rows,
+            ".xls": self._xls_rows,
+            ".csv": self._csv_rows,
+        }
+        if extension not in readers:
+            raise ValueError(f"Formato de planilha não suportado: {extension}")
+
+        logger.info(f"📗 Lendo planilha {extension}")
+        rows, total_rows = readers[extension](source)
+        try:
+            return self._extract_rows(rows, total_rows, on_page, stats)
+        finally:
+            close = getattr(rows, "close", None)
+            if close is not None:
+                close()
+
+    def _extract_rows(
+        self,
+        rows: Iterator[Sequence[Any]],
+        total_rows: int,
+        on_page: Optional[PageCallback],
+        stats: ExtractionStats,
+    ) -> List[LedgerEntry]:
+        header: Optional[Dict[str, int]] = None
+        row_num = 0
+        for row_num, row in enumerate(rows, start=1):
+            header = self._match_header(row)
+            if header is not None or row_num >= self.HEADER_SCAN_ROWS:
+                break
+
+        if header is None:
+            logger.warning("Cabeçalho da planilha não encontrado")
+            return []
+        logger.info(f"📋 Cabeçalho na linha {row_num}: {header}")
+
+        total_chunks = -(-total_rows // self.chunk_rows) if total_rows else 0
+        entries: List[LedgerEntry] = []
+        read = 0
+        chunk_start = 0
+        chunk_num = 0
+
+        for row_num, row in enumerate(rows, start=row_num + 1):
+            if all(value is None or value == "" for value in row):
+                # linhas em branco (comuns no fim de abas exportadas)
+                continue
+
+            read += 1
+            entry = self._build_entry(row, header, row_num)
+            if entry is None:
+                stats.linhas_descartadas += 1
+            else:
+                entries.append(entry)
+
+            if read % self.chunk_rows == 0:
+                chunk_num += 1
+                if on_page:
+                    on_page(chunk_num, total_chunks, entries[chunk_start:])
+                chunk_start = len(entries)
+
+        if on_page and (chunk_start < len(entries) or not chunk_num):
+            on_page(chunk_num + 1, max(total_chunks, chunk_num + 1), entries[chunk_start:])
+
+        stats.linhas_planilha += read
+        return entries
+
+    def _match_header(self, row: Sequence[Any]) -> Optional[Dict[str, int]]:
+        """{campo: índice da coluna} se a linha for o cabeçalho"""
+        header: Dict[str, int] = {}
+        for idx, value in enumerate(row):
+            field = self._aliases.get(_header_key(value))
+            if field is not None and field not in header:
+                header[field] = idx
+
+        if len(header) < self.HEADER_MIN_FIELDS or "fornecedor" not in header:
+            return None
+        if "valor" not in header and "valor_contabil" not in header:
+            return None
+        return header
+
+    def _build_entry(
+        self, row: Sequence[Any], header: Dict[str, int], row_num: int
+    ) -> Optional[LedgerEntry]:
+        def cell(field: str) -> Any:
+            idx = header.get(field)
+            return row[idx] if idx is not None and idx < len(row) else None
+
+        fornecedor = _cell_text(cell("fornecedor"))
+        data_ordinal = _cell_date(cell("data"))
+
+        valor_contabil = _cell_cents(cell("valor_contabil"))
+        valor = _cell_cents(cell("valor")) if "valor" in header else None
+        if "valor_contabil" not in header:
+            valor_contabil, valor = valor or 0, None
+
+        if not fornecedor or data_ordinal is None or valor_contabil == 0:
+            return None
+
+        return LedgerEntry(
+            codigo_fornecedor=_cell_text(cell("codigo")) or "N/A",
+            fornecedor=clean_supplier_name(fornecedor),
+            data_ordinal=data_ordinal,
+            nota_serie=_cell_text(cell("nota")) or "N/A",
+            valor_contabil_centavos=valor_contabil,
+            valor_centavos=valor,
+            linha=row_num,
+        )
+
+    # -------------------------
+    # Leitores por formato: (iterador de linhas, total de linhas ou 0)
+    # -------------------------
+    def _xlsx_rows(self, source: PDFSource) -> Tuple[Iterator[Sequence[Any]], int]:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(
+            source if isinstance(source, str) else io.BytesIO(source),
+            read_only=True,
+            data_only=True,
+        )
+        sheet = workbook.active
+
+        def rows() -> Iterator[Sequence[Any]]:
+            try:
+                yield from sheet.iter_rows(values_only=True)
+            finally:
+                workbook.close()
+
+        return rows(), sheet.max_row or 0
+
+    def _xls_rows(self, source: PDFSource) -> Tuple[Iterator[Sequence[Any]], int]:
+        # formato binário antigo: o xlrd carrega a aba, mas as linhas viram
+        # valores Python uma a uma
+        import xlrd
+
+        if isinstance(source, str):
+            book = xlrd.open_workbook(source, on_demand=True)
+        else:
+            book = xlrd.open_workbook(file_contents=bytes(source), on_demand=True)
+        sheet = book.sheet_by_index(0)
+
+        def rows() -> Iterator[Sequence[Any]]:
+            try:
+                for idx in range(sheet.nrows):
+                    yield [
+                        xlrd.xldate_as_datetime(c.value, book.datemode)
+                        if c.ctype == xlrd.XL_CELL_DATE
+                        else c.value
+                        for c in sheet.row(idx)
+                    ]
+            finally:
+                book.release_resources()
+
+        return rows(), sheet.nrows
+
+    def _csv_rows(self, source: PDFSource) -> Tuple[Iterator[Sequence[Any]], int]:
+        if isinstance(source, str):
+            with open(source, "rb") as fh:
+                sample = fh.read(64 * 1024)
+        else:
+            sample = bytes(source[: 64 * 1024])
+
+        # exportações do ERP: UTF-8 (com ou sem BOM) ou Windows-1252
+        encoding = "utf-8-sig"
+        try:
+            sample.decode(encoding)
+        except UnicodeDecodeError as e:
+            if e.start < len(sample) - 3:
+                encoding = "cp1252"
+        text_sample = sample.decode(encoding, errors="ignore")
+        try:
+            delimiter = csv.Sniffer().sniff(text_sample, delimiters=";,\t|").delimiter
+        except csv.Error:
+            delimiter = ";"
+
+        if isinstance(source, str):
+            stream = open(source, encoding=encoding, errors="replace", newline="")
+        else:
+            stream = io.TextIOWrapper(
+                io.BytesIO(source), encoding=encoding, errors="replace", newline=""
+            )
+
+        def rows() -> Iterator[Sequence[Any]]:
+            with stream:
+                yield from csv.reader(stream, delimiter=delimiter)
+
+        return rows(), 0
+
+
+# -------------------------
+# Conversão de células
+# -------------------------
+def _cell_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # códigos e notas numéricos chegam como 123.0
+        return str(int(value))
+    return str(value).strip()
+
+
+def _cell_date(value: Any) -> Optional[int]:
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if value is None:
+        return None
+    return parse_date_ordinal(str(value))
+
+
+def _cell_cents(value: Any) -> int:
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float, Decimal)):
+        try:
+            number = Decimal(str(value))
+            return int(number.scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+        except (InvalidOperation, ValueError, OverflowError):
+            return 0
+    return parse_monetary_cents(str(value))
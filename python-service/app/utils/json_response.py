@@ -0,0 +1,21 @@
+"""
+Serialização JSON das respostas com orjson (bytes UTF-8 direto, sem o
+json.dumps da stdlib), usada nas respostas grandes da análise.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def dumps(content: Any) -> bytes:
+    """JSON em bytes UTF-8 (acentos sem escape, como ensure_ascii=False)"""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse serializado pelo orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,7 +1,43 @@
 import re
 import unicodedata
+from datetime import date as _date
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from functools import lru_cache
 from typing import Optional
 
+from app import config
+
+# Padrões pré-compilados (estas funções rodam uma ou mais vezes por linha extraída)
+_WHITESPACE_RE = re.compile(r"\s+")
+_NON_ALNUM_SPACE_RE = re.compile(r"[^a-z0-9]\s")
+_NON_MONETARY_RE = re.compile(r"[^\d,.]")
+_DATE_RE = re.compile(r"(\d{1,2})[\/-](\d{1,2})[\/-](\d{2,4})")
+_NON_DIGIT_RE = re.compile(r"\D")
+_DOCUMENT_NUMBER_RES = [
+    re.compile(r"NF[\.\-\s]*(\d+)", re.IGNORECASE),
+    re.compile(r"NOTA[\.\-\s]*FISCAL[\.\-\s]*(\d+)", re.IGNORECASE),
+    re.compile(r"DOCUMENTO[\.\-\s]*(\d+)", re.IGNORECASE),
+    re.compile(r"(\d{6,})", re.IGNORECASE),  # Qualquer sequência de 6+ dígitos
+]
+
+
+class _AccentTable(dict):
+    """
+    Tabela para str.translate que remove acentos caractere a caractere.
+    Cada caractere é decomposto (NFD) uma única vez e o resultado fica em cache.
+    """
+
+    def __missing__(self, codepoint: int) -> str:
+        decomposed = unicodedata.normalize("NFD", chr(codepoint))
+        stripped = "".join(
+            char for char in decomposed if unicodedata.category(char) != "Mn"
+        )
+        self[codepoint] = stripped
+        return stripped
+
+
+_ACCENT_TABLE = _AccentTable()
+
 
 #  normaliza texto
 def normalize_text(text: str) -> str:
@@ -18,40 +54,38 @@ def normalize_text(text: str) -> str:
     if not text:
         return ""
 
-    # remove acentos
-    text = unicodedata.normalize("NFD", text)
-    text = "".join(char for char in text if unicodedata.category(char) != "Mn")
+    # remove acentos (ASCII não tem o que remover)
+    if not text.isascii():
+        text = text.translate(_ACCENT_TABLE)
 
     # lowercase
     text = text.lower()
 
     # Normaliza espaços
-    text = re.sub(r"\s+", " ", text)
+    text = _WHITESPACE_RE.sub(" ", text)
 
     # normaliza espaços
-    text = re.sub(r"[^a-z0-9]\s", "", text)
+    text = _NON_ALNUM_SPACE_RE.sub("", text)
 
     return text.strip()
 
 
-def clean_monetary_value(value: str) -> str:
-    """
-    limpa  e formata o valor monetario para o padrão brasielito
-
-    Atgs:
-      value: valor a ser limpo
-    Returns:
-      valor formatado (Ex 1.500)
-    """
+if config.NORMALIZER_CACHE_SIZE > 0:
+    # nomes de fornecedor se repetem muito em um mesmo ledger
+    normalize_supplier = lru_cache(maxsize=config.NORMALIZER_CACHE_SIZE)(normalize_text)
+else:
+    normalize_supplier = normalize_text
 
-    if not value:
-        return "Não é um valor: 0,00"
 
-    # Remove tudo exceto dígitos, vírgula e ponto
-    clean_value = re.sub(r"[^\d,.]", "", str(value))
+def _to_decimal_string(value: str) -> str:
+    """
+    Remove tudo exceto dígitos, vírgula e ponto e converte para o formato
+    aceito por float() ("1500.00")
+    """
+    clean_value = _NON_MONETARY_RE.sub("", str(value))
 
     if not clean_value:
-        return "0,00"
+        return ""
 
     # detecta o formato
     # se tem ponto e virgula : 1500,00 (br) ou 1,500.00(us)
@@ -69,6 +103,27 @@ def clean_monetary_value(value: str) -> str:
     elif "," in clean_value:
         clean_value = clean_value.replace(",", ".")
 
+    return clean_value
+
+
+def clean_monetary_value(value: str) -> str:
+    """
+    limpa  e formata o valor monetario para o padrão brasielito
+
+    Atgs:
+      value: valor a ser limpo
+    Returns:
+      valor formatado (Ex 1.500)
+    """
+
+    if not value:
+        return "Não é um valor: 0,00"
+
+    clean_value = _to_decimal_string(value)
+
+    if not clean_value:
+        return "0,00"
+
     # Converte para float e formata
     try:
         number = float(clean_value)
@@ -81,6 +136,75 @@ def clean_monetary_value(value: str) -> str:
         return "0,00"
 
 
+def parse_monetary_cents(value: str) -> int:
+    """
+    Converte um valor monetário (BR "1.234,56" ou US "1,234.56") para centavos
+
+    Args:
+      value: valor a ser convertido
+    Returns:
+      valor em centavos (0 se inválido)
+    """
+    if not value:
+        return 0
+
+    clean_value = _to_decimal_string(value)
+
+    if not clean_value:
+        return 0
+
+    try:
+        # Decimal(float) arredonda igual ao f"{number:,.2f}" do clean_monetary_value
+        number = Decimal(float(clean_value))
+        return int(number.scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+    except (InvalidOperation, ValueError, OverflowError):
+        return 0
+
+
+def parse_date_ordinal(date: str) -> Optional[int]:
+    """
+    Converte uma data (DD/MM/YYYY ou variações aceitas pelo clean_date)
+    para o número ordinal do dia (date.toordinal)
+
+    Returns:
+        Ordinal do dia ou None se inválida
+    """
+    cleaned = clean_date(date)
+    if not cleaned:
+        return None
+
+    day, month, year = cleaned.split("/")
+    try:
+        return _date(int(year), int(month), int(day)).toordinal()
+    except ValueError:
+        # ex: 31/02 passa na validação básica do clean_date
+        return None
+
+
+def format_cents(cents: int) -> str:
+    """
+    Formata centavos no padrão brasileiro (mesmo formato do clean_monetary_value)
+
+    Ex: 123456 -> "1.234,56"
+    """
+    sign = "-" if cents < 0 else ""
+    reais, centavos = divmod(abs(cents), 100)
+    return f"{sign}{reais:,}".replace(",", ".") + f",{centavos:02d}"
+
+
+@lru_cache(maxsize=4096)
+def format_date_ordinal(ordinal: Optional[int]) -> str:
+    """
+    Formata o ordinal do dia (date.toordinal) como DD/MM/YYYY
+
+    Returns:
+        Data formatada ou string vazia se ordinal for None
+    """
+    if ordinal is None:
+        return ""
+    return _date.fromordinal(ordinal).strftime("%d/%m/%Y")
+
+
 def clean_date(date: str) -> str:
     """
     Limpa e formata data para padrão brasileiro DD/MM/YYYY
@@ -95,7 +219,7 @@ def clean_date(date: str) -> str:
         return ""
 
     # Extrai números da data
-    date_match = re.search(r"(\d{1,2})[\/-](\d{1,2})[\/-](\d{2,4})", str(date))
+    date_match = _DATE_RE.search(str(date))
 
     if not date_match:
         return ""
@@ -147,7 +271,7 @@ def clean_supplier_name(name: str) -> str:
     # name = re.sub(legal_terms, '', name, flags=re.IGNORECASE)
 
     # Normaliza espaços
-    name = re.sub(r"\s+", " ", name)
+    name = _WHITESPACE_RE.sub(" ", name)
 
     return name.strip()[:100]  # Limita a 100 caracteres
 
@@ -162,15 +286,8 @@ def extract_document_number(text: str) -> Optional[str]:
     Returns:
         Número do documento ou None
     """
-    patterns = [
-        r"NF[\.\-\s]*(\d+)",
-        r"NOTA[\.\-\s]*FISCAL[\.\-\s]*(\d+)",
-        r"DOCUMENTO[\.\-\s]*(\d+)",
-        r"(\d{6,})",  # Qualquer sequência de 6+ dígitos
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _DOCUMENT_NUMBER_RES:
+        match = pattern.search(text)
         if match:
             return match.group(1)
 
@@ -191,7 +308,7 @@ def is_valid_cpf_cnpj(doc: str) -> bool:
         return False
 
     # Remove caracteres não numéricos
-    numbers = re.sub(r"\D", "", doc)
+    numbers = _NON_DIGIT_RE.sub("", doc)
 
     # CPF: 11 dígitos
     # CNPJ: 14 dígitos
@@ -0,0 +1,183 @@
+"""
+Cache chave -> bytes em um arquivo SQLite local, compartilhado entre os
+workers do gunicorn e os processos do pool de análise.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("sqlite_cache")
+logger.setLevel(logging.INFO)
+
+
+class SQLiteCache:
+    """
+    - Remoção LRU por tamanho: ao passar de max_bytes, as entradas acessadas
+      há mais tempo são apagadas
+    - Contadores de acertos/faltas ficam no próprio arquivo (somam todos os
+      processos)
+    - Falhas do SQLite nunca interrompem a análise: o cache só é ignorado
+    """
+
+    def __init__(self, path: str, max_bytes: int, timeout: float = 10.0):
+        """
+        Args:
+            path: arquivo do banco (criado se não existir)
+            max_bytes: soma máxima do tamanho dos valores; 0 desliga o cache
+            timeout: espera (segundos) por um lock de outro processo
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._ready = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # uma conexão por operação: seguro entre threads e processos
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+        if not self._ready:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                " name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._ready = True
+
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT value FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+
+                with conn:
+                    if row is not None:
+                        conn.execute(
+                            "UPDATE entries SET accessed = ? WHERE key = ?",
+                            (time.time(), key),
+                        )
+                    self._count(conn, "hits" if row is not None else "misses")
+
+                return row[0] if row is not None else None
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache {self.path} indisponível: {e}")
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+
+        try:
+            with closing(self._connect()) as conn:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO entries (key, value, size, accessed)"
+                        " VALUES (?, ?, ?, ?)",
+                        (key, value, len(value), time.time()),
+                    )
+                    self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache {self.path} indisponível: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        removed = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+
+        self._count(conn, "evictions", removed)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Soma amount a um contador próprio de quem usa o cache"""
+        if not self.enabled or not amount:
+            return
+
+        try:
+            with closing(self._connect()) as conn:
+                with conn:
+                    self._count(conn, name, amount)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache {self.path} indisponível: {e}")
+
+    def counter(self, name: str) -> int:
+        if not self.enabled:
+            return 0
+
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT value FROM counters WHERE name = ?", (name,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache {self.path} indisponível: {e}")
+            return 0
+        return row[0] if row is not None else 0
+
+    def _count(self, conn: sqlite3.Connection, name: str, amount: int = 1) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?)"
+            " ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "habilitado": self.enabled,
+            "entradas": 0,
+            "bytes": 0,
+            "maxBytes": self.max_bytes,
+            "acertos": 0,
+            "faltas": 0,
+            "remocoes": 0,
+        }
+        if not self.enabled:
+            return stats
+
+        try:
+            with closing(self._connect()) as conn:
+                stats["entradas"], stats["bytes"] = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()
+                counters = dict(conn.execute("SELECT name, value FROM counters"))
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache {self.path} indisponível: {e}")
+            return stats
+
+        stats["acertos"] = counters.get("hits", 0)
+        stats["faltas"] = counters.get("misses", 0)
+        stats["remocoes"] = counters.get("evictions", 0)
+        return stats
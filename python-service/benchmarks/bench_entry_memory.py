@@ -0,0 +1,112 @@
+"""
+Memória (RSS de pico) de um ledger sintético grande representado como
+dicts no formato FinancialEntry vs LedgerEntry (slots + textos internados),
+incluindo a análise de duplicatas.
+
+Cada modo roda em um subprocesso separado para medir o RSS isoladamente.
+
+Uso (a partir de python-service/):
+    python -m benchmarks.bench_entry_memory [entradas]
+"""
+
+import contextlib
+import io
+import random
+import resource
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from app.services.analyzer import DuplicateAnalyzer
+from app.services.ledger import LedgerEntry
+from app.utils.normalizer import parse_date_ordinal, parse_monetary_cents
+
+
+def _fresh(text: str) -> str:
+    # simula textos recém-extraídos (objetos distintos, como sairiam do regex)
+    return "".join(list(text))
+
+
+def make_rows(n: int, seed: int = 11):
+    rnd = random.Random(seed)
+    suppliers = [f"FORNECEDOR {i:04d} COMERCIO LTDA" for i in range(2_000)]
+    for i in range(n):
+        cents = rnd.randrange(1_000, 5_000_000)
+        yield (
+            str(rnd.randrange(1, 2_000)),
+            rnd.choice(suppliers),
+            f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/2026",
+            str(100_000 + i),
+            f"{cents // 100},{cents % 100:02d}",
+            i // 45 + 1,
+            i % 45,
+        )
+
+
+def build_dicts(n: int) -> List[Dict[str, Any]]:
+    entries = []
+    for codigo, fornecedor, data, nota, valor, pagina, linha in make_rows(n):
+        valor = _fresh(valor)
+        entries.append(
+            {
+                "codigoFornecedor": _fresh(codigo),
+                "fornecedor": _fresh(fornecedor),
+                "data": _fresh(data),
+                "notaSerie": nota,
+                "valorContabil": valor,
+                "valor": valor,
+                "posicao": f"Pág {pagina}, Linha {linha}",
+            }
+        )
+    return entries
+
+
+def build_ledger(n: int) -> List[LedgerEntry]:
+    return [
+        LedgerEntry(
+            _fresh(codigo), _fresh(fornecedor), parse_date_ordinal(data), nota,
+            parse_monetary_cents(valor), pagina=pagina, linha=linha,
+        )
+        for codigo, fornecedor, data, nota, valor, pagina, linha in make_rows(n)
+    ]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024)
+
+
+def run_mode(mode: str, n: int) -> None:
+    baseline = peak_rss_mb()
+    entries = build_dicts(n) if mode == "dict" else build_ledger(n)
+    built = peak_rss_mb()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        DuplicateAnalyzer().analyze(entries)
+    analyzed = peak_rss_mb()
+
+    print(f"{mode} {built - baseline:.1f} {analyzed - baseline:.1f}")
+
+
+def main(n: int) -> None:
+    print(f"{n} entradas — RSS de pico acima do processo vazio (MB)")
+    print(f"{'representação':<14} {'entradas':>10} {'com análise':>12}")
+    results = {}
+    for mode in ("dict", "ledger"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_entry_memory", "--mode", mode, str(n)],
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        results[mode] = (float(out[1]), float(out[2]))
+        print(f"{mode:<14} {results[mode][0]:>10.1f} {results[mode][1]:>12.1f}")
+
+    saved = 1 - results["ledger"][1] / results["dict"][1]
+    print(f"redução com análise: {saved:.0%}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--mode":
+        run_mode(sys.argv[2], int(sys.argv[3]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000)
@@ -0,0 +1,152 @@
+"""
+Micro-benchmark do app.utils.normalizer contra a implementação anterior
+(re.sub sem compilar + NFD caractere a caractere), reproduzida abaixo como
+referência. A equivalência das saídas é verificada em tests/test_normalizer.py.
+
+Uso (a partir de python-service/):
+    python -m benchmarks.bench_normalizer [repeticoes]
+"""
+
+import random
+import re
+import sys
+import time
+import unicodedata
+from typing import Callable, List, Optional
+
+from app.utils import normalizer
+
+# -------------------------
+# Implementação de referência (versão anterior)
+# -------------------------
+
+
+def ref_normalize_text(text: str) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(char for char in text if unicodedata.category(char) != "Mn")
+    text = text.lower()
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"[^a-z0-9]\s", "", text)
+    return text.strip()
+
+
+def ref_clean_monetary_value(value: str) -> str:
+    if not value:
+        return "Não é um valor: 0,00"
+    clean_value = re.sub(r"[^\d,.]", "", str(value))
+    if not clean_value:
+        return "0,00"
+    if "." in clean_value and "," in clean_value:
+        dot_pos = clean_value.index(".")
+        comma_pos = clean_value.index(",")
+        if dot_pos < comma_pos:
+            clean_value = clean_value.replace(".", "").replace(",", ".")
+        else:
+            clean_value = clean_value.replace(".", "")
+    elif "," in clean_value:
+        clean_value = clean_value.replace(",", ".")
+    try:
+        number = float(clean_value)
+        return f"{number:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    except ValueError:
+        return "0,00"
+
+
+def ref_clean_date(date: str) -> str:
+    if not date:
+        return ""
+    date_match = re.search(r"(\d{1,2})[\/-](\d{1,2})[\/-](\d{2,4})", str(date))
+    if not date_match:
+        return ""
+    day, month, year = date_match.groups()
+    day = day.zfill(2)
+    month = month.zfill(2)
+    if len(year) == 2:
+        year = "20" + year
+    try:
+        if not (1 <= int(day) <= 31):
+            return ""
+        if not (1 <= int(month) <= 12):
+            return ""
+        if not (1900 <= int(year) <= 2100):
+            return ""
+        return f"{day}/{month}/{year}"
+    except ValueError:
+        return ""
+
+
+def ref_clean_supplier_name(name: str) -> str:
+    if not name:
+        return "Desconhecido"
+    name = re.sub(r"\s+", " ", name)
+    return name.strip()[:100]
+
+
+def ref_extract_document_number(text: str) -> Optional[str]:
+    patterns = [
+        r"NF[\.\-\s]*(\d+)",
+        r"NOTA[\.\-\s]*FISCAL[\.\-\s]*(\d+)",
+        r"DOCUMENTO[\.\-\s]*(\d+)",
+        r"(\d{6,})",
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            return match.group(1)
+    return None
+
+
+# -------------------------
+# Corpus sintético
+# -------------------------
+
+NAMES = [
+    "Padaria São João ME", "DISTRIBUIDORA AÇÃO S.A.", "Comércio  de Peças\tLtda",
+    "Transportes Rápido - EIRELI", "Café & Cia.  ", " Ótica Visão", "Ñandú Importação",
+    "PAPELARIA CENTRAL", "Construtora Irmãos Araújo", "Farmácia Popular nº 3",
+]
+VALUES = ["1.234,56", "R$ 99,90", "1,234.56", "45000", "12,345", "abc", "0,00", " 7.500,00 "]
+DATES = ["01/02/2026", "1/2/26", "31-12-2025", "32/01/2026", "data: 15/07/2024", "xx"]
+
+
+def make_corpus(n: int, seed: int = 7) -> List[str]:
+    rnd = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        base = rnd.choice(NAMES)
+        if rnd.random() < 0.3:
+            base += " " + rnd.choice(VALUES) + " " + rnd.choice(DATES)
+        corpus.append(base)
+    return corpus
+
+
+def timeit(fn: Callable[[str], object], corpus: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for value in corpus:
+            fn(value)
+    return time.perf_counter() - start
+
+
+def main(repeat: int) -> None:
+    corpus = make_corpus(20_000)
+
+    print(f"{'função':<26} {'anterior (s)':>13} {'atual (s)':>10} {'ganho':>7}")
+    rows = [
+        ("normalize_text", ref_normalize_text, normalizer.normalize_text),
+        ("normalize_supplier (LRU)", ref_normalize_text, normalizer.normalize_supplier),
+        ("clean_supplier_name", ref_clean_supplier_name, normalizer.clean_supplier_name),
+        ("clean_monetary_value", ref_clean_monetary_value, normalizer.clean_monetary_value),
+        ("clean_date", ref_clean_date, normalizer.clean_date),
+        ("extract_document_number", ref_extract_document_number, normalizer.extract_document_number),
+    ]
+    for name, ref, new in rows:
+        t_ref = timeit(ref, corpus, repeat)
+        t_new = timeit(new, corpus, repeat)
+        print(f"{name:<26} {t_ref:>13.3f} {t_new:>10.3f} {t_ref / t_new:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
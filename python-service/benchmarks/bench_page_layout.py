@@ -0,0 +1,73 @@
+"""
+Benchmark e teste de equivalência dos motores de layout do PDFReader
+(python x numpy): agrupamento em linhas, detecção de colunas e cols_text
+de cada linha, em páginas sintéticas com cada vez mais colunas.
+
+Uso (a partir de python-service/):
+    python -m benchmarks.bench_page_layout [repeticoes]
+"""
+
+import random
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from app.services.page_layout import NumpyPageLayout
+from app.services.pdf_reader import PDFReader
+
+
+def make_words(n_lines: int, n_columns: int, seed: int = 42) -> List[Any]:
+    """Palavras no formato de page.get_text("words"), fora de ordem"""
+    rnd = random.Random(seed)
+    width = 800 / n_columns
+    words = []
+    for line in range(n_lines):
+        y = 20 + line * 7.1
+        for column in range(n_columns):
+            for k in range(2):
+                x = 10 + column * width + k * 8 + rnd.random()
+                words.append([x, y, x + 5, y + 6, f"w{rnd.randrange(99)}", 0, 0, 0])
+    rnd.shuffle(words)
+    return words
+
+
+def run_python(
+    reader: PDFReader, words: List[Any]
+) -> Tuple[List[Any], List[Dict[int, str]]]:
+    lines = reader._group_words_by_line(words)
+    columns = reader._detect_columns(lines)
+    return lines, [reader._split_columns(line, columns) for line in lines]
+
+
+def run_numpy(
+    reader: PDFReader, words: List[Any]
+) -> Tuple[List[Any], List[Dict[int, str]]]:
+    layout = NumpyPageLayout(words)
+    return layout.lines, layout.split_columns(layout.detect_columns(reader.tolerance))
+
+
+def main(repeat: int) -> None:
+    reader = PDFReader()
+
+    print(f"{'colunas':>7} {'palavras':>9} {'python (ms)':>12} {'numpy (ms)':>11} {'ganho':>7}")
+    for n_columns in (6, 12, 18):
+        words = make_words(110, n_columns)
+        if run_python(reader, words) != run_numpy(reader, words):
+            raise SystemExit(f"❌ Resultados diferentes com {n_columns} colunas")
+
+        timings = []
+        for run in (run_python, run_numpy):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                run(reader, words)
+            timings.append((time.perf_counter() - start) / repeat * 1000)
+
+        t_python, t_numpy = timings
+        print(
+            f"{n_columns:>7} {len(words):>9} {t_python:>12.2f} {t_numpy:>11.2f}"
+            f" {t_python / t_numpy:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
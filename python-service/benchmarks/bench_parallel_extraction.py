@@ -0,0 +1,79 @@
+"""
+Ponto de equilíbrio da extração paralela (PDF_PARALLEL_MIN_PAGES): mede
+no PDF informado o custo por página do modo sequencial, o custo extra do
+modo paralelo com o pool já aquecido (fixo + por página) e o custo de
+subir o pool (spawn), e estima a partir de quantas páginas o paralelo
+compensa com N processos em núcleos livres.
+
+Uso (a partir de python-service/):
+    python -m benchmarks.bench_parallel_extraction arquivo.pdf [processos]
+"""
+
+import logging
+import sys
+import time
+from typing import Tuple
+
+import fitz
+
+from app.services.pdf_reader import PDFReader
+
+
+def first_pages(data: bytes, n: int) -> bytes:
+    doc = fitz.open(stream=data)
+    doc.select(list(range(min(n, len(doc)))))
+    try:
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def timed(reader: PDFReader, data: bytes, parallel: bool) -> float:
+    start = time.perf_counter()
+    reader.extract_from_pdf(data, parallel=parallel)
+    return time.perf_counter() - start
+
+
+def overhead(reader: PDFReader, data: bytes) -> Tuple[float, float]:
+    """(segundos sequencial, segundos a mais no paralelo) com o pool aquecido"""
+    serial = min(timed(reader, data, False) for _ in range(3))
+    parallel = min(timed(reader, data, True) for _ in range(3))
+    return serial, parallel - serial
+
+
+def main(path: str, workers: int) -> None:
+    logging.disable(logging.INFO)
+    with open(path, "rb") as fh:
+        data = fh.read()
+
+    total = len(fitz.open(stream=data))
+    small, large = first_pages(data, max(1, total // 6)), first_pages(data, total)
+    n_small, n_large = len(fitz.open(stream=small)), total
+
+    reader = PDFReader(parallel_workers=workers)
+    spawn = timed(reader, small, True)  # primeira chamada sobe os processos
+    spawn -= timed(reader, small, True)
+
+    serial_small, extra_small = overhead(reader, small)
+    serial_large, extra_large = overhead(reader, large)
+    reader.close()
+
+    per_page = serial_large / n_large
+    extra_per_page = max(0.0, (extra_large - extra_small) / max(1, n_large - n_small))
+    extra_fixed = max(0.0, extra_small - extra_per_page * n_small)
+    # ganho por página com `workers` núcleos livres, descontado o custo extra
+    gain = per_page * (1 - 1 / workers) - extra_per_page
+
+    print(f"{path}: {total} páginas, {workers} processos")
+    print(f"  sequencial:            {per_page * 1000:.1f} ms/página")
+    print(f"  paralelo (aquecido):   +{extra_fixed * 1000:.0f} ms + {extra_per_page * 1000:.1f} ms/página")
+    print(f"  subir o pool (spawn):  {spawn * 1000:.0f} ms, uma vez por processo de análise")
+    if gain <= 0:
+        print("  o paralelo não compensa com esses custos")
+        return
+    print(f"  equilíbrio, pool aquecido:  {extra_fixed / gain:.0f} páginas")
+    print(f"  equilíbrio, primeira vez:   {(extra_fixed + spawn) / gain:.0f} páginas")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 2)
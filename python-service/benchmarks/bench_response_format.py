@@ -0,0 +1,114 @@
+"""
+Tamanho e tempo de serialização da resposta do /analyze em um ledger
+sintético com muitas duplicatas: formato completo com json da stdlib
+(como antes), completo com orjson e compacto com orjson, com e sem gzip.
+
+Uso (a partir de python-service/):
+    python -m benchmarks.bench_response_format [entradas]
+"""
+
+import contextlib
+import gzip
+import io
+import json
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from app import config
+from app.services.analyzer import DuplicateAnalyzer
+from app.services.ledger import AnalysisResult, LedgerEntry
+from app.utils.json_response import dumps
+
+
+def make_ledger(n: int, seed: int = 7) -> List[LedgerEntry]:
+    """~1/3 das notas lançadas duas ou três vezes"""
+    rnd = random.Random(seed)
+    suppliers = [f"FORNECEDOR {i:04d} COMERCIO LTDA" for i in range(1_500)]
+    entries: List[LedgerEntry] = []
+    i = 0
+    while len(entries) < n:
+        codigo = rnd.randrange(1, 1_500)
+        args = (
+            str(codigo),
+            suppliers[codigo],
+            739_000 + rnd.randrange(365),
+            str(100_000 + i),
+            rnd.randrange(1_000, 5_000_000),
+        )
+        copies = rnd.choice((1, 1, 1, 1, 2, 3))
+        for _ in range(copies):
+            entries.append(LedgerEntry(*args, pagina=len(entries) // 45 + 1, linha=i % 45))
+        i += 1
+    return entries[:n]
+
+
+def measure(
+    build: Callable[[AnalysisResult], Any],
+    encode: Callable[[Any], bytes],
+    result: AnalysisResult,
+    repeat: int,
+) -> Dict[str, Any]:
+    build_ms = encode_ms = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = build(result)
+        built = time.perf_counter()
+        body = encode(content)
+        build_ms += (built - start) * 1000 / repeat
+        encode_ms += (time.perf_counter() - built) * 1000 / repeat
+
+    start = time.perf_counter()
+    compressed = gzip.compress(body, compresslevel=config.GZIP_LEVEL)
+    gzip_ms = (time.perf_counter() - start) * 1000
+    return {
+        "montar": build_ms,
+        "serializar": encode_ms,
+        "bytes": len(body),
+        "gzip": len(compressed),
+        "gzip_ms": gzip_ms,
+    }
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+def main(n: int, repeat: int = 3) -> None:
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = DuplicateAnalyzer().analyze(make_ledger(n))
+
+    print(
+        f"{n} entradas, {len(result.duplicatas)} duplicatas, "
+        f"{len(result.possiveis_duplicatas)} possíveis"
+    )
+    modes = {
+        "completo/json": (AnalysisResult.to_dict, _stdlib_dumps),
+        "completo/orjson": (AnalysisResult.to_dict, dumps),
+        "compacto/orjson": (AnalysisResult.to_compact_dict, dumps),
+    }
+
+    print(
+        f"{'formato':<16} {'montar (ms)':>12} {'serializar (ms)':>16}"
+        f" {'bytes':>11} {'gzip':>10} {'gzip (ms)':>10}"
+    )
+    baseline = None
+    for name, (build, encode) in modes.items():
+        m = measure(build, encode, result, repeat)
+        baseline = baseline or m
+        print(
+            f"{name:<16} {m['montar']:>12.1f} {m['serializar']:>16.1f}"
+            f" {m['bytes']:>11} {m['gzip']:>10} {m['gzip_ms']:>10.1f}"
+        )
+
+    print(
+        f"compacto/orjson vs completo/json: serialização"
+        f" {baseline['serializar'] / m['serializar']:.1f}x mais rápida,"
+        f" {baseline['bytes'] / m['bytes']:.1f}x menor"
+        f" ({baseline['bytes'] / m['gzip']:.1f}x com gzip)"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,74 @@
+"""
+Benchmark da etapa fuzzy (DuplicateAnalyzer._group_by_similar_match)
+com e sem chaves de bloqueio, em ledgers sintéticos de tamanhos crescentes.
+
+Uso (a partir de python-service/):
+    python -m benchmarks.bench_similar_grouping [tamanhos...]
+"""
+
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+from app.services.analyzer import DuplicateAnalyzer
+
+WORDS = [
+    "comercio", "distribuidora", "transportes", "papelaria", "padaria",
+    "industria", "servicos", "alimentos", "construtora", "farmacia",
+    "central", "sao", "joao", "nacional", "brasil", "norte", "sul", "acme",
+]
+
+
+def make_entries(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    suppliers = [
+        " ".join(rnd.sample(WORDS, 3)).upper() + " LTDA" for _ in range(max(10, n // 20))
+    ]
+    entries = []
+    for i in range(n):
+        name = rnd.choice(suppliers)
+        if rnd.random() < 0.1:
+            # pequena variação de digitação
+            pos = rnd.randrange(len(name))
+            name = name[:pos] + name[pos + 1 :]
+        cents = rnd.randrange(1000, 5_000_000)
+        entries.append(
+            {
+                "codigoFornecedor": str(rnd.randrange(1, 999)),
+                "fornecedor": name,
+                "data": f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/2026",
+                "notaSerie": str(100000 + i),
+                "valorContabil": f"{cents // 100},{cents % 100:02d}",
+                "valor": f"{cents // 100},{cents % 100:02d}",
+                "posicao": f"Pág {i // 45 + 1}, Linha {i % 45}",
+            }
+        )
+    return entries
+
+
+def bench(analyzer: DuplicateAnalyzer, entries: List[Dict[str, Any]]) -> float:
+    prepared = analyzer._prepare_entries(analyzer._filter_valid_entries(entries))
+    start = time.perf_counter()
+    analyzer._group_by_similar_match(prepared, set())
+    return time.perf_counter() - start
+
+
+def main(sizes: List[int]) -> None:
+    blocked = DuplicateAnalyzer(blocking_keys=("valor",))
+    unblocked = DuplicateAnalyzer(blocking_keys=())
+
+    print(f"{'entradas':>10} {'com bloqueio (s)':>18} {'us/entrada':>11} {'sem bloqueio (s)':>18}")
+    for n in sizes:
+        entries = make_entries(n)
+        t_blocked = bench(blocked, entries)
+        # sem bloqueio é O(n·g); só roda nos tamanhos menores
+        t_unblocked = bench(unblocked, entries) if n <= 10_000 else None
+        print(
+            f"{n:>10} {t_blocked:>18.3f} {t_blocked / n * 1e6:>11.2f} "
+            f"{(f'{t_unblocked:.3f}' if t_unblocked is not None else '-'):>18}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [2_500, 5_000, 10_000, 20_000, 40_000, 80_000])
@@ -0,0 +1,241 @@
+"""
+Etapas do DuplicateAnalyzer comparadas com referências diretas:
+- fuzzy (_group_by_similar_match com cdist em faixas) x comparação par a
+  par com a primeira referência de grupo que atinge o threshold
+- janela de datas (_group_by_date_window) x grupos montados à mão nas
+  bordas da janela e x varredura direta por fornecedor/valor
+
+Uso (a partir de python-service/):
+    python -m pytest tests
+"""
+
+import random
+from typing import Dict, List, Sequence, Tuple
+
+import pytest
+from rapidfuzz import fuzz
+
+from app.services.analyzer import DuplicateAnalyzer
+from app.services.ledger import LedgerEntry
+from app.utils.normalizer import normalize_supplier
+
+BASE_NAMES = [
+    "padaria sao joao me",
+    "distribuidora acao s.a.",
+    "comercio de pecas ltda",
+    "transportes rapido eireli",
+    "papelaria central",
+    "construtora irmaos araujo",
+    "farmacia popular n3",
+    "acme comercio ltda",
+]
+
+
+def mutate(name: str, rnd: random.Random) -> str:
+    """Variações pequenas (perto do threshold) e nomes bem diferentes"""
+    chars = list(name)
+    for _ in range(rnd.choice((0, 0, 1, 2, 3, 4, 6))):
+        pos = rnd.randrange(len(chars))
+        op = rnd.random()
+        if op < 0.4:
+            chars[pos] = rnd.choice("abcdefghijklmnopqrstuvwxyz ")
+        elif op < 0.7:
+            del chars[pos]
+        else:
+            chars.insert(pos, rnd.choice("abcdefghijklmnopqrstuvwxyz"))
+    return "".join(chars) or name
+
+
+def make_entries(n: int, seed: int) -> List[LedgerEntry]:
+    rnd = random.Random(seed)
+    entries = []
+    for i in range(n):
+        name = mutate(rnd.choice(BASE_NAMES), rnd)
+        if rnd.random() < 0.1:
+            name = f"fornecedor {rnd.randrange(10_000)}"
+        valor = rnd.choice((15050, 99990, 120050))
+        # nota distinta: nenhuma duplicata exata, todas passam pela etapa fuzzy
+        entries.append(LedgerEntry(str(i), name.upper(), 739_000, str(i), valor))
+    return entries
+
+
+def reference_groups(
+    analyzer: DuplicateAnalyzer, names: List[str], valores: List[int], blocks: Sequence
+) -> Dict[Tuple[str, int], List[int]]:
+    """
+    Implementação original: cada entrada entra no primeiro grupo (ordem de
+    criação) cujo primeiro elemento, no mesmo bloco, atinge o threshold
+    """
+    groups: Dict[Tuple[str, int], List[int]] = {}
+    leaders: List[Tuple[int, Tuple[str, int]]] = []
+    for idx, name in enumerate(names):
+        for leader, key in leaders:
+            if (
+                blocks[leader] == blocks[idx]
+                and fuzz.ratio(name, names[leader]) >= analyzer.similarity_threshold
+            ):
+                groups[key].append(idx)
+                break
+        else:
+            key = (name, valores[idx])
+            leaders.append((idx, key))
+            groups.setdefault(key, []).append(idx)
+    return groups
+
+
+@pytest.mark.parametrize("blocking_keys", [(), ("valor",)])
+@pytest.mark.parametrize(
+    "chunk_rows,max_cells",
+    [
+        (1024, 4_000_000),  # uma faixa só
+        (7, 4_000_000),  # faixas pequenas: grupos cruzam as fronteiras
+        (1, 4_000_000),  # uma linha por faixa
+        (64, 50),  # faixa limitada pelo número de referências
+    ],
+)
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_similar_match_equals_pairwise(blocking_keys, chunk_rows, max_cells, seed, monkeypatch):
+    analyzer = DuplicateAnalyzer(blocking_keys=blocking_keys)
+    monkeypatch.setattr(analyzer, "CDIST_CHUNK_ROWS", chunk_rows)
+    monkeypatch.setattr(analyzer, "CDIST_MAX_CELLS", max_cells)
+
+    prepared = analyzer._prepare_entries(make_entries(400, seed))
+    position = {id(p): i for i, p in enumerate(prepared)}
+    names = [p.fornecedor_norm for p in prepared]
+    valores = [p.entry.valor_contabil_centavos for p in prepared]
+    blocks = [analyzer._blocking_key(p) for p in prepared]
+
+    got = {
+        key: [position[id(p)] for p in members]
+        for key, members in analyzer._group_by_similar_match(prepared, set()).items()
+    }
+    expected = reference_groups(analyzer, names, valores, blocks)
+
+    assert list(got.items()) == list(expected.items())
+    # o teste só vale se houver grupos com várias entradas e entradas sozinhas
+    sizes = [len(members) for members in got.values()]
+    assert max(sizes) > 1 and min(sizes) == 1
+
+
+def test_similar_match_skips_processed():
+    analyzer = DuplicateAnalyzer()
+    prepared = analyzer._prepare_entries(make_entries(50, seed=4))
+    processados = {p.exact_key for p in prepared[::2]}
+
+    groups = analyzer._group_by_similar_match(prepared, processados)
+
+    grouped = [p for members in groups.values() for p in members]
+    assert sorted(id(p) for p in grouped) == sorted(id(p) for p in prepared[1::2])
+
+
+D0 = 739_000  # ordinal de 2024-04-23
+
+
+def dated(nota: str, days: int, fornecedor: str = "ACME COMERCIO LTDA", valor: int = 15050):
+    return LedgerEntry("100", fornecedor, D0 + days if days is not None else None, nota, valor)
+
+
+def window_groups(analyzer: DuplicateAnalyzer, entries: List[LedgerEntry]) -> List[List[str]]:
+    prepared = analyzer._prepare_entries(entries)
+    return [
+        [p.entry.nota_serie for p in members]
+        for members in analyzer._group_by_date_window(prepared, set())
+    ]
+
+
+@pytest.mark.parametrize(
+    "days,expected",
+    [
+        # exatamente N dias da primeira: mesmo grupo
+        ([0, 5], [["a", "b"]]),
+        # N + 1 dias: fora da janela
+        ([0, 6], []),
+        # mesma data
+        ([3, 3], [["a", "b"]]),
+        # cadeia mais longa que a janela: a janela conta da primeira do
+        # grupo, não da anterior (0, 3 e 6 não ficam juntos)
+        ([0, 3, 6], [["a", "b"]]),
+        ([0, 3, 6, 8], [["a", "b"], ["c", "d"]]),
+        ([0, 5, 6, 11, 12], [["a", "b"], ["c", "d"]]),
+        ([0, 1, 2, 3, 4, 5, 6], [["a", "b", "c", "d", "e", "f"]]),
+        # fora de ordem: agrupa pela data, entradas do grupo na ordem das
+        # datas e grupos na ordem da primeira posição de cada um
+        ([6, 0, 3], [["b", "c"]]),
+        ([8, 6, 3, 0], [["b", "a"], ["d", "c"]]),
+    ],
+)
+def test_date_window_edges(days, expected):
+    analyzer = DuplicateAnalyzer(date_window_days=5)
+    entries = [dated(chr(ord("a") + i), d) for i, d in enumerate(days)]
+    assert window_groups(analyzer, entries) == expected
+
+
+def test_date_window_key_and_processed():
+    analyzer = DuplicateAnalyzer(date_window_days=5)
+    entries = [
+        dated("a", 0),
+        dated("b", 1, valor=15051),  # outro valor
+        dated("c", 2, fornecedor="OUTRO FORNECEDOR"),  # outro fornecedor
+        dated("d", 3, fornecedor="Acme  Comércio Ltda"),  # mesmo normalizado
+        dated("e", 4, valor=15051),
+    ]
+    assert window_groups(analyzer, entries) == [["a", "d"], ["b", "e"]]
+
+    prepared = analyzer._prepare_entries(entries)
+    groups = analyzer._group_by_date_window(prepared, {prepared[0].exact_key})
+    assert [[p.entry.nota_serie for p in members] for members in groups] == [["b", "e"]]
+
+
+def test_date_window_ignores_entries_without_date():
+    analyzer = DuplicateAnalyzer(date_window_days=5)
+    entries = [dated("a", 0), dated("b", None), dated("c", 2), dated("d", None)]
+
+    result = analyzer.analyze(entries)
+
+    assert result.validos == 2
+    assert [[e.nota_serie for e in g.entries] for g in result.possiveis_duplicatas] == [["a", "c"]]
+    assert result.possiveis_duplicatas[0].diferencas_dias == [0, 2]
+    assert "5 dias" in result.possiveis_duplicatas[0].motivo
+    assert result.notas_unicas == []
+
+
+def reference_window_groups(entries: List[LedgerEntry], window: int) -> List[List[str]]:
+    """
+    Por fornecedor/valor, em ordem de data: a primeira entrada livre abre um
+    grupo com todas as livres até window dias depois dela
+    """
+    keys: Dict[Tuple[str, int], List[Tuple[int, LedgerEntry]]] = {}
+    for position, entry in enumerate(entries):
+        key = (normalize_supplier(entry.fornecedor), entry.valor_contabil_centavos)
+        keys.setdefault(key, []).append((position, entry))
+
+    found = []
+    for members in keys.values():
+        pending = sorted(members, key=lambda item: (item[1].data_ordinal, item[0]))
+        while pending:
+            first = pending[0][1].data_ordinal
+            group = [m for m in pending if m[1].data_ordinal - first <= window]
+            pending = pending[len(group):]
+            if len(group) > 1:
+                found.append((min(p for p, _ in group), [e.nota_serie for _, e in group]))
+    return [group for _, group in sorted(found)]
+
+
+@pytest.mark.parametrize("window", [1, 5, 30])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_date_window_equals_reference(window, seed):
+    rnd = random.Random(seed)
+    entries = [
+        dated(
+            str(i),
+            rnd.randrange(90),
+            fornecedor=rnd.choice(BASE_NAMES[:3]).upper(),
+            valor=rnd.choice((15050, 99990)),
+        )
+        for i in range(300)
+    ]
+    analyzer = DuplicateAnalyzer(date_window_days=window)
+    got = window_groups(analyzer, entries)
+
+    assert got == reference_window_groups(entries, window)
+    assert got and max(len(g) for g in got) > 2
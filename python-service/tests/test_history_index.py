@@ -0,0 +1,170 @@
+"""
+Índice histórico (HistoryIndex em SQLite): buscas exata e por bloco,
+regravação do mesmo arquivo (linhas substituídas, nunca duplicadas),
+retenção e a etapa de histórico do DuplicateAnalyzer.
+
+Uso (a partir de python-service/):
+    python -m pytest tests
+"""
+
+from typing import List, Tuple
+
+import pytest
+
+from app.services import history_index
+from app.services.analyzer import DuplicateAnalyzer
+from app.services.history_index import HistoryIndex
+from app.services.ledger import LedgerEntry
+
+D0 = 739_000
+DAY = 86400.0
+
+
+class Clock:
+    """time.time() controlado (analisado_em e retenção)"""
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(history_index.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def index(tmp_path, clock):
+    return HistoryIndex(str(tmp_path / "historico" / "index.db"), retention_days=30)
+
+
+def entry(nota: str, fornecedor: str = "ACME COMERCIO LTDA", days: int = 0, valor: int = 15050):
+    return LedgerEntry("100", fornecedor, D0 + days, nota, valor, pagina=1, linha=int(nota))
+
+
+def rows(entries: List[LedgerEntry], bloco: str = "b1") -> List[Tuple[LedgerEntry, str, str]]:
+    return [(e, e.fornecedor.lower(), bloco) for e in entries]
+
+
+def key(e: LedgerEntry):
+    return (e.codigo_fornecedor, e.data_ordinal, e.nota_serie, e.valor_contabil_centavos)
+
+
+def notas(found) -> List[str]:
+    return [item.entry.nota_serie for item in found]
+
+
+def test_find_exact(index):
+    a, b = entry("1"), entry("2")
+    assert index.record("h1", "janeiro.pdf", rows([a, b])) == 2
+
+    found = index.find_exact([key(a), key(entry("3"))], "h2")
+
+    assert list(found) == [key(a)]
+    (previous,) = found[key(a)]
+    assert previous.arquivo == "janeiro.pdf"
+    assert previous.fornecedor_norm == "acme comercio ltda"
+    assert previous.entry.posicao == "Pág 1, Linha 1"
+    assert previous.entry.to_dict() == {**a.to_dict(), "posicao": "Pág 1, Linha 1"}
+    # o próprio arquivo nunca é correspondência
+    assert index.find_exact([key(a)], "h1") == {}
+    assert index.find_exact([], "h2") == {}
+
+
+def test_find_exact_orders_by_analysis(index, clock):
+    index.record("h1", "janeiro.pdf", rows([entry("1")]))
+    clock.now += DAY
+    index.record("h2", "fevereiro.pdf", rows([entry("1")]))
+
+    found = index.find_exact([key(entry("1"))], "h3")
+    assert [item.arquivo for item in found[key(entry("1"))]] == ["janeiro.pdf", "fevereiro.pdf"]
+
+
+def test_find_blocks(index):
+    index.record("h1", "janeiro.pdf", rows([entry("1"), entry("2")], "b1"))
+    index.record("h2", "fevereiro.pdf", rows([entry("3")], "b2"))
+
+    found = index.find_blocks(["b1", "b2", "b3"], "h2")
+
+    assert {bloco: notas(items) for bloco, items in found.items()} == {"b1": ["1", "2"]}
+    assert index.find_blocks([], "h2") == {}
+
+
+def test_record_same_hash_replaces_rows(index, clock):
+    index.record("h1", "janeiro.pdf", rows([entry("1"), entry("2"), entry("3")]))
+    clock.now += DAY
+    index.record("h1", "janeiro-reenviado.pdf", rows([entry("1"), entry("4")]))
+
+    assert index.stats() == {"habilitado": True, "entradas": 2, "arquivos": 1}
+    found = index.find_exact([key(entry(n)) for n in "1234"], "outro")
+    assert sorted(k[2] for k in found) == ["1", "4"]
+    (previous,) = found[key(entry("1"))]
+    assert previous.arquivo == "janeiro-reenviado.pdf"
+    assert previous.analisado_em == clock.now
+    assert notas(index.find_blocks(["b1"], "outro")["b1"]) == ["1", "4"]
+
+    # regravar sem entradas remove o arquivo
+    index.record("h1", "janeiro.pdf", [])
+    assert index.stats()["entradas"] == 0
+
+
+def test_retention(index, clock):
+    index.record("h1", "antigo.pdf", rows([entry("1")]))
+    clock.now += 20 * DAY
+    index.record("h2", "recente.pdf", rows([entry("2")]))
+
+    # 30 dias depois do primeiro: ainda no limite
+    clock.now += 10 * DAY
+    index.record("h3", "atual.pdf", rows([entry("3")]))
+    assert index.stats()["arquivos"] == 3
+
+    clock.now += 1
+    index.record("h3", "atual.pdf", rows([entry("3")]))
+    assert index.stats() == {"habilitado": True, "entradas": 2, "arquivos": 2}
+    assert notas(index.find_blocks(["b1"], "outro")["b1"]) == ["2", "3"]
+
+
+def test_retention_disabled(tmp_path, clock):
+    index = HistoryIndex(str(tmp_path / "index.db"), retention_days=0)
+    index.record("h1", "antigo.pdf", rows([entry("1")]))
+    clock.now += 10_000 * DAY
+    index.record("h2", "atual.pdf", rows([entry("2")]))
+
+    assert index.stats()["entradas"] == 2
+
+
+def test_stats_unavailable(tmp_path):
+    # diretório no lugar do arquivo do banco
+    (tmp_path / "index.db").mkdir()
+    assert HistoryIndex(str(tmp_path / "index.db")).stats()["entradas"] == 0
+
+
+@pytest.mark.parametrize("blocking_keys", [(), ("valor",)])
+def test_analyzer_history(index, blocking_keys):
+    analyzer = DuplicateAnalyzer(blocking_keys=blocking_keys)
+    janeiro = [entry("1"), entry("2", "PADARIA SAO JOAO ME", valor=990)]
+    assert analyzer.analyze(janeiro, index, "h1", "janeiro.pdf").historico == []
+
+    # mesmo arquivo de novo: não se encontra nele mesmo, nem duplica linhas
+    assert analyzer.analyze(janeiro, index, "h1", "janeiro.pdf").historico == []
+    assert index.stats()["entradas"] == 2
+
+    fevereiro = [
+        entry("1"),  # mesma chave exata
+        entry("1"),  # repetida no arquivo: reportada uma vez
+        entry("5", "PADARIA SAO JOAO M", valor=990),  # fornecedor parecido
+        entry("6", "PADARIA SAO JOAO M", valor=991),  # outro valor
+    ]
+    historico = analyzer.analyze(fevereiro, index, "h2", "fevereiro.pdf").historico
+
+    found = [(m.entry.nota_serie, m.tipo, notas(m.anteriores)) for m in historico]
+    expected = [("1", "DUPLICATA_EXATA", ["1"])]
+    if blocking_keys:
+        # busca fuzzy só com chaves de bloqueio
+        expected.append(("5", "POSSIVEL_DUPLICATA", ["2"]))
+    assert found == expected
+    assert index.stats() == {"habilitado": True, "entradas": 6, "arquivos": 2}
@@ -0,0 +1,77 @@
+"""
+Jobs assíncronos (POST /jobs): o estado final não pode ser desfeito por
+eventos do worker que chegam à fila depois do resultado.
+
+Uso (a partir de python-service/):
+    python -m pytest tests
+"""
+
+import asyncio
+import queue
+
+import pytest
+
+from app import main
+from app.services.job_manager import Job, JobManager
+
+
+@pytest.fixture
+def job_manager(tmp_path, monkeypatch):
+    manager = JobManager(str(tmp_path), ttl_seconds=3600)
+    monkeypatch.setattr(main, "job_manager", manager)
+    return manager
+
+
+def run_job(manager: JobManager, events, result=None, error=None) -> dict:
+    """
+    Roda _run_job com o future já resolvido e os eventos ainda na fila
+    (o consumidor só os lê depois do resultado)
+    """
+    channel = queue.Queue()
+    for event in events:
+        channel.put(event)
+
+    async def scenario():
+        job = manager.create("teste.pdf")
+        future = asyncio.get_running_loop().create_future()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+        await main._run_job(job, future, channel)
+        return job.job_id
+
+    return manager.get(asyncio.run(scenario()))
+
+
+EVENTS = [
+    ("etapa", "extracao"),
+    ("pagina", {"pagina": 1, "totalPaginas": 1, "entradas": 3}),
+    ("etapa", "analise"),
+]
+
+
+def test_late_events_keep_job_concluded(job_manager):
+    result = {"summary": {"duplicatasExatas": 0}}
+    state = run_job(job_manager, EVENTS, result=result)
+
+    assert state["status"] == Job.CONCLUIDO
+    assert state["etapa"] == "concluido"
+    assert state["resultado"]["summary"] == result["summary"]
+    assert state["progresso"]["pagina"] == 1
+
+
+def test_late_events_keep_job_failed(job_manager):
+    state = run_job(job_manager, EVENTS, error=RuntimeError("falhou"))
+
+    assert state["status"] == Job.ERRO
+    assert state["etapa"] == Job.ERRO
+    assert state["erro"] == "falhou"
+    assert state["resultado"] is None
+
+
+def test_no_structured_data_is_an_error(job_manager):
+    state = run_job(job_manager, EVENTS, result=None)
+
+    assert state["status"] == Job.ERRO
+    assert state["resultado"] is None
@@ -0,0 +1,124 @@
+"""
+Pré-classificação de linhas do PDFReader (DATA_LINE_REGEX/_skip_line): as
+entradas extraídas de uma página têm que ser as mesmas com e sem o filtro,
+nos dois motores de layout e com ou sem layout aprendido.
+
+Uso (a partir de python-service/):
+    python -m pytest tests
+"""
+
+from typing import Any, List, Optional, Tuple
+
+import pytest
+
+from app.services.page_layout import NumpyPageLayout
+from app.services.pdf_reader import ExtractionStats, LayoutTemplate, PDFReader
+
+# (x, texto) de cada palavra, uma lista por linha, como num relatório de entradas
+PAGE = [
+    # título com data e sem valor
+    [(40, "Relatorio"), (79, "de"), (91, "Entradas"), (135, "Emitido"), (168, "em"), (183, "01/02/2026")],
+    # cabeçalho da tabela
+    [(30, "Codigo"), (80, "Data"), (150, "Nota"), (220, "Fornecedor"), (480, "Valor"), (501, "Contabil")],
+    # linhas de dados com código do fornecedor
+    [(30, "101"), (80, "19/01/2026"), (150, "10008"), (220, "Padaria"), (250, "São"), (266, "João"), (286, "ME"), (480, "99,00")],
+    [(30, "103"), (80, "25/01/2026"), (150, "10057"), (220, "TRANSPORTES"), (282, "RÁPIDO"), (480, "45.000,50")],
+    [(30, "100"), (80, "10/01/2026"), (150, "10038"), (220, "ACME"), (245, "COMERCIO"), (292, "LTDA"), (480, "1.200,50")],
+    [(30, "104"), (80, "9/1/26"), (150, "10016"), (220, "Farmácia"), (260, "Popular"), (295, "nº"), (305, "3"), (480, "R$"), (492, "150,00")],
+    # linhas de dados sem código do fornecedor
+    [(80, "12/01/2026"), (150, "10090"), (220, "Papelaria"), (256, "Central"), (480, "150,00")],
+    [(80, "13/01/2026"), (150, "10091"), (220, "Comércio"), (260, "de"), (272, "Peças"), (480, "2.345,67")],
+    # totais: só valor, e data + valor (passam no filtro e caem depois)
+    [(30, "Total"), (50, "da"), (61, "pagina"), (480, "123.456,00")],
+    [(30, "Total"), (50, "geral"), (80, "31/01/2026"), (480, "999.999,99")],
+    # data sem valor / valor sem data / texto solto
+    [(30, "105"), (80, "14/01/2026"), (150, "10092"), (220, "Sem"), (240, "valor")],
+    [(30, "106"), (150, "10093"), (220, "Sem"), (240, "data"), (480, "10,00")],
+    [(30, "Observações:"), (90, "lançamentos"), (150, "conferidos")],
+    # rodapé
+    [(30, "Página"), (70, "1"), (80, "de"), (95, "3")],
+]
+
+Lines = List[List[Tuple[float, str]]]
+
+
+@pytest.fixture(scope="module")
+def reader():
+    reader = PDFReader()
+    yield reader
+    reader.close()
+
+
+def page_words(page: List[List[Tuple[int, str]]]) -> List[Any]:
+    return [
+        [float(x), 20.0 + row * 7.1, x + 5.0, 26.0 + row * 7.1, text, 0, 0, 0]
+        for row, line in enumerate(page)
+        for x, text in line
+    ]
+
+
+def extract(
+    reader: PDFReader,
+    engine: str,
+    filtered: bool,
+    layout: Optional[LayoutTemplate] = None,
+    monkeypatch=None,
+) -> Tuple[List[dict], ExtractionStats, List[float], list]:
+    """Entradas da página pelo caminho da heurística ou do layout aprendido"""
+    words = page_words(PAGE)
+    page_layout = None
+    if engine == "numpy":
+        page_layout = NumpyPageLayout(words)
+        lines: Lines = page_layout.lines
+        columns = page_layout.detect_columns(reader.tolerance)
+        cols_by_line = page_layout.split_columns(columns)
+    else:
+        lines = reader._group_words_by_line(words)
+        columns = reader._detect_columns(lines)
+        cols_by_line = None
+
+    header_row = reader._find_header_row(lines)
+    if not filtered:
+        # sem pré-classificação: toda linha vai para o mapeamento
+        monkeypatch.setattr(reader, "_skip_line", lambda *args: False)
+        header_row = None
+
+    stats = ExtractionStats()
+    resolved: list = []
+    if layout is None:
+        entries = reader._extract_entries(
+            lines, columns, 1, resolved, cols_by_line, header_row, stats
+        )
+    else:
+        entries = reader._extract_entries_with_layout(
+            lines, layout, 1, page_layout, header_row, stats
+        )
+    monkeypatch.undo()
+    return [e.to_dict() for e in entries], stats, columns, resolved
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_filter_keeps_entries(reader, engine, monkeypatch):
+    filtered, stats, _, _ = extract(reader, engine, True, monkeypatch=monkeypatch)
+    unfiltered, _, _, _ = extract(reader, engine, False, monkeypatch=monkeypatch)
+
+    assert filtered == unfiltered
+    # as seis linhas de dados, com e sem código; o "Total geral" (data e
+    # valor) passa no filtro e vira entrada igual nos dois casos
+    assert [e["notaSerie"] for e in filtered] == [
+        "10008", "10057", "10038", "10016", "10090", "10091", "N/A"
+    ]
+    # título, cabeçalho, total da página, sem valor, sem data, texto e rodapé
+    assert stats.linhas_descartadas == 7
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_filter_keeps_entries_with_layout(reader, engine, monkeypatch):
+    _, _, columns, resolved = extract(reader, engine, True, monkeypatch=monkeypatch)
+    layout = LayoutTemplate.learn(columns, resolved[0])
+
+    filtered, _, _, _ = extract(reader, engine, True, layout, monkeypatch)
+    unfiltered, _, _, _ = extract(reader, engine, False, layout, monkeypatch)
+
+    assert filtered == unfiltered
+    assert len(filtered) == 7
@@ -0,0 +1,143 @@
+"""
+Saídas do app.utils.normalizer comparadas com as da implementação anterior
+(re.sub sem compilar + NFD caractere a caractere), gravadas abaixo.
+
+Uso (a partir de python-service/):
+    python -m pytest tests
+"""
+
+from datetime import date
+
+import pytest
+
+from app.utils import normalizer
+
+# texto -> normalize_text / normalize_supplier
+NORMALIZED = [
+    ("Padaria São João ME", "padaria sao joao me"),
+    ("DISTRIBUIDORA AÇÃO S.A.", "distribuidora acao s.a."),
+    ("Comércio  de Peças\tLtda", "comercio de pecas ltda"),
+    ("Transportes Rápido - EIRELI", "transportes rapido eireli"),
+    ("Café & Cia.  ", "cafe cia"),
+    (" Ótica Visão", "otica visao"),
+    ("Ñandú Importação", "nandu importacao"),
+    ("Farmácia Popular nº 3", "farmacia popular n3"),
+    ("ÀÉÎÕÜ çÇ", "aeiou cc"),
+    # sem decomposição NFD: ficam como estão
+    ("Straße Ærø", "straße ærø"),
+    ("A-B C", "a-b c"),
+    ("  ACME, LTDA  ", "acmeltda"),
+    ("", ""),
+    (" ", ""),
+    ("\t\n", ""),
+]
+
+# valor -> (clean_monetary_value, parse_monetary_cents)
+MONETARY = [
+    ("1.234,56", "1.234,56", 123456),
+    ("R$ 99,90", "99,90", 9990),
+    ("45000", "45.000,00", 4500000),
+    ("12,345", "12,35", 1235),
+    (" 7.500,00 ", "7.500,00", 750000),
+    ("1.234.567,891", "1.234.567,89", 123456789),
+    # sinal é descartado
+    ("-1.234,56", "1.234,56", 123456),
+    # arredondamento do float (0,005 fica acima e 0,015 abaixo da metade)
+    ("0,005", "0,01", 1),
+    ("0,015", "0,01", 1),
+    ("0,00", "0,00", 0),
+    # ponto depois da vírgula: separadores não reconhecidos
+    ("1,234.56", "0,00", 0),
+    ("1.2.3", "0,00", 0),
+    ("12,34,56", "0,00", 0),
+    ("abc", "0,00", 0),
+    ("R$", "0,00", 0),
+    (",", "0,00", 0),
+    (".", "0,00", 0),
+    ("  ", "0,00", 0),
+    ("", "Não é um valor: 0,00", 0),
+]
+
+# data -> (clean_date, parse_date_ordinal)
+DATES = [
+    ("01/02/2026", "01/02/2026", date(2026, 2, 1).toordinal()),
+    ("1/2/26", "01/02/2026", date(2026, 2, 1).toordinal()),
+    ("31-12-2025", "31/12/2025", date(2025, 12, 31).toordinal()),
+    ("data: 15/07/2024", "15/07/2024", date(2024, 7, 15).toordinal()),
+    ("29/02/2024", "29/02/2024", date(2024, 2, 29).toordinal()),
+    # passam na validação básica do clean_date, mas não existem
+    ("31/02/2026", "31/02/2026", None),
+    ("29/02/2025", "29/02/2025", None),
+    ("32/01/2026", "", None),
+    ("00/01/2026", "", None),
+    ("01/13/2026", "", None),
+    ("01/01/1899", "", None),
+    ("15/07/2101", "", None),
+    ("xx", "", None),
+    ("", "", None),
+]
+
+SUPPLIERS = [
+    ("Padaria São João ME", "Padaria São João ME"),
+    ("  Comércio  de\tPeças  ", "Comércio de Peças"),
+    ("X" * 120, "X" * 100),
+    (" ", ""),
+    ("", "Desconhecido"),
+]
+
+DOCUMENTS = [
+    ("NF 123456", "123456"),
+    ("nf-42", "42"),
+    ("Nota Fiscal 98765", "98765"),
+    ("documento-555", "555"),
+    ("ref 1234567", "1234567"),
+    ("NF.12 e 7654321", "12"),
+    ("sem numero", None),
+    ("", None),
+]
+
+
+@pytest.mark.parametrize("text,expected", NORMALIZED)
+def test_normalize_text(text, expected):
+    assert normalizer.normalize_text(text) == expected
+
+
+@pytest.mark.parametrize("text,expected", NORMALIZED)
+def test_normalize_supplier(text, expected):
+    # duas vezes: a segunda vem do cache LRU
+    assert normalizer.normalize_supplier(text) == expected
+    assert normalizer.normalize_supplier(text) == expected
+
+
+@pytest.mark.parametrize("value,formatted,cents", MONETARY)
+def test_monetary(value, formatted, cents):
+    assert normalizer.clean_monetary_value(value) == formatted
+    assert normalizer.parse_monetary_cents(value) == cents
+
+
+@pytest.mark.parametrize("value,formatted,cents", MONETARY)
+def test_format_cents_roundtrip(value, formatted, cents):
+    if cents:
+        assert normalizer.format_cents(cents) == formatted
+
+
+@pytest.mark.parametrize("value,cleaned,ordinal", DATES)
+def test_dates(value, cleaned, ordinal):
+    assert normalizer.clean_date(value) == cleaned
+    assert normalizer.parse_date_ordinal(value) == ordinal
+
+
+@pytest.mark.parametrize("value,cleaned,ordinal", DATES)
+def test_format_date_ordinal_roundtrip(value, cleaned, ordinal):
+    if ordinal is not None:
+        assert normalizer.format_date_ordinal(ordinal) == cleaned
+
+
+@pytest.mark.parametrize("name,expected", SUPPLIERS)
+def test_clean_supplier_name(name, expected):
+    assert normalizer.clean_supplier_name(name) == expected
+
+
+@pytest.mark.parametrize("text,expected", DOCUMENTS)
+def test_extract_document_number(text, expected):
+    assert normalizer.extract_document_number(text) == expected
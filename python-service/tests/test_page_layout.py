@@ -0,0 +1,165 @@
+"""
+Motores de layout do PDFReader (python x NumpyPageLayout) nas mesmas
+palavras: linhas, colunas e cols_text de cada linha devem ser iguais.
+
+Uso (a partir de python-service/):
+    python -m pytest tests
+"""
+
+import math
+import random
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from app.services.page_layout import NumpyPageLayout
+from app.services.pdf_reader import PDFReader
+
+Lines = List[List[Tuple[float, str]]]
+
+
+@pytest.fixture(scope="module")
+def reader():
+    reader = PDFReader()
+    yield reader
+    reader.close()
+
+
+def make_words(n_lines: int, n_columns: int, seed: int, y_step: float = 7.1) -> List[Any]:
+    """Palavras no formato de page.get_text("words"), fora de ordem"""
+    rnd = random.Random(seed)
+    width = 800 / n_columns
+    words = []
+    for line in range(n_lines):
+        y = 20 + line * y_step + rnd.choice((0.0, 0.04, 0.05, 0.06))
+        for column in range(n_columns):
+            for k in range(2):
+                x = 10 + column * width + k * 8 + rnd.random()
+                words.append([x, y, x + 5, y + 6, f"w{rnd.randrange(99)}", 0, 0, 0])
+    rnd.shuffle(words)
+    return words
+
+
+def merge_lines(words: List[Any], line_tolerance: float) -> List[Any]:
+    """
+    Referência do line_tolerance (só existe no motor numpy): leva o y de cada
+    palavra para o da primeira linha do grupo (varredura em y com saltos até
+    line_tolerance), para o motor python agrupar igual
+    """
+    first: Dict[float, float] = {}
+    start = prev = None
+    for key in sorted({round(float(w[1]), 1) for w in words}):
+        if prev is None or key - prev > line_tolerance:
+            start = key
+        first[key] = start
+        prev = key
+    return [[w[0], first[round(float(w[1]), 1)], *w[2:]] for w in words]
+
+
+def run_python(
+    reader: PDFReader, words: List[Any], line_tolerance: float = 0.0
+) -> Tuple[Lines, List[float], List[Dict[int, str]]]:
+    if line_tolerance > 0:
+        words = merge_lines(words, line_tolerance)
+    lines = reader._group_words_by_line(words)
+    columns = reader._detect_columns(lines)
+    return lines, columns, [reader._split_columns(line, columns) for line in lines]
+
+
+def run_numpy(
+    reader: PDFReader, words: List[Any], line_tolerance: float = 0.0
+) -> Tuple[Lines, List[float], List[Dict[int, str]]]:
+    layout = NumpyPageLayout(words, line_tolerance)
+    columns = layout.detect_columns(reader.tolerance)
+    return layout.lines, columns, layout.split_columns(columns)
+
+
+@pytest.mark.parametrize("n_columns", [1, 6, 12, 18])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_random_pages(reader, n_columns, seed):
+    words = make_words(40, n_columns, seed)
+    assert run_numpy(reader, words) == run_python(reader, words)
+
+
+def test_empty_and_blank_words(reader):
+    assert run_numpy(reader, []) == run_python(reader, [])
+
+    words = [[10, 10, 15, 16, " ", 0, 0, 0], [20, 10, 25, 16, None, 0, 0, 0]]
+    words += make_words(3, 4, seed=5)
+    assert run_numpy(reader, words) == run_python(reader, words)
+
+
+@pytest.mark.parametrize(
+    "y",
+    [
+        # empates de round(y, 1): o round do Python e o np.round divergem
+        0.05, 0.15, 0.25, 0.35, 2.675, 100.05, 100.15, 100.25, 512.45, 739.95,
+        # vizinhos dos empates
+        100.04999999, 100.05000001, 100.1499999, 100.15000001,
+    ],
+)
+def test_line_rounding_edges(reader, y):
+    words = [
+        [10.0, y, 15.0, y + 6, "a", 0, 0, 0],
+        [50.0, round(y, 1), 55.0, y + 6, "b", 0, 0, 0],
+        [90.0, y + 0.1, 95.0, y + 6, "c", 0, 0, 0],
+        [130.0, y - 0.05, 135.0, y + 6, "d", 0, 0, 0],
+    ]
+    assert run_numpy(reader, words) == run_python(reader, words)
+
+
+def test_split_ties_at_midpoint(reader):
+    # palavra exatamente no ponto médio, em pontos flutuantes não exatos:
+    # fica com a coluna de menor abs(x - coluna), a da esquerda no empate
+    rnd = random.Random(11)
+    pairs = [(10.0, 30.0), (0.1, 0.3), (46.9, 136.34), (216.4, 286.29), (362.926, 385.87)]
+    pairs += [
+        (a, round(a + rnd.uniform(1, 100), rnd.choice((1, 2, 3))))
+        for a in (round(rnd.uniform(0, 500), rnd.choice((1, 2, 3))) for _ in range(200))
+    ]
+    for left, right in pairs:
+        columns = [left - 50.0, left, right, right + 50.0]
+        x = (left + right) / 2
+        words = [[x, 10.0, x + 5, 16.0, "w", 0, 0, 0], [left, 10.0, left + 5, 16.0, "e", 0, 0, 0]]
+        layout = NumpyPageLayout(words)
+        expected = [reader._split_columns(line, columns) for line in layout.lines]
+        assert layout.split_columns(columns) == expected, (left, right)
+
+
+def test_split_same_x(reader):
+    # mesmo x em palavras diferentes: ordem original mantida dentro da coluna
+    words = [[40.0, 10.0, 45.0, 16.0, text, 0, 0, 0] for text in ("b", "a", "c")]
+    words += [[400.0, 10.0, 405.0, 16.0, "z", 0, 0, 0]]
+    assert run_numpy(reader, words) == run_python(reader, words)
+
+
+def test_split_table_range(reader):
+    words = make_words(20, 8, seed=7)
+    layout = NumpyPageLayout(words)
+    columns = layout.detect_columns(reader.tolerance)
+    for x_min, x_max in ((-math.inf, math.inf), (columns[1], columns[5]), (200.0, 200.0)):
+        expected = [
+            reader._split_columns([(x, t) for x, t in line if x_min < x <= x_max], columns)
+            for line in layout.lines
+        ]
+        assert layout.split_columns(columns, x_min, x_max) == expected
+
+
+@pytest.mark.parametrize("line_tolerance", [0.1, 0.5, 2.0, 7.1, 10.0])
+@pytest.mark.parametrize("seed", [1, 2])
+def test_line_tolerance(reader, line_tolerance, seed):
+    # linhas a cada 0,3..7,1 pt: tolerâncias abaixo, no limite e acima do passo
+    words = make_words(30, 6, seed, y_step=random.Random(seed).choice((0.3, 2.0, 7.1)))
+    assert run_numpy(reader, words, line_tolerance) == run_python(reader, words, line_tolerance)
+
+
+def test_line_tolerance_merges_close_lines(reader):
+    words = [
+        [10.0, 100.0, 15.0, 106.0, "a", 0, 0, 0],
+        [60.0, 100.4, 65.0, 106.0, "b", 0, 0, 0],
+        [110.0, 100.8, 115.0, 106.0, "c", 0, 0, 0],
+        [10.0, 110.0, 15.0, 116.0, "d", 0, 0, 0],
+    ]
+    layout = NumpyPageLayout(words, line_tolerance=0.5)
+    assert layout.lines == [[(10.0, "a"), (60.0, "b"), (110.0, "c")], [(10.0, "d")]]
+    assert run_numpy(reader, words, 0.5) == run_python(reader, words, 0.5)